@@ -4,9 +4,21 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Transaction, Category
 from .serializers import TransactionSerializer, CategorySerializer
 from .serializers import TransactionSerializer
-from django.db.models import Sum
 from .models import Budget
 from .serializers import BudgetSerializer
+from monitoring.querybudget import query_budget
+from sharding import shardmap
+from sync.changelog import record_change, TRANSACTION, BUDGET
+from realtime.events import publish_dashboard_update
+from alerts.tracker import apply_expense_change, invalidate_alert_config, snapshot
+from goals.projection import apply_cash_flow_change
+from categorization.matcher import categorize
+from duplicates import fingerprint
+from categories import tree as category_tree
+from django.utils import timezone
+from currency import conversion
+from currency.rates import MissingRate
+from audit import log as audit
 
 """
 CRUD API views for managing transactions, categories, and budgets.
@@ -18,16 +30,60 @@ Includes endpoints for creating, retrieving, updating, and deleting transactions
         Add a new transaction.
         Expects a POST request with transaction data in the request body.
         Validates the data and saves the transaction to the database.
+        Exact and near duplicates of existing transactions are saved and listed in
+        "possible_duplicates"; with DUPLICATE_DETECTION['REJECT_EXACT'] an exact duplicate
+        is rejected with 409 instead, unless "allow_duplicate" is true.
+        ``currency`` defaults to the user's base currency.
         Returns the created transaction data or an error message if validation fails.
  """
+@query_budget(19)
 class AddTransactionView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         serializer = TransactionSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
-            return Response(serializer.data, status=201)
+            try:
+                currency = conversion.validate_currency(request.data['currency']) if request.data.get('currency') \
+                    else conversion.base_currency(request.user.pk)
+            except ValueError as e:
+                return Response({"currency": [str(e)]}, status=400)
+            extra = {}
+            if serializer.validated_data.get('category') is None:
+                # No category chosen: let the user's categorization rules pick one.
+                category_id = categorize(
+                    request.user.pk,
+                    serializer.validated_data.get('description', ''),
+                    request.data.get('payee', ''),
+                    serializer.validated_data.get('amount'),
+                )
+                if category_id is not None:
+                    extra['category_id'] = category_id
+            allow_duplicate = str(request.data.get('allow_duplicate', '')).lower() in ('1', 'true', 'yes')
+            with shardmap.atomic():
+                exact, near = fingerprint.find_duplicates(
+                    request.user.pk,
+                    serializer.validated_data.get('amount'),
+                    serializer.validated_data.get('date_created') or timezone.now(),
+                    serializer.validated_data.get('description', ''),
+                )
+                if exact and fingerprint.get_setting('REJECT_EXACT') and not allow_duplicate:
+                    return Response({
+                        "error": "This transaction duplicates an existing one.",
+                        "duplicate_of": exact,
+                    }, status=409)
+                serializer.save(user=request.user, **extra)
+                fingerprint.index_transaction(serializer.instance, created=True)
+                conversion.set_transaction_currency(serializer.instance, currency, created=True)
+                data = {**serializer.data, "currency": currency}
+                record_change(request.user, TRANSACTION, serializer.instance.pk, 'create', data)
+                audit.record(request.user.pk, audit.TRANSACTION_CREATE, serializer.instance.pk, data, request)
+                apply_expense_change(request.user, after=snapshot(serializer.instance))
+                apply_cash_flow_change(request.user, after=snapshot(serializer.instance))
+                publish_dashboard_update(request.user.pk)
+            if exact or near:
+                data = {**data, "possible_duplicates": exact + near}
+            return Response(data, status=201)
         return Response(serializer.errors, status=400)
     
 
@@ -39,6 +95,7 @@ class AddTransactionView(APIView):
         If no transactions are found, returns an empty list.
 
 """
+@query_budget(2)
 class RetrieveTransactionsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -59,6 +116,7 @@ class RetrieveTransactionsView(APIView):
         If the transaction is not found, returns an error message.
         
 """
+@query_budget(2)
 class RetrieveTransactionView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -81,16 +139,35 @@ class RetrieveTransactionView(APIView):
         If the transaction is not found, returns an error message.
         
 """
+@query_budget(21)
 class UpdateTransactionView(APIView):
     permission_classes = [IsAuthenticated]
 
     def put(self, request, id):
         try:
-            transaction = Transaction.objects.get(id=id, user=request.user)
+            transaction = Transaction.objects.select_related('currency_info').get(id=id, user=request.user)
             serializer = TransactionSerializer(transaction, data=request.data, partial=True)
             if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data)
+                try:
+                    currency = conversion.validate_currency(request.data['currency']) if request.data.get('currency') \
+                        else conversion.transaction_currency(transaction, conversion.base_currency(request.user.pk))
+                except ValueError as e:
+                    return Response({"currency": [str(e)]}, status=400)
+                with shardmap.atomic():
+                    before = snapshot(transaction)
+                    previous = audit.field_values(transaction, serializer.validated_data)
+                    serializer.save()
+                    fingerprint.index_transaction(transaction)
+                    if request.data.get('currency'):
+                        conversion.set_transaction_currency(transaction, currency)
+                    data = {**serializer.data, "currency": currency}
+                    record_change(request.user, TRANSACTION, transaction.pk, 'update', data)
+                    audit.record(request.user.pk, audit.TRANSACTION_UPDATE, transaction.pk,
+                                 {"before": previous, "after": data}, request)
+                    apply_expense_change(request.user, before=before, after=snapshot(transaction))
+                    apply_cash_flow_change(request.user, before=before, after=snapshot(transaction))
+                    publish_dashboard_update(request.user.pk)
+                return Response(data)
             return Response(serializer.errors, status=400)
         except Transaction.DoesNotExist:
             return Response({"error": "Transaction not found."}, status=404)
@@ -104,13 +181,23 @@ class UpdateTransactionView(APIView):
         If the transaction is not found, returns an error message.
         
 """
+@query_budget(18)
 class DeleteTransactionView(APIView):
     permission_classes = [IsAuthenticated]
 
     def delete(self, request, id):
         try:
-            transaction = Transaction.objects.get(id=id, user=request.user)
-            transaction.delete()
+            transaction = Transaction.objects.select_related('currency_info').get(id=id, user=request.user)
+            with shardmap.atomic():
+                record_change(request.user, TRANSACTION, transaction.pk, 'delete')
+                audit.record(request.user.pk, audit.TRANSACTION_DELETE, transaction.pk,
+                             audit.field_values(transaction, ['type', 'amount', 'category', 'date_created', 'description']), request)
+                before = snapshot(transaction)
+                transaction.delete()
+                # Applied once the row is gone: a month seen for the first time is summed from the ledger.
+                apply_expense_change(request.user, before=before)
+                apply_cash_flow_change(request.user, before=before)
+                publish_dashboard_update(request.user.pk)
             return Response({"message": "Transaction deleted successfully."}, status=204)
         except Transaction.DoesNotExist:
             return Response({"error": "Transaction not found."}, status=404)
@@ -121,17 +208,27 @@ class DeleteTransactionView(APIView):
         Add a new category.
         Expects a POST request with category data in the request body.
         Validates the data and saves the category to the database.
+        The category is also added to the user's category tree, under ``parent`` if given.
         Returns the created category data or an error message if validation fails.
         If the category is not found, returns an error message.
 
 """
+@query_budget(6)
 class AddCategoryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         serializer = CategorySerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            parent = request.data.get('parent')
+            try:
+                with shardmap.atomic():
+                    serializer.save()
+                    category_tree.place(request.user, serializer.instance.pk, int(parent) if parent else None)
+            except (TypeError, ValueError):
+                return Response({"parent": ["parent must be a category id."]}, status=400)
+            except category_tree.TreeError as e:
+                return Response({"parent": [str(e)]}, status=400)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
     
@@ -147,6 +244,7 @@ class AddCategoryView(APIView):
 
 
 """
+@query_budget(2)
 class RetrieveCategoriesView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -164,6 +262,7 @@ class RetrieveCategoriesView(APIView):
         If the category is not found, returns an error message.
 
 """
+@query_budget(2)
 class TransactionHistoryView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -178,11 +277,13 @@ class TransactionHistoryView(APIView):
 
 """     Filter transactions based on date range, category, and type.
         Expects a GET request with query parameters for start_date, end_date, category, and type.
+        ``subtree`` selects a category together with all of its subcategories in the user's tree.
         Filters the transactions based on the provided parameters and returns the filtered transactions.
         If no transactions match the criteria, returns an empty list.
         If the category is not found, returns an error message.
         If the transaction type is not found, returns an error message.
 """   
+@query_budget(3)
 class FilterTransactionsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -190,6 +291,7 @@ class FilterTransactionsView(APIView):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         category = request.query_params.get('category')
+        subtree = request.query_params.get('subtree')
         transaction_type = request.query_params.get('type')
 
         transactions = Transaction.objects.filter(user=request.user)
@@ -197,6 +299,11 @@ class FilterTransactionsView(APIView):
             transactions = transactions.filter(date_created__range=[start_date, end_date])
         if category:
             transactions = transactions.filter(category__id=category)
+        if subtree:
+            node = category_tree.get_node(request.user, subtree) if subtree.isdigit() else None
+            if node is None:
+                return Response({"error": "Category not in your category tree."}, status=404)
+            transactions = category_tree.in_subtree(transactions, request.user, node)
         if transaction_type:
             transactions = transactions.filter(type=transaction_type)
 
@@ -211,22 +318,42 @@ class FilterTransactionsView(APIView):
         Retrieve a financial summary for the authenticated user.
         Expects a GET request.
         Returns the total income, total expenses, and category-wise summary of transactions.
+        With ``depth``, the category summary follows the user's category tree, each
+        category rolled up into its ancestor at that depth (1 for top-level categories).
+        Amounts are converted to the user's base currency, returned as ``currency``.
         If no transactions are found, returns zero for total income and expenses.
         If the category is not found, returns an error message.
         If the transaction type is not found, returns an error message.
         
 """
+@query_budget(5)
 class FinancialSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total_income = Transaction.objects.filter(user=request.user, type='income').aggregate(Sum('amount'))['amount__sum'] or 0
-        total_expenses = Transaction.objects.filter(user=request.user, type='expense').aggregate(Sum('amount'))['amount__sum'] or 0
-        category_summary = Transaction.objects.filter(user=request.user).values('category__name').annotate(total=Sum('amount'))
+        depth = request.query_params.get('depth')
+        if depth is not None and not (depth.isdigit() and 1 <= int(depth) <= category_tree.MAX_DEPTH):
+            return Response({"error": f"depth must be between 1 and {category_tree.MAX_DEPTH}."}, status=400)
+        base = conversion.base_currency(request.user.pk)
+        transactions = Transaction.objects.filter(user=request.user)
+        try:
+            # One grouped query feeds both the totals and the category summary.
+            rows = conversion.grouped_totals(transactions, base, 'type', 'category__name')
+            totals = {row['type']: row['total'] for row in conversion.convert(rows, base, ('type',))}
+            if depth is not None:
+                category_summary = category_tree.rollup(
+                    transactions, request.user, int(depth),
+                    aggregate=conversion.summed_in(base),
+                )
+            else:
+                category_summary = conversion.convert(rows, base, ('category__name',))
+        except MissingRate as e:
+            return Response({"error": str(e)}, status=400)
         return Response({
-            "total_income": total_income,
-            "total_expenses": total_expenses,
-            "category_summary": category_summary
+            "total_income": totals.get('income', 0),
+            "total_expenses": totals.get('expense', 0),
+            "category_summary": category_summary,
+            "currency": base,
         })
 
     
@@ -240,18 +367,31 @@ class FinancialSummaryView(APIView):
         If the budget is not found, returns an error message.
         If the user is not authenticated, returns an error message.
 """
+@query_budget(9)
 class SetBudgetView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         serializer = BudgetSerializer(data=request.data)
         if serializer.is_valid():
-            # Check if the user already has a budget
-            budget, created = Budget.objects.update_or_create(
-                user=request.user,
-                defaults={'monthly_budget': serializer.validated_data['monthly_budget']}
-            )
-            return Response(BudgetSerializer(budget).data, status=201)
+            try:
+                currency = conversion.validate_currency(request.data['currency']) if request.data.get('currency') \
+                    else conversion.base_currency(request.user.pk)
+            except ValueError as e:
+                return Response({"currency": [str(e)]}, status=400)
+            with shardmap.atomic():
+                # Check if the user already has a budget
+                budget, created = Budget.objects.update_or_create(
+                    user=request.user,
+                    defaults={'monthly_budget': serializer.validated_data['monthly_budget']}
+                )
+                conversion.set_budget_currency(budget, currency)
+                data = {**BudgetSerializer(budget).data, "currency": currency}
+                record_change(request.user, BUDGET, budget.pk, 'create' if created else 'update', data)
+                audit.record(request.user.pk, audit.BUDGET_SET, budget.pk, data, request)
+                invalidate_alert_config(request.user.pk)
+                publish_dashboard_update(request.user.pk)
+            return Response(data, status=201)
         return Response(serializer.errors, status=400)
     
 
@@ -267,14 +407,16 @@ class SetBudgetView(APIView):
         If the budget is not found, returns an error message.
         If the user is not authenticated, returns an error message.
         If the budget is not set, returns an error message."""
+@query_budget(2)
 class RetrieveBudgetView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         try:
-            budget = Budget.objects.get(user=request.user)
+            budget = Budget.objects.select_related('currency_info').get(user=request.user)
             serializer = BudgetSerializer(budget)
-            return Response(serializer.data)
+            currency = conversion.budget_currency(budget, conversion.base_currency(request.user.pk))
+            return Response({**serializer.data, "currency": currency})
         except Budget.DoesNotExist:
             return Response({"error": "Budget not set."}, status=404)
         
@@ -289,16 +431,31 @@ class RetrieveBudgetView(APIView):
         If the user is not authenticated, returns an error message.
         If the budget is not set, returns an error message.
         If the budget is not found, returns an error message."""
+@query_budget(8)
 class UpdateBudgetView(APIView):
     permission_classes = [IsAuthenticated]
 
     def put(self, request):
         try:
-            budget = Budget.objects.get(user=request.user)
+            budget = Budget.objects.select_related('currency_info').get(user=request.user)
             serializer = BudgetSerializer(budget, data=request.data, partial=True)
             if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data)
+                try:
+                    currency = conversion.validate_currency(request.data['currency']) if request.data.get('currency') \
+                        else conversion.budget_currency(budget, conversion.base_currency(request.user.pk))
+                except ValueError as e:
+                    return Response({"currency": [str(e)]}, status=400)
+                with shardmap.atomic():
+                    previous = audit.field_values(budget, serializer.validated_data)
+                    serializer.save()
+                    if request.data.get('currency'):
+                        conversion.set_budget_currency(budget, currency)
+                    data = {**serializer.data, "currency": currency}
+                    record_change(request.user, BUDGET, budget.pk, 'update', data)
+                    audit.record(request.user.pk, audit.BUDGET_UPDATE, budget.pk, {"before": previous, "after": data}, request)
+                    invalidate_alert_config(request.user.pk)
+                    publish_dashboard_update(request.user.pk)
+                return Response(data)
             return Response(serializer.errors, status=400)
         except Budget.DoesNotExist:
             return Response({"error": "Budget not set."}, status=404)
@@ -309,25 +466,36 @@ class UpdateBudgetView(APIView):
 """_summary_of_budget_analysis(self):
         Retrieve a summary of the budget analysis for the authenticated user.
         Expects a GET request.
-        Returns the monthly budget, total expenses, remaining budget, and status (under or over budget).
+        Returns the monthly budget, total expenses, remaining budget, and status (under or over budget),
+        all converted to the user's base currency, which is returned as ``currency``.
         If the budget is not set, returns an error message.
         If the budget is not found, returns an error message
 """
+@query_budget(5)
 class BudgetAnalysisView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         try:
-            budget = Budget.objects.get(user=request.user)
-            total_expenses = Transaction.objects.filter(user=request.user, type='expense').aggregate(Sum('amount'))['amount__sum'] or 0
-            remaining_budget = budget.monthly_budget - total_expenses
+            budget = Budget.objects.select_related('currency_info').get(user=request.user)
+            base = conversion.base_currency(request.user.pk)
+            rows = conversion.grouped_totals(Transaction.objects.filter(user=request.user, type='expense'), base)
+            converted = conversion.convert(rows, base)
+            total_expenses = converted[0]['total'] if converted else 0
+            monthly_budget = conversion.convert_amount(
+                budget.monthly_budget, conversion.budget_currency(budget, base), base,
+            )
+            remaining_budget = monthly_budget - total_expenses
 
             return Response({
-                "monthly_budget": budget.monthly_budget,
+                "monthly_budget": monthly_budget,
                 "total_expenses": total_expenses,
                 "remaining_budget": remaining_budget,
-                "status": "Under Budget" if remaining_budget >= 0 else "Over Budget"
+                "status": "Under Budget" if remaining_budget >= 0 else "Over Budget",
+                "currency": base,
             })
         except Budget.DoesNotExist:
             return Response({"error": "Budget not set."}, status=404)
+        except MissingRate as e:
+            return Response({"error": str(e)}, status=400)
         
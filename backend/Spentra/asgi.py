@@ -2,6 +2,8 @@
 ASGI config for Spentra project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to LIVE_UPDATES['PATH'] are answered by the live dashboard event stream
+(realtime/sse.py); everything else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Spentra.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from realtime.broker import get_setting  # noqa: E402  (needs settings configured)
+from realtime.sse import EventStreamApp  # noqa: E402
+
+live_path = get_setting('PATH')
+live_application = EventStreamApp()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == live_path:
+        await live_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,9 +41,28 @@ INSTALLED_APPS = [
     'authentication',
     'rest_framework',
     'rest_framework.authtoken',
+    'monitoring',
+    'benchmarks',
+    'sync',
+    'realtime',
+    'alerts',
+    'categorization',
+    'duplicates',
+    'recurring',
+    'categories',
+    'currency',
+    'photos',
+    'audit',
+    'exports',
+    'sharding',
+    'goals',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
+    'sharding.middleware.ShardMiddleware',
+    'monitoring.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,6 +103,9 @@ DATABASES = {
     }
 }
 
+# Ledger models are routed to the request user's shard (see sharding/shardmap.py).
+DATABASE_ROUTERS = ['sharding.routers.ShardRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,28 +162,179 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
+# Token revocation (authentication/tokens.py) lives in this cache, so every worker must
+# share it: outside development use 'django.core.cache.backends.redis.RedisCache' with
+# a LOCATION. Check authentication.W001 warns about a process-local cache when DEBUG is off.
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # JWT denylist entries must not be culled early (authentication/tokens.py).
+        'OPTIONS': {'MAX_ENTRIES': 100000},
     }
 }
+# The test runner is a single process.
+SILENCED_SYSTEM_CHECKS = ['authentication.W001'] if 'test' in sys.argv else []
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.tokens.RevocableJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'monitoring.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
 
 
+# Request instrumentation (see monitoring/middleware.py)
+
+MONITORING = {
+    'SERVER_TIMING': True,
+    'LOG_REQUESTS': True,
+    'EXCLUDE_PATHS': ('/metrics',),
+    'LATENCY_BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+# Opt-in request profiler (see monitoring/profiling.py). With ENABLED False the
+# middleware is removed at startup. SAMPLE_RATE applies to requests that pass the
+# ROUTES (route or URL name) and USERS (user id) filters; a signed X-Spentra-Profile
+# header from `manage.py profiles sign` always profiles.
+
+PROFILING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.0,
+    'ROUTES': [],
+    'USERS': [],
+    'INTERVAL': 0.005,
+    'FORMAT': 'collapsed',
+    'DIRECTORY': 'profiles',
+    'HEADER_MAX_AGE': 3600,
+}
+
+# Per-view query budgets and N+1 detection (see monitoring/querybudget.py).
+# Violations raise under `manage.py test` and warn in the debug server.
+
+QUERY_BUDGET = {
+    'ENABLED': DEBUG,
+    'MODE': 'raise' if 'test' in sys.argv else 'warn',
+    'N_PLUS_ONE_THRESHOLD': 3,
+}
+
+# Live dashboard push over Server-Sent Events, served by Spentra/asgi.py.
+# Use 'realtime.broker.RedisBroker' with OPTIONS {'url': ...} when writes and
+# streams are handled by different processes.
+
+LIVE_UPDATES = {
+    'BROKER': 'realtime.broker.InProcessBroker',
+    'OPTIONS': {},
+    'PATH': '/live/events/',
+    'HEARTBEAT': 25,
+    'QUEUE_SIZE': 8,
+}
+
+# Duplicate transaction detection (see duplicates/fingerprint.py). Transactions with
+# the same amount within WINDOW_HOURS and descriptions at least SIMILARITY alike are
+# near duplicates. Both are listed in AddTransactionView's response; with REJECT_EXACT
+# an exact duplicate is refused with 409 instead.
+
+DUPLICATE_DETECTION = {
+    'WINDOW_HOURS': 72,
+    'SIMILARITY': 0.8,
+    'REJECT_EXACT': False,
+}
+
+# Currencies (see currency/rates.py). Exchange rates are stored against REFERENCE
+# and loaded with `manage.py load_fx_rates <csv>` or the admin; a rate older than
+# RATE_MAX_AGE_DAYS is treated as missing.
+
+CURRENCY = {
+    'DEFAULT': 'NPR',
+    'REFERENCE': 'USD',
+    'SUPPORTED': ['NPR', 'USD', 'INR'],
+    'RATE_MAX_AGE_DAYS': 31,
+    'CACHE_SIZE': 1024,
+}
+
+# Profile photos (see photos/storage.py). Uploads are stored once per SHA-256;
+# `manage.py process_profile_photos --loop` generates SIZES x FORMATS thumbnails.
+
+PROFILE_PHOTOS = {
+    'MAX_UPLOAD_SIZE': 10 * 1024 * 1024,
+    'SIZES': [64, 128, 256],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'CACHE_MAX_AGE': 60 * 60 * 24 * 365,
+    'LOCATION': 'photos',
+}
+
+# Audit trail of financial mutations (see audit/log.py). Events are buffered per
+# process and written in batches of BATCH_SIZE, at least every FLUSH_INTERVAL seconds.
+
+AUDIT = {
+    'ASYNC': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': 50000,
+}
+
+# Account data exports (see exports/archive.py), written under MEDIA_ROOT/DIRECTORY
+# by `manage.py run_exports --loop` and deleted RETENTION_HOURS after they are ready.
+
+EXPORTS = {
+    'DIRECTORY': 'exports',
+    'CHUNK_SIZE': 2000,
+    'PROGRESS_EVERY': 5000,
+    'RETENTION_HOURS': 48,
+    'STALE_AFTER_MINUTES': 60,
+}
+
+# Sharding of the ledger by user (see sharding/shardmap.py). SHARDS lists database
+# aliases; only ever append to it, then run `manage.py migrate --database=<alias>`
+# and `manage.py rebalance_shards`. Each shard issues ids from its own ID_BLOCK range.
+
+SHARDING = {
+    'SHARDS': ['default'],
+    'VIRTUAL_NODES': 64,
+    'ID_BLOCK': 10 ** 12,
+    'MOVE_GRACE_SECONDS': 2.0,
+}
+
+# Savings goals (see goals/projection.py). The savings rate is the average net of the
+# last HISTORY_MONTHS complete months; projections are cached for CACHE_TIMEOUT seconds
+# at most, and dropped sooner by a goal change or a transaction in those months.
+
+SAVINGS_GOALS = {
+    'HISTORY_MONTHS': 6,
+    'MAX_GOALS': 20,
+    'CACHE_TIMEOUT': 60 * 60,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'spentra': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+
 
 from datetime import timedelta
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    # Refresh tokens are single use; revocation state lives in the cache, which must be
+    # shared by every worker (e.g. Redis) outside development. See authentication/tokens.py.
+    'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.tokens.GenerationalTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.tokens.RotatingTokenRefreshSerializer',
 }
 
 
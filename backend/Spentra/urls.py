@@ -21,4 +21,16 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('authentication.urls')),
       path('khalti/', include('bankApi.urls')),  # Include the authentication app's URLs
+    path('metrics/', include('monitoring.urls')),
+    path('sync/', include('sync.urls')),
+    path('alerts/', include('alerts.urls')),
+    path('rules/', include('categorization.urls')),
+    path('recurring/', include('recurring.urls')),
+    path('categories/', include('categories.urls')),
+    path('currency/', include('currency.urls')),
+    path('photos/', include('photos.urls')),
+    path('audit/', include('audit.urls')),
+    path('exports/', include('exports.urls')),
+    path('shards/', include('sharding.urls')),
+    path('goals/', include('goals.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from alerts.models import Notification
+
+
+class Command(BaseCommand):
+    help = "Send queued budget alert emails. Run from cron, or with --loop as a long-running worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new notifications.')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = self.send_batch(options['batch_size'])
+            if sent:
+                self.stdout.write(f"Sent {sent} alert email(s).")
+            elif not options['loop']:
+                break
+            if not sent:
+                time.sleep(options['interval'])
+
+    def send_batch(self, batch_size):
+        with transaction.atomic():
+            pending = Notification.objects.filter(email_pending=True).select_related('user').order_by('id')
+            if connection.features.has_select_for_update_skip_locked:
+                pending = pending.select_for_update(skip_locked=True, of=('self',))
+            batch = list(pending[:batch_size])
+            for notification in batch:
+                try:
+                    send_mail(
+                        subject=notification.title,
+                        message=notification.message,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        recipient_list=[notification.user.email],
+                        fail_silently=False,
+                    )
+                except Exception as e:
+                    self.stderr.write(f"Error sending alert {notification.pk}: {e}")
+                    continue
+                notification.email_pending = False
+                notification.emailed_at = timezone.now()
+            Notification.objects.bulk_update(batch, ['email_pending', 'emailed_at'])
+        return sum(1 for notification in batch if not notification.email_pending)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='monthlyspend',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14, null=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import models
+
+
+def default_thresholds():
+    return [50, 80, 100]
+
+
+"""_summary_
+
+        Models for budget threshold alerts.
+        BudgetAlertSettings holds a user's thresholds, as percentages of their monthly budget,
+        and the channels alerts are delivered through. MonthlySpend is the month-to-date
+        expense total maintained on every transaction write, together with the highest
+        threshold already alerted for that month, which makes each crossing fire once.
+        Notification is both the in-app inbox and the queue drained by send_alert_emails.
+
+"""
+class BudgetAlertSettings(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='budget_alert_settings')
+    thresholds = models.JSONField(default=default_thresholds)
+    email_enabled = models.BooleanField(default=True)
+    in_app_enabled = models.BooleanField(default=True)
+
+
+class MonthlySpend(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_spend')
+    period = models.DateField()
+    # In the base currency; NULL until it is summed again from the ledger (see alerts/tracker.py).
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, null=True)
+    alerted_threshold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period'], name='alerts_monthlyspend_user_period_unique'),
+        ]
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=32)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    in_app = models.BooleanField(default=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    email_pending = models.BooleanField(default=False)
+    emailed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='alerts_notif_user_created_idx'),
+            models.Index(fields=['email_pending'], condition=models.Q(email_pending=True),
+                         name='alerts_notif_email_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.title}"
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from .models import BudgetAlertSettings, Notification
+
+
+class BudgetAlertSettingsSerializer(serializers.ModelSerializer):
+    thresholds = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=1000),
+        allow_empty=True,
+        max_length=10,
+    )
+
+    class Meta:
+        model = BudgetAlertSettings
+        fields = ['thresholds', 'email_enabled', 'in_app_enabled']
+
+    def validate_thresholds(self, value):
+        return sorted(set(value))
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'title', 'message', 'data', 'created_at', 'read_at']
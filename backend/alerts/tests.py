@@ -0,0 +1,102 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from CRUD.models import Budget, Transaction
+from .models import BudgetAlertSettings, MonthlySpend, Notification
+from .tracker import apply_expense_change, period_of, snapshot
+
+
+class DeleteTrackingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.header = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(self.user)}"}
+        self.expense = Transaction.objects.create(user=self.user, type='expense', amount=Decimal('100.00'))
+
+    def delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('delete-transaction', args=[self.expense.pk]), **self.header)
+        self.assertEqual(response.status_code, 204)
+        return MonthlySpend.objects.get(user=self.user, period=period_of(timezone.now()))
+
+    def test_delete_in_an_untracked_month_does_not_count_the_deleted_row(self):
+        self.assertEqual(self.delete().total, 0)
+
+    def test_delete_in_a_month_being_summed_again_does_not_count_the_deleted_row(self):
+        MonthlySpend.objects.create(user=self.user, period=period_of(timezone.now()), total=None)
+        self.assertEqual(self.delete().total, 0)
+
+
+class ThresholdTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        Budget.objects.create(user=self.user, monthly_budget=Decimal('1000.00'))
+
+    def spend(self, amount):
+        expense = Transaction.objects.create(user=self.user, type='expense', amount=Decimal(amount))
+        apply_expense_change(self.user, after=snapshot(expense))
+        return MonthlySpend.objects.get(user=self.user, period=period_of(timezone.now()))
+
+    def thresholds_alerted(self):
+        return [notification.data['threshold'] for notification in Notification.objects.order_by('pk')]
+
+    def test_first_write_of_the_month_seeds_the_total_from_the_ledger(self):
+        Transaction.objects.create(user=self.user, type='expense', amount=Decimal('30.00'))
+        Transaction.objects.create(user=self.user, type='income', amount=Decimal('500.00'))
+        self.assertEqual(self.spend('20.00').total, Decimal('50.00'))
+        self.assertEqual(self.spend('5.00').total, Decimal('55.00'))
+
+    def test_an_update_moves_the_amount_between_months(self):
+        expense = Transaction.objects.create(user=self.user, type='expense', amount=Decimal('40.00'))
+        apply_expense_change(self.user, after=snapshot(expense))
+        before = snapshot(expense)
+        last_month = timezone.now().replace(day=1) - timedelta(days=1)
+        Transaction.objects.filter(pk=expense.pk).update(date_created=last_month)
+        expense.refresh_from_db()
+        apply_expense_change(self.user, before=before, after=snapshot(expense))
+
+        self.assertEqual(MonthlySpend.objects.get(period=period_of(timezone.now())).total, 0)
+        self.assertEqual(MonthlySpend.objects.get(period=period_of(last_month)).total, Decimal('40.00'))
+
+    def test_each_threshold_fires_once(self):
+        self.spend('400.00')
+        self.assertEqual(self.thresholds_alerted(), [])
+        self.spend('150.00')
+        self.spend('10.00')
+        self.assertEqual(self.thresholds_alerted(), [50])
+        spend = self.spend('500.00')
+        self.assertEqual(self.thresholds_alerted(), [50, 100])
+        self.assertEqual(spend.alerted_threshold, 100)
+        self.assertEqual(Notification.objects.order_by('pk').last().title, "You have reached your monthly budget")
+
+    def test_a_jump_across_several_thresholds_alerts_the_highest(self):
+        self.spend('850.00')
+        self.assertEqual(self.thresholds_alerted(), [80])
+
+    def test_thresholds_and_channels_come_from_the_settings(self):
+        settings = BudgetAlertSettings.objects.create(user=self.user, thresholds=[90, 25], email_enabled=False)
+        self.spend('300.00')
+        notification = Notification.objects.get()
+        self.assertEqual((notification.data['threshold'], notification.in_app, notification.email_pending),
+                         (25, True, False))
+
+        settings.in_app_enabled = False
+        settings.save()
+        cache.clear()
+        self.spend('650.00')
+        self.assertEqual(self.thresholds_alerted(), [25])
+
+    def test_no_alerts_without_a_budget(self):
+        Budget.objects.all().delete()
+        self.spend('5000.00')
+        self.assertFalse(Notification.objects.exists())
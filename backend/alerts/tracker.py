@@ -0,0 +1,220 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from CRUD.models import Budget, Transaction
+from currency import conversion
+from currency.rates import MissingRate
+from .models import BudgetAlertSettings, MonthlySpend, Notification, default_thresholds
+
+
+"""_summary_
+
+        Month-to-date expense tracking and threshold evaluation on the transaction write path.
+        Write views call apply_expense_change() inside their atomic block with the
+        (type, amount, date) of the transaction before and after the write. The change is
+        applied to the MonthlySpend row of each affected month as an F() update, and the
+        current month is checked against the user's thresholds. The budget and thresholds
+        are read from the cache, so a write that crosses nothing costs two small queries,
+        and alert delivery is left to Notification rows drained outside the request.
+        Read paths are untouched.
+        Totals and the budget are in the user's base currency, converted at the rate
+        BudgetAnalysisView uses for the month (see currency.conversion). A total that
+        cannot be kept up (a missing rate, or a new base currency) is set to NULL and
+        summed again from the ledger on a later write.
+
+"""
+
+CONFIG_CACHE_KEY = 'budget_alert_config_{}'
+CONFIG_CACHE_TIMEOUT = 60 * 60
+
+
+def period_of(value):
+    if hasattr(value, 'hour'):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.date()
+    return value.replace(day=1)
+
+
+def base_amount(transaction_obj):
+    """The transaction's amount in the owner's base currency, or None if there is no rate for it.
+
+    select_related('currency_info') avoids a query.
+    """
+    base = conversion.base_currency(transaction_obj.user_id)
+    currency = conversion.transaction_currency(transaction_obj, base)
+    amount = Decimal(transaction_obj.amount)
+    if currency == base:
+        return amount
+    day = conversion.rate_day(period_of(transaction_obj.date_created), timezone.localdate())
+    try:
+        return conversion.convert_amount(amount, currency, base, day)
+    except MissingRate:
+        return None
+
+
+def snapshot(transaction_obj):
+    """The (type, amount, date) triple apply_expense_change() expects, taken from a saved transaction.
+
+    The amount is in the base currency (see base_amount()).
+    """
+    return (transaction_obj.type, base_amount(transaction_obj), transaction_obj.date_created)
+
+
+def month_total(user_id, period):
+    """The user's expenses in ``period``, summed from the ledger in their base currency."""
+    next_period = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    base = conversion.base_currency(user_id)
+    expenses = Transaction.objects.filter(
+        user_id=user_id, type='expense', date_created__date__gte=period, date_created__date__lt=next_period,
+    )
+    converted = conversion.convert(conversion.grouped_totals(expenses, base), base)
+    return converted[0]['total'] if converted else Decimal(0)
+
+
+def forget_totals(user_id):
+    """Have the user's totals summed again, e.g. after their base currency changed."""
+    MonthlySpend.objects.filter(user_id=user_id).update(total=None)
+    invalidate_alert_config(user_id)
+
+
+def alert_config(user_id):
+    """Return (monthly_budget, thresholds, email_enabled, in_app_enabled), cached per user."""
+    key = CONFIG_CACHE_KEY.format(user_id)
+    config = cache.get(key)
+    if config is None:
+        monthly_budget = budget_in_base(user_id)
+        alert_settings = BudgetAlertSettings.objects.filter(user_id=user_id).first()
+        if alert_settings is None:
+            config = (monthly_budget, default_thresholds(), True, True)
+        else:
+            config = (monthly_budget, sorted(alert_settings.thresholds),
+                      alert_settings.email_enabled, alert_settings.in_app_enabled)
+        cache.set(key, config, CONFIG_CACHE_TIMEOUT)
+    return config
+
+
+def budget_in_base(user_id):
+    budget = Budget.objects.filter(user_id=user_id).values_list('monthly_budget', 'currency_info__currency').first()
+    if budget is None:
+        return None
+    monthly_budget, currency = budget
+    base = conversion.base_currency(user_id)
+    if currency is None or currency == base:
+        return monthly_budget
+    try:
+        return conversion.convert_amount(monthly_budget, currency, base)
+    except MissingRate:
+        # Without a rate no threshold can be judged; retried when the config expires.
+        return None
+
+
+def invalidate_alert_config(user_id):
+    cache.delete(CONFIG_CACHE_KEY.format(user_id))
+
+
+def apply_expense_change(user, before=None, after=None):
+    """Apply one transaction write to the month-to-date totals and fire any crossed thresholds.
+
+    ``before`` and ``after`` are snapshot() triples, or None for a create or a delete.
+    """
+    deltas = {}
+    for values, sign in ((before, -1), (after, 1)):
+        if values is None or values[0] != 'expense':
+            continue
+        period = period_of(values[2])
+        if values[1] is None or (period in deltas and deltas[period] is None):
+            deltas[period] = None
+        else:
+            deltas[period] = deltas.get(period, 0) + sign * values[1]
+    apply_expense_deltas(user, deltas)
+
+
+def apply_expense_deltas(user, deltas):
+    """Apply summed expense changes, keyed by month (see period_of()), e.g. from a bulk write.
+
+    A None change could not be converted to the base currency.
+    """
+    current_period = period_of(timezone.now())
+    for period, delta in deltas.items():
+        if delta == 0:
+            continue
+        spend = add_to_month(user, period, delta)
+        if period == current_period and (delta is None or delta > 0):
+            evaluate_thresholds(user, spend)
+
+
+def add_to_month(user, period, delta):
+    """Add ``delta`` to the user's total for ``period`` and return the updated MonthlySpend."""
+    # A NULL total stays NULL through the update, and is summed again below.
+    if MonthlySpend.objects.filter(user=user, period=period).update(
+        total=None if delta is None else F('total') + delta,
+    ):
+        spend = MonthlySpend.objects.get(user=user, period=period)
+        if spend.total is None:
+            resum(spend)
+        return spend
+
+    # First write of the month: seed the total from the ledger, which already includes this write.
+    try:
+        total = month_total(user.pk, period)
+    except MissingRate:
+        total = None
+    try:
+        with transaction.atomic():
+            return MonthlySpend.objects.create(user=user, period=period, total=total)
+    except IntegrityError:
+        return add_to_month(user, period, delta)
+
+
+def resum(spend):
+    try:
+        spend.total = month_total(spend.user_id, spend.period)
+    except MissingRate:
+        return
+    MonthlySpend.objects.filter(pk=spend.pk, total__isnull=True).update(total=spend.total)
+
+
+def evaluate_thresholds(user, spend):
+    monthly_budget, thresholds, email_enabled, in_app_enabled = alert_config(user.pk)
+    if not monthly_budget or spend.total is None or not (email_enabled or in_app_enabled):
+        return
+    used = spend.total * 100 / monthly_budget
+    crossed = [threshold for threshold in thresholds if spend.alerted_threshold < threshold <= used]
+    if not crossed:
+        return
+
+    threshold = crossed[-1]
+    # Conditional update: only the writer that moves the marker sends the alert.
+    claimed = MonthlySpend.objects.filter(pk=spend.pk, alerted_threshold__lt=threshold).update(
+        alerted_threshold=threshold,
+    )
+    if not claimed:
+        return
+
+    if threshold >= 100:
+        title = "You have reached your monthly budget"
+    else:
+        title = f"You have used {threshold}% of your monthly budget"
+    Notification.objects.create(
+        user=user,
+        kind='budget_threshold',
+        title=title,
+        message=(
+            f"Your expenses for {spend.period:%B %Y} are {spend.total} of your "
+            f"{monthly_budget} monthly budget ({used:.0f}%)."
+        ),
+        data={
+            'threshold': threshold,
+            'period': spend.period.isoformat(),
+            'month_to_date': str(spend.total),
+            'monthly_budget': str(monthly_budget),
+            'currency': conversion.base_currency(user.pk),
+        },
+        in_app=in_app_enabled,
+        email_pending=email_enabled,
+    )
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import BudgetAlertSettingsView, NotificationListView, NotificationReadView
+
+urlpatterns = [
+    path('settings/', BudgetAlertSettingsView.as_view(), name='budget-alert-settings'),
+    path('notifications/', NotificationListView.as_view(), name='notifications'),
+    path('notifications/<int:id>/read/', NotificationReadView.as_view(), name='notification-read'),
+]
@@ -0,0 +1,75 @@
+from django.utils import timezone
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from .models import BudgetAlertSettings, Notification
+from .serializers import BudgetAlertSettingsSerializer, NotificationSerializer
+from .tracker import invalidate_alert_config
+
+
+NOTIFICATIONS_PAGE_SIZE = 50
+
+
+"""
+        Retrieve or update the budget alert thresholds of the authenticated user.
+        Expects a GET request, or a PUT request with ``thresholds`` (percentages of the
+        monthly budget) and the ``email_enabled`` / ``in_app_enabled`` channel flags.
+        Returns the current settings; users who never saved any get the defaults.
+"""
+@query_budget(3)
+class BudgetAlertSettingsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        alert_settings = BudgetAlertSettings.objects.filter(user=request.user).first() or BudgetAlertSettings()
+        return Response(BudgetAlertSettingsSerializer(alert_settings).data)
+
+    def put(self, request):
+        alert_settings = BudgetAlertSettings.objects.filter(user=request.user).first()
+        serializer = BudgetAlertSettingsSerializer(alert_settings, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            invalidate_alert_config(request.user.pk)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=400)
+
+
+"""
+        List the in-app notifications of the authenticated user, newest first.
+        Expects a GET request; ``unread=1`` limits the list to unread notifications and
+        ``before=<id>`` returns the page after the given notification.
+"""
+@query_budget(2)
+class NotificationListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        notifications = Notification.objects.filter(user=request.user, in_app=True).order_by('-id')
+        if request.query_params.get('unread'):
+            notifications = notifications.filter(read_at__isnull=True)
+        before = request.query_params.get('before')
+        if before:
+            if not before.isdigit():
+                return Response({"error": "before must be a notification id."}, status=400)
+            notifications = notifications.filter(id__lt=before)
+        serializer = NotificationSerializer(notifications[:NOTIFICATIONS_PAGE_SIZE], many=True)
+        return Response(serializer.data)
+
+
+"""
+        Mark a notification of the authenticated user as read.
+        Expects a POST request with the notification ID in the URL.
+"""
+@query_budget(2)
+class NotificationReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, id):
+        updated = Notification.objects.filter(id=id, user=request.user, read_at__isnull=True).update(
+            read_at=timezone.now(),
+        )
+        if not updated and not Notification.objects.filter(id=id, user=request.user).exists():
+            return Response({"error": "Notification not found."}, status=404)
+        return Response({"message": "Notification marked as read."})
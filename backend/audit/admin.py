@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import AuditEvent
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'user', 'action', 'entity_id', 'ip_address']
+    list_filter = ['action']
+    search_fields = ['user__username', 'user__email']
+    list_select_related = ['user']
+
+    # The trail is append-only: it can be read here, never edited.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,134 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+
+from .models import AuditEvent
+
+
+"""_summary_
+
+        Buffered, asynchronous writes of the audit trail.
+        record() is called on the write path of every financial mutation. It builds the
+        event in memory and, once the surrounding database transaction commits, appends
+        it to a per-process buffer, so a rolled-back mutation is never audited and the
+        request itself runs no audit query. A daemon thread writes the buffer with
+        bulk_create every FLUSH_INTERVAL seconds, or as soon as BATCH_SIZE events are
+        waiting, and at interpreter exit, so an event is listed up to FLUSH_INTERVAL
+        seconds after its mutation. A failed flush keeps the events for the next attempt,
+        up to MAX_PENDING. Events still buffered when a process is killed are lost; set
+        ASYNC to False to write every event when its transaction commits instead.
+
+"""
+
+logger = logging.getLogger('spentra.audit')
+
+DEFAULTS = {
+    'ASYNC': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': 50000,
+}
+
+TRANSACTION_CREATE = 'transaction.create'
+TRANSACTION_UPDATE = 'transaction.update'
+TRANSACTION_DELETE = 'transaction.delete'
+BUDGET_SET = 'budget.set'
+BUDGET_UPDATE = 'budget.update'
+PAYMENT_VERIFY = 'payment.verify'
+
+
+def get_setting(name):
+    return getattr(settings, 'AUDIT', {}).get(name, DEFAULTS[name])
+
+
+def field_values(obj, fields):
+    """Current values of ``fields`` on ``obj``; foreign keys give their id, without a query."""
+    values = {}
+    for name in fields:
+        try:
+            attname = obj._meta.get_field(name).attname
+        except (FieldDoesNotExist, AttributeError):
+            attname = name
+        values[name] = getattr(obj, attname, None)
+    return values
+
+
+def client_ip(request):
+    if request is None:
+        return None
+    return request.META.get('REMOTE_ADDR') or None
+
+
+class AuditBuffer:
+    """A thread-safe list of unsaved events, written by a background flusher thread."""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+        # Serializes flushes, so events are written in the order they were buffered.
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self._thread = None
+
+    def add(self, event):
+        with self.lock:
+            self.events.append(event)
+            pending = len(self.events)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='spentra-audit', daemon=True)
+                self._thread.start()
+        if pending >= get_setting('BATCH_SIZE'):
+            self.wake.set()
+
+    def pending(self):
+        with self.lock:
+            return len(self.events)
+
+    def flush(self):
+        """Write every buffered event; returns how many were written."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.events = self.events, []
+            if not batch:
+                return 0
+            try:
+                AuditEvent.objects.bulk_create(batch, batch_size=get_setting('BATCH_SIZE'))
+            except Exception:
+                logger.exception("Writing %d audit events failed; keeping them for the next flush.", len(batch))
+                with self.lock:
+                    self.events = (batch + self.events)[-get_setting('MAX_PENDING'):]
+                return 0
+            return len(batch)
+
+    def _run(self):
+        while True:
+            self.wake.wait(get_setting('FLUSH_INTERVAL'))
+            self.wake.clear()
+            self.flush()
+            # The thread keeps its own connection; drop it between flushes if it went stale.
+            close_old_connections()
+
+
+_buffer = AuditBuffer()
+atexit.register(_buffer.flush)
+
+
+def flush():
+    return _buffer.flush()
+
+
+def record(user_id, action, entity_id=None, data=None, request=None):
+    """Add an event to the audit trail once the current transaction commits."""
+    event = AuditEvent(
+        user_id=user_id, action=action, entity_id=entity_id, data=data or {},
+        ip_address=client_ip(request), created_at=timezone.now(),
+    )
+    if get_setting('ASYNC'):
+        transaction.on_commit(lambda: _buffer.add(event))
+    else:
+        transaction.on_commit(event.save)
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+"""_summary_
+
+        The audit trail of financial mutations.
+        AuditEvent is append-only: rows are only ever inserted, in batches, by
+        audit.log, and saving an existing event or deleting one raises. Events are read
+        per user, newest first, through the (user, created_at) index. ``user`` is empty
+        for payment verifications made without a signed-in user.
+
+"""
+class AuditEvent(models.Model):
+    ACTION_CHOICES = [
+        ('transaction.create', 'Transaction created'),
+        ('transaction.update', 'Transaction updated'),
+        ('transaction.delete', 'Transaction deleted'),
+        ('budget.set', 'Budget set'),
+        ('budget.update', 'Budget updated'),
+        ('payment.verify', 'Payment verified'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='audit_events')
+    action = models.CharField(max_length=32, choices=ACTION_CHOICES)
+    entity_id = models.BigIntegerField(null=True, blank=True)
+    data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Set when the mutation happens, not when its buffered row is written.
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='audit_event_user_time_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Audit events are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Audit events are append-only.")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.action} {self.entity_id or ''}".rstrip()
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from .models import AuditEvent
+
+
+class AuditEventSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = AuditEvent
+        fields = ['id', 'action', 'entity_id', 'data', 'ip_address', 'created_at']
+        read_only_fields = fields
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from .models import AuditEvent
+from .serializers import AuditEventSerializer
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def make_cursor(event):
+    """A URL-safe "<created_at in microseconds>-<id>" cursor pointing after ``event``."""
+    return f"{(event.created_at - EPOCH) // MICROSECOND}-{event.id}"
+
+
+def parse_cursor(cursor):
+    """Split a cursor made by make_cursor(); returns (None, None) if it is malformed."""
+    micros, _, event_id = cursor.partition('-')
+    if not micros.isdigit() or not event_id.isdigit():
+        return None, None
+    return EPOCH + int(micros) * MICROSECOND, int(event_id)
+
+
+"""
+        List the audit trail of the authenticated user, newest first.
+        Expects a GET request with optional ``action`` (e.g. transaction.update), ``limit``
+        (at most 200) and ``cursor`` (the ``next`` value of the previous page).
+        Returns {"results", "next"}; ``next`` is null on the last page. Pages are read
+        from the (user, created_at) index, so every page costs the same. Events are
+        written in the background, so one can take up to AUDIT['FLUSH_INTERVAL'] seconds
+        to appear; set AUDIT['ASYNC'] to False where a write must be listed right away.
+"""
+@query_budget(2)
+class AuditEventListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=400)
+        if limit < 1:
+            return Response({"error": "limit must be >= 1."}, status=400)
+
+        events = AuditEvent.objects.filter(user=request.user).order_by('-created_at', '-id')
+        if request.query_params.get('action'):
+            events = events.filter(action=request.query_params['action'])
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            created_at, event_id = parse_cursor(cursor)
+            if created_at is None:
+                return Response({"error": "cursor is invalid."}, status=400)
+            events = events.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=event_id))
+
+        page = list(events[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = make_cursor(page[-1])
+        return Response({"results": AuditEventSerializer(page, many=True).data, "next": next_cursor})
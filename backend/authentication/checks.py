@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning
+
+
+# Cache backends whose entries only the process that wrote them can see.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def revocation_cache_is_shared(app_configs, **kwargs):
+    """Token revocation lives in the default cache, which every worker must share."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f"CACHES['default'] uses {backend}, so a logout, refresh-token rotation or password "
+        f"reset only revokes tokens in the worker that handled it.",
+        hint="Use a cache shared by every worker, e.g. django.core.cache.backends.redis.RedisCache.",
+        id='authentication.W001',
+    )]
@@ -4,5 +4,7 @@ from django.db import models
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
+    # Embedded in issued JWTs; bumping it revokes every token of the user (see authentication/tokens.py).
+    token_generation = models.PositiveIntegerField(default=0)
 
 # Create your models here.
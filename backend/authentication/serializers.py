@@ -101,15 +101,17 @@ class PasswordResetSerializer(serializers.Serializer):
         # Validate the new password
         validate_password(new_password, user)
 
+        self.user = user
         return attrs
 
     def save(self):
-        email = self.validated_data['email']
         new_password = self.validated_data['new_password']
 
-        user = User.objects.get(email=email)
+        # The user was already loaded by validate().
+        user = self.user
         user.set_password(new_password)
         user.save()
+        return user
 
 class OTPVerifySerializer(serializers.Serializer):
     email = serializers.EmailField()
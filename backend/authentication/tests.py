@@ -1,3 +1,103 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from .checks import revocation_cache_is_shared
+
+
+PASSWORD = 'Old-pass-123!'
+
+
+class TokenRevocationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password=PASSWORD)
+
+    def login(self):
+        response = self.client.post(reverse('login'), {'email': 'a@example.com', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token})
+
+    def can_use(self, access):
+        return self.client.get(reverse('protected'), HTTP_AUTHORIZATION=f"Bearer {access}").status_code == 200
+
+    def test_refresh_rotates_the_refresh_token(self):
+        tokens = self.login()
+        response = self.refresh(tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()
+        self.assertNotEqual(rotated['refresh'], tokens['refresh'])
+        self.assertTrue(self.can_use(rotated['access']))
+        self.assertEqual(self.refresh(rotated['refresh']).status_code, 200)
+
+    def test_reusing_a_refresh_token_signs_out_every_session(self):
+        tokens = self.login()
+        other = self.login()
+        rotated = self.refresh(tokens['refresh']).json()
+
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+        for session in (rotated, other):
+            self.assertFalse(self.can_use(session['access']))
+            self.assertEqual(self.refresh(session['refresh']).status_code, 401)
+        self.assertTrue(self.can_use(self.login()['access']))
+
+    def test_logout_revokes_only_the_tokens_of_the_session(self):
+        tokens = self.login()
+        other = self.login()
+        response = self.client.post(reverse('logout'), {'refresh': tokens['refresh']},
+                                    HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(self.can_use(tokens['access']))
+        self.assertTrue(self.can_use(other['access']))
+        # Presenting the signed-out refresh token again is reuse, which signs out everything.
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+        self.assertFalse(self.can_use(other['access']))
+
+    def test_logout_of_all_devices_revokes_every_session(self):
+        tokens = self.login()
+        other = self.login()
+        response = self.client.post(reverse('logout'), {'all': 'true'}, HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(response.status_code, 200)
+
+        for session in (tokens, other):
+            self.assertFalse(self.can_use(session['access']))
+            self.assertEqual(self.refresh(session['refresh']).status_code, 401)
+
+    def test_password_reset_revokes_every_session(self):
+        tokens = self.login()
+        response = self.client.post(reverse('password_reset'), {
+            'email': 'a@example.com', 'old_password': PASSWORD, 'new_password': 'New-pass-456!',
+        })
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(self.can_use(tokens['access']))
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+
+    def test_revocation_survives_a_cold_cache(self):
+        tokens = self.login()
+        self.client.post(reverse('logout'), {'all': 'true'}, HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        cache.clear()
+        self.assertFalse(self.can_use(tokens['access']))
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+
+
+class RevocationCacheCheckTests(SimpleTestCase):
+
+    @override_settings(DEBUG=False, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_warns_about_a_process_local_cache(self):
+        self.assertEqual([warning.id for warning in revocation_cache_is_shared(None)], ['authentication.W001'])
+
+    @override_settings(DEBUG=False, CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                        'LOCATION': 'redis://localhost:6379'}})
+    def test_accepts_a_shared_cache(self):
+        self.assertEqual(revocation_cache_is_shared(None), [])
+
+    @override_settings(DEBUG=True, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_allows_a_process_local_cache_in_development(self):
+        self.assertEqual(revocation_cache_is_shared(None), [])
@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+"""_summary_
+
+        JWT revocation backed by the shared cache.
+        Two checks decide whether a token is still valid:
+        - the denylist holds the ``jti`` of single revoked tokens (logged-out sessions and
+          rotated refresh tokens), each entry expiring with the token it names;
+        - the user's token generation is copied into every token as the ``gen`` claim,
+          and revoke_all_tokens() bumps it, so every earlier token of the user fails at
+          once, in O(1), however many were issued.
+        API requests compare the generation with the user row that authentication loads
+        anyway, so they cost one cache read and no extra query, even on a cold cache.
+        Checks that have no user row (the SSE stream, token refresh) read the generation
+        from the cache, and from the database only when the cache has lost it.
+        Refresh tokens are rotated on every use; presenting an already-rotated refresh
+        token is treated as theft and revokes all of the user's tokens.
+
+"""
+
+GENERATION_CLAIM = 'gen'
+DENYLIST_CACHE_KEY = 'jwt_denylist_{}'
+GENERATION_CACHE_KEY = 'jwt_generation_{}'
+
+
+def generation_timeout():
+    return int(jwt_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+def current_generation(user_id, cached=None):
+    if cached is not None:
+        return cached
+    generation = get_user_model().objects.filter(pk=user_id).values_list('token_generation', flat=True).first()
+    generation = generation or 0
+    cache.set(GENERATION_CACHE_KEY.format(user_id), generation, generation_timeout())
+    return generation
+
+
+def is_denied(token):
+    return cache.get(DENYLIST_CACHE_KEY.format(token.get(jwt_settings.JTI_CLAIM))) is not None
+
+
+def is_revoked(token):
+    """Both checks, for callers that have not loaded the user."""
+    user_id = token.get(jwt_settings.USER_ID_CLAIM)
+    deny_key = DENYLIST_CACHE_KEY.format(token.get(jwt_settings.JTI_CLAIM))
+    generation_key = GENERATION_CACHE_KEY.format(user_id)
+    values = cache.get_many([deny_key, generation_key])
+    if deny_key in values:
+        return True
+    return token.get(GENERATION_CLAIM, 0) < current_generation(user_id, values.get(generation_key))
+
+
+def is_superseded(token):
+    """Whether revoke_all_tokens() ran after ``token`` was issued; ignores the denylist."""
+    user_id = token.get(jwt_settings.USER_ID_CLAIM)
+    cached = cache.get(GENERATION_CACHE_KEY.format(user_id))
+    return token.get(GENERATION_CLAIM, 0) < current_generation(user_id, cached)
+
+
+def seconds_left(token):
+    expires = datetime.fromtimestamp(token['exp'], tz=timezone.utc)
+    return max(int((expires - datetime.now(tz=timezone.utc)).total_seconds()), 1)
+
+
+def deny(token):
+    """Add ``token`` to the denylist until it expires; returns False if it already was there."""
+    return cache.add(DENYLIST_CACHE_KEY.format(token[jwt_settings.JTI_CLAIM]), 1, seconds_left(token))
+
+
+def revoke_all_tokens(user):
+    """Invalidate every token issued to ``user`` so far."""
+    model = get_user_model()
+    model.objects.filter(pk=user.pk).update(token_generation=F('token_generation') + 1)
+    generation = model.objects.filter(pk=user.pk).values_list('token_generation', flat=True).get()
+    user.token_generation = generation
+    cache.set(GENERATION_CACHE_KEY.format(user.pk), generation, generation_timeout())
+
+
+class GenerationalRefreshToken(RefreshToken):
+    """A refresh token carrying the user's token generation, copied into its access tokens."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[GENERATION_CLAIM] = getattr(user, 'token_generation', 0)
+        # Primes the cache so the token's first authenticated request needs no query either.
+        cache.add(GENERATION_CACHE_KEY.format(user.pk), token[GENERATION_CLAIM], generation_timeout())
+        return token
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_denied(token):
+            raise InvalidToken({"detail": "Token has been revoked.", "code": "token_revoked"})
+        return token
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if validated_token.get(GENERATION_CLAIM, 0) < user.token_generation:
+            raise InvalidToken({"detail": "Token has been revoked.", "code": "token_revoked"})
+        return user
+
+
+class GenerationalTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = GenerationalRefreshToken
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = GenerationalRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_superseded(refresh):
+            raise InvalidToken({"detail": "Token has been revoked.", "code": "token_revoked"})
+        if not deny(refresh):
+            # Only one request may rotate a refresh token; a second one means it leaked.
+            user = get_user_model()(pk=refresh[jwt_settings.USER_ID_CLAIM])
+            revoke_all_tokens(user)
+            raise exceptions.AuthenticationFailed("Refresh token was already used; all sessions have been signed out.")
+        # With ROTATE_REFRESH_TOKENS the parent issues a new refresh token with a new jti.
+        return super().validate(attrs)
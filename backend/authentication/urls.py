@@ -1,12 +1,13 @@
 print("authentication/urls.py loaded")
 
 from django.urls import path
-from .views import RegisterView, LoginView, PasswordResetView, OTPVerifyView, ProtectedView
+from .views import RegisterView, LoginView, LogoutView, PasswordResetView, OTPVerifyView, ProtectedView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('auth/logout/', LogoutView.as_view(), name='logout'),
     path('otp-verify/', OTPVerifyView.as_view(), name='otp_verify'),
     path('password-reset/', PasswordResetView.as_view(), name='password_reset'),
     path('auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -7,14 +7,18 @@ from .serializers import RegisterSerializer, LoginSerializer,PasswordResetSerial
 from .serializers import OTPVerifySerializer
 from django.core.mail import send_mail
 from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
+from monitoring.querybudget import query_budget
+from .tokens import GenerationalRefreshToken, deny, revoke_all_tokens
 
 
 User = get_user_model()
 
 
+@query_budget(3)
 class RegisterView(APIView):
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
@@ -42,6 +46,7 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(3)
 class LoginView(APIView):
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -54,7 +59,7 @@ class LoginView(APIView):
                 user = User.objects.get(email=email)
                 user = authenticate(username=user.username, password=password)
                 if user:
-                    refresh = RefreshToken.for_user(user)
+                    refresh = GenerationalRefreshToken.for_user(user)
                     return Response({
                         "message": "Login successful.",
                         "access": str(refresh.access_token),
@@ -74,15 +79,50 @@ from rest_framework import status
 from .serializers import PasswordResetSerializer
 
 
+@query_budget(4)
 class PasswordResetView(APIView):
     def post(self, request):
         serializer = PasswordResetSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()  # Password is reset
+            user = serializer.save()  # Password is reset
+            # Sessions opened with the old password must not outlive it.
+            revoke_all_tokens(user)
             return Response({"message": "Password has been reset successfully."}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+"""_summary_
+
+        Signs the caller out. The access token of the request, and the refresh token if
+        one is posted, are added to the revocation list; with "all": true every token
+        of the user is revoked instead, signing out all of their devices.
+
+"""
+
+
+@query_budget(3)
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.data.get('all') in (True, 'true', '1'):
+            revoke_all_tokens(request.user)
+            return Response({"message": "Signed out from all devices."}, status=status.HTTP_200_OK)
+
+        raw_refresh = request.data.get('refresh')
+        if raw_refresh:
+            try:
+                refresh = GenerationalRefreshToken(raw_refresh)
+            except TokenError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+                return Response({"error": "This refresh token belongs to another user."}, status=status.HTTP_400_BAD_REQUEST)
+            deny(refresh)
+        deny(request.auth)
+        return Response({"message": "Signed out."}, status=status.HTTP_200_OK)
+
+
+@query_budget(2)
 class OTPVerifyView(APIView):
     def post(self, request):
         serializer = OTPVerifySerializer(data=request.data)
@@ -94,6 +134,7 @@ class OTPVerifyView(APIView):
 
 
 
+@query_budget(1)
 class ProtectedView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1,6 +1,8 @@
 import requests
 from django.http import JsonResponse
 from django.conf import settings
+from monitoring.instrumentation import span
+from audit import log as audit
 
 class KhaltiVerifyView:
     def post(self, request):
@@ -21,7 +23,19 @@ class KhaltiVerifyView:
         }
 
         # Send the verification request to Khalti
-        response = requests.post(khalti_verify_url, headers=headers, data=payload)
+        with span('http'):
+            response = requests.post(khalti_verify_url, headers=headers, data=payload)
+
+        # Every verification attempt is audited, successful or not (never the token itself).
+        user = getattr(request, 'user', None)
+        verified = response.status_code == 200
+        audit.record(
+            user.pk if user is not None and user.is_authenticated else None,
+            audit.PAYMENT_VERIFY,
+            data={"amount": amount, "verified": verified, "khalti_status": response.status_code,
+                  "idx": response.json().get('idx') if verified else None},
+            request=request,
+        )
 
         # Check the response from Khalti
         if response.status_code == 200:
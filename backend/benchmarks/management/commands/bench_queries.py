@@ -0,0 +1,96 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Sum
+from rest_framework.renderers import JSONRenderer
+
+from CRUD.models import Budget, Transaction
+from CRUD.serializers import TransactionSerializer
+from benchmarks import results
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark serializers and the aggregate queries behind the dashboard and budget views."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user to benchmark. Defaults to the user with most transactions.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--rows', type=int, default=1000, help='Rows serialized by the serializer benchmarks.')
+        parser.add_argument('--only', nargs='*', help='Run only the named benchmarks.')
+        parser.add_argument('--output', help='Result file path. Defaults to benchmarks/results/queries-<timestamp>.json.')
+
+    def handle(self, *args, **options):
+        user = self.pick_user(options['user'])
+        rows = list(Transaction.objects.filter(user=user).order_by('-date_created')[:options['rows']])
+        data = TransactionSerializer(rows, many=True).data
+
+        benchmarks = {
+            'transactions_list_query': lambda: list(
+                Transaction.objects.filter(user=user).order_by('-date_created')
+            ),
+            'transactions_serialize': lambda: TransactionSerializer(rows, many=True).data,
+            'transactions_render_json': lambda: JSONRenderer().render(data),
+            'summary_total_income': lambda: Transaction.objects.filter(
+                user=user, type='income').aggregate(Sum('amount')),
+            'summary_total_expenses': lambda: Transaction.objects.filter(
+                user=user, type='expense').aggregate(Sum('amount')),
+            'summary_by_category': lambda: list(
+                Transaction.objects.filter(user=user).values('category__name').annotate(total=Sum('amount'))
+            ),
+            'summary_single_pass': lambda: list(
+                Transaction.objects.filter(user=user).values('type', 'category__name').annotate(
+                    total=Sum('amount'), count=Count('id'))
+            ),
+            'budget_analysis': lambda: (
+                Budget.objects.filter(user=user).first(),
+                Transaction.objects.filter(user=user, type='expense').aggregate(Sum('amount')),
+            ),
+        }
+        if options['only']:
+            unknown = set(options['only']) - set(benchmarks)
+            if unknown:
+                raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+            benchmarks = {name: benchmarks[name] for name in options['only']}
+
+        summaries = {}
+        for name, func in benchmarks.items():
+            for _ in range(options['warmup']):
+                func()
+            samples = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                func()
+                samples.append(time.perf_counter() - started)
+            summaries[name] = results.summarize(samples)
+            self.stdout.write(
+                f"{name:<28} p50 {summaries[name]['p50_ms']:>10.3f}ms  p95 {summaries[name]['p95_ms']:>10.3f}ms"
+            )
+
+        path = results.save('queries', summaries, options['output'], extra={
+            'dataset': {
+                'user_id': user.pk,
+                'user_transactions': Transaction.objects.filter(user=user).count(),
+                'total_transactions': Transaction.objects.count(),
+                'serialized_rows': len(rows),
+            },
+        })
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
+
+    @staticmethod
+    def pick_user(email):
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {email}.")
+        busiest = (
+            Transaction.objects.values('user').annotate(n=Count('id')).order_by('-n').first()
+        )
+        if busiest is None:
+            raise CommandError("No transactions found. Run seed_benchmark_data first.")
+        return User.objects.get(pk=busiest['user'])
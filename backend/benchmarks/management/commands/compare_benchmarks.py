@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import results
+
+
+class Command(BaseCommand):
+    help = "Compare two benchmark result files and flag regressions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline')
+        parser.add_argument('current')
+        parser.add_argument('--metric', default='p95_ms',
+                            help='Metric to compare, e.g. p50_ms, p95_ms, p99_ms or throughput_rps.')
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help='Relative change counted as a regression (0.10 = 10%%).')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error when any benchmark regressed.')
+
+    def handle(self, *args, **options):
+        baseline = results.load(options['baseline'])
+        current = results.load(options['current'])
+        if baseline['kind'] != current['kind']:
+            raise CommandError(f"Cannot compare a {baseline['kind']} run with a {current['kind']} run.")
+
+        rows = results.compare(baseline, current, options['metric'], options['threshold'])
+        regressions = 0
+        for name, before, after, change, regressed in rows:
+            line = f"{name:<32} {before:>10.2f} -> {after:>10.2f}  {change:+8.1%}"
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION"))
+            else:
+                self.stdout.write(line)
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{regressions} benchmark(s) regressed by more than {options['threshold']:.0%}.")
+        self.stdout.write(f"{len(rows)} benchmark(s) compared on {options['metric']}, {regressions} regression(s).")
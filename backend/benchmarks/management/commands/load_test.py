@@ -0,0 +1,129 @@
+import itertools
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import results
+from .seed_benchmark_data import DEFAULT_PASSWORD, bench_email
+
+
+DEFAULT_ENDPOINTS = [
+    '/crud/transactions/all/',
+    '/crud/dashboard/history/',
+    '/crud/dashboard/summary/',
+    '/crud/categories/all/',
+    '/crud/budget/retrieve/',
+    '/crud/budget/analysis/',
+]
+
+
+class Command(BaseCommand):
+    help = "Drive HTTP load against a running server as the generated benchmark users and report latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='GET endpoint to exercise; repeat for several. Defaults to the dashboard endpoints.')
+        parser.add_argument('--users', type=int, default=10, help='Number of benchmark users to log in as.')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run.')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+        parser.add_argument('--output', help='Result file path. Defaults to benchmarks/results/load-<timestamp>.json.')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.password = options['password']
+        self.timeout = options['timeout']
+        endpoints = options['endpoints'] or DEFAULT_ENDPOINTS
+
+        self.tokens = {}
+        for index in range(options['users']):
+            self.tokens[index] = self.login(requests.Session(), index)
+        self.stdout.write(f"Logged in {len(self.tokens)} users through /auth/login/.")
+
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.work = itertools.cycle(itertools.product(self.tokens, endpoints))
+        self.deadline = time.perf_counter() + options['duration']
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for future in [pool.submit(self.worker) for _ in range(options['concurrency'])]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        summaries = {}
+        for endpoint in endpoints:
+            summary = results.summarize(self.samples[endpoint], elapsed)
+            summary['errors'] = self.errors[endpoint]
+            summary['statuses'] = dict(self.statuses[endpoint])
+            summaries[endpoint] = summary
+            self.stdout.write(
+                f"{endpoint:<32} {summary['count']:>7} req  {summary['throughput_rps']:>9.1f} req/s  "
+                f"p50 {summary['p50_ms']:>8.1f}ms  p95 {summary['p95_ms']:>8.1f}ms  "
+                f"p99 {summary['p99_ms']:>8.1f}ms  errors {summary['errors']}"
+            )
+        all_samples = [sample for endpoint in endpoints for sample in self.samples[endpoint]]
+        summaries['all'] = results.summarize(all_samples, elapsed)
+        summaries['all']['errors'] = sum(self.errors.values())
+
+        path = results.save('load', summaries, options['output'], extra={
+            'config': {
+                'base_url': self.base_url,
+                'users': options['users'],
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'endpoints': endpoints,
+            },
+        })
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
+
+    def login(self, session, index):
+        response = session.post(
+            f'{self.base_url}/auth/login/',
+            data={'email': bench_email(index), 'password': self.password},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise CommandError(
+                f"Login failed for {bench_email(index)} ({response.status_code}). Run seed_benchmark_data first."
+            )
+        return response.json()['access']
+
+    def worker(self):
+        session = requests.Session()
+        while time.perf_counter() < self.deadline:
+            with self.lock:
+                user, endpoint = next(self.work)
+                token = self.tokens[user]
+            started = time.perf_counter()
+            try:
+                response = session.get(
+                    f'{self.base_url}{endpoint}',
+                    headers={'Authorization': f'Bearer {token}'},
+                    timeout=self.timeout,
+                )
+                status = response.status_code
+            except requests.RequestException:
+                status = 'exception'
+            duration = time.perf_counter() - started
+
+            if status == 401:
+                # Access tokens live 15 minutes; mint a new one and keep going.
+                token = self.login(session, user)
+                with self.lock:
+                    self.tokens[user] = token
+                continue
+            with self.lock:
+                self.statuses[endpoint][str(status)] += 1
+                if status == 'exception' or status >= 400:
+                    self.errors[endpoint] += 1
+                else:
+                    self.samples[endpoint].append(duration)
@@ -0,0 +1,100 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from CRUD.models import Budget, Category, Transaction
+
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'bench_user_'
+EMAIL_DOMAIN = 'bench.spentra.local'
+DEFAULT_PASSWORD = 'Bench!Pass123'
+
+
+def bench_email(index):
+    return f'{USERNAME_PREFIX}{index}@{EMAIL_DOMAIN}'
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, categories, budgets and transactions for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--transactions', type=int, default=100_000, help='Total transactions across all users.')
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--days', type=int, default=365, help='Spread transaction dates over this many days.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password given to every generated user.')
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated benchmark users first.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['flush']:
+            deleted, _ = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+            self.stdout.write(f"Deleted {deleted} existing benchmark rows.")
+
+        # Hash once: per-user hashing would dominate generation time.
+        password = make_password(options['password'])
+        start_index = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').count()
+        users = [
+            User(username=f'{USERNAME_PREFIX}{i}', email=bench_email(i), password=password)
+            for i in range(start_index, start_index + options['users'])
+        ]
+        for offset in range(0, len(users), batch_size):
+            User.objects.bulk_create(users[offset:offset + batch_size])
+        user_ids = list(
+            User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').order_by('id').values_list('id', flat=True)
+        )[start_index:]
+        self.stdout.write(f"Created {len(user_ids)} users.")
+
+        Category.objects.bulk_create(
+            [Category(name=f'Bench category {i}') for i in range(options['categories'])]
+        )
+        category_ids = list(
+            Category.objects.filter(name__startswith='Bench category ').values_list('id', flat=True)
+        )
+
+        Budget.objects.bulk_create(
+            [Budget(user_id=user_id, monthly_budget=Decimal(rng.randrange(200, 5000))) for user_id in user_ids],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+        now = timezone.now()
+        total = options['transactions']
+        window = options['days'] * 86400
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            rows = []
+            for _ in range(size):
+                kind = 'income' if rng.random() < 0.2 else 'expense'
+                rows.append(Transaction(
+                    user_id=rng.choice(user_ids),
+                    category_id=rng.choice(category_ids),
+                    type=kind,
+                    amount=Decimal(rng.randrange(100, 500_000 if kind == 'income' else 50_000)) / 100,
+                    date_created=now - timedelta(seconds=rng.randrange(window)),
+                ))
+            with transaction.atomic():
+                Transaction.objects.bulk_create(rows)
+            created += size
+            self.stdout.write(f"\r{created}/{total} transactions", ending='')
+            self.stdout.flush()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(user_ids)} users and {total} transactions in {time.perf_counter() - started:.1f}s."
+        ))
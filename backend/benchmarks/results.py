@@ -0,0 +1,103 @@
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+
+"""_summary_
+
+        Helpers shared by the benchmark management commands: percentile summaries of
+        timing samples, the environment block stored with every run, and loading, saving
+        and comparing result files. Every result file has the same shape,
+        {"kind", "environment", "results": {name: summary}}, so any two runs of the same
+        kind can be compared with `manage.py compare_benchmarks`.
+
+"""
+
+DEFAULT_OUTPUT_DIR = Path(settings.BASE_DIR) / 'benchmarks' / 'results'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed=None):
+    """Summarize timing samples (seconds) in milliseconds, with throughput when elapsed is given."""
+    values = sorted(samples)
+    summary = {
+        'count': len(values),
+        'min_ms': round(values[0] * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+    if elapsed:
+        summary['throughput_rps'] = round(len(values) / elapsed, 2)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def save(kind, results, output=None, extra=None):
+    """Write a result file and return its path."""
+    if output:
+        path = Path(output)
+    else:
+        DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        path = DEFAULT_OUTPUT_DIR / f'{kind}-{timezone.now():%Y%m%dT%H%M%S}.json'
+    document = {'kind': kind, 'environment': environment(), 'results': results}
+    if extra:
+        document.update(extra)
+    path.write_text(json.dumps(document, indent=2))
+    return path
+
+
+def load(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline, current, metric='p95_ms', threshold=0.10):
+    """Return (name, before, after, change, regressed) rows for benchmarks present in both runs."""
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name, {}).get(metric)
+        after = result.get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0.0
+        if metric == 'throughput_rps':
+            regressed = change < -threshold
+        else:
+            regressed = change > threshold
+        rows.append((name, before, after, change, regressed))
+    return rows
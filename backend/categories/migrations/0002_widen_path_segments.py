@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+OLD_WIDTH = 10
+NEW_WIDTH = 15
+
+
+def repad(old_width, new_width):
+    def forwards(apps, schema_editor):
+        CategoryNode = apps.get_model('categories', 'CategoryNode')
+        nodes = CategoryNode.objects.using(schema_editor.connection.alias)
+        changed = []
+        for node in nodes.only('pk', 'path').iterator(chunk_size=2000):
+            segments = [node.path[i:i + old_width] for i in range(0, len(node.path), old_width)]
+            node.path = ''.join(f"{int(segment):0{new_width}d}" for segment in segments)
+            changed.append(node)
+            if len(changed) >= 2000:
+                nodes.bulk_update(changed, ['path'])
+                changed = []
+        nodes.bulk_update(changed, ['path'])
+    return forwards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='categorynode',
+            name='path',
+            field=models.CharField(db_index=True, max_length=375),
+        ),
+        migrations.RunPython(repad(OLD_WIDTH, NEW_WIDTH), repad(NEW_WIDTH, OLD_WIDTH)),
+    ]
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        A CategoryNode places a category in one user's category tree. ``path`` is the
+        materialized path from the root: the ids of the node's ancestors and of its own
+        category, each zero-padded to categories.tree.SEGMENT_WIDTH digits. A subtree is
+        therefore a path prefix, answered by an indexed LIKE 'prefix%' scan, and the
+        ancestor at any depth is a fixed-length prefix of the path.
+
+"""
+class CategoryNode(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='category_nodes')
+    category = models.ForeignKey('CRUD.Category', on_delete=models.CASCADE, related_name='tree_nodes')
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children')
+    # MAX_DEPTH segments of SEGMENT_WIDTH digits (see categories.tree).
+    path = models.CharField(max_length=375, db_index=True)
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category'], name='category_node_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'path'], name='category_node_user_path_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.path}"
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import CategoryNode
+
+
+class CategoryNodeSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='category.name', read_only=True)
+    parent = serializers.IntegerField(source='parent.category_id', read_only=True, default=None)
+
+    class Meta:
+        model = CategoryNode
+        fields = ['category', 'name', 'parent', 'depth', 'path']
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from CRUD.models import Category, Transaction
+from . import tree
+from .models import CategoryNode
+
+
+class TreeTests(TestCase):
+    """Food > Dining > Coffee, and Travel."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.food, self.dining, self.coffee, self.travel = (
+            Category.objects.create(name=name) for name in ('Food', 'Dining', 'Coffee', 'Travel')
+        )
+        tree.place(self.user, self.food.pk)
+        tree.place(self.user, self.dining.pk, self.food.pk)
+        tree.place(self.user, self.coffee.pk, self.dining.pk)
+        tree.place(self.user, self.travel.pk)
+
+    def node(self, category):
+        return tree.get_node(self.user, category.pk)
+
+    def path_of(self, *categories):
+        return ''.join(tree.segment(category.pk) for category in categories)
+
+    def assertPlaced(self, category, *ancestors):
+        node = self.node(category)
+        self.assertEqual((node.path, node.depth), (self.path_of(*ancestors, category), len(ancestors) + 1))
+        self.assertEqual(node.parent_id, self.node(ancestors[-1]).pk if ancestors else None)
+
+    def spend(self, amount, category=None, type='expense'):
+        Transaction.objects.create(user=self.user, amount=Decimal(amount), type=type, category=category)
+
+    def test_place_builds_paths_from_the_root(self):
+        self.assertPlaced(self.coffee, self.food, self.dining)
+        self.assertEqual(tree.category_of(self.node(self.coffee).path), self.coffee.pk)
+
+    def test_place_rejects_bad_parents_and_repeats(self):
+        other = Category.objects.create(name='Other')
+        with self.assertRaises(tree.TreeError):
+            tree.place(self.user, other.pk, Category.objects.create(name='Unplaced').pk)
+        with self.assertRaises(tree.TreeError):
+            tree.place(self.user, self.coffee.pk, self.travel.pk)
+
+    def test_place_limits_the_depth(self):
+        parent = self.travel
+        for level in range(tree.MAX_DEPTH - 1):
+            child = Category.objects.create(name=f"Level {level}")
+            tree.place(self.user, child.pk, parent.pk)
+            parent = child
+        with self.assertRaises(tree.TreeError):
+            tree.place(self.user, Category.objects.create(name='Too deep').pk, parent.pk)
+
+    def test_move_rewrites_the_whole_subtree(self):
+        moved = tree.move(self.node(self.dining), self.travel.pk)
+        self.assertEqual(moved.path, self.path_of(self.travel, self.dining))
+        self.assertPlaced(self.dining, self.travel)
+        self.assertPlaced(self.coffee, self.travel, self.dining)
+        self.assertPlaced(self.food)
+
+        tree.move(self.node(self.dining))
+        self.assertPlaced(self.dining)
+        self.assertPlaced(self.coffee, self.dining)
+
+    def test_move_under_its_own_subtree_is_rejected(self):
+        with self.assertRaises(tree.TreeError):
+            tree.move(self.node(self.food), self.coffee.pk)
+        self.assertPlaced(self.coffee, self.food, self.dining)
+
+    def test_remove_moves_the_children_up(self):
+        tree.remove(self.node(self.dining))
+        self.assertIsNone(self.node(self.dining))
+        self.assertPlaced(self.coffee, self.food)
+        self.assertEqual(CategoryNode.objects.count(), 3)
+
+    def test_subtree_totals(self):
+        self.spend('10.00', self.food)
+        self.spend('4.50', self.coffee)
+        self.spend('100.00', self.coffee, type='income')
+        self.spend('300.00', self.travel)
+        self.spend('7.00')
+        totals = tree.subtree_totals(Transaction.objects.all(), self.user, self.node(self.dining))
+        self.assertEqual(totals, {'total_income': Decimal('100.00'), 'total_expenses': Decimal('4.50')})
+        totals = tree.subtree_totals(Transaction.objects.filter(type='expense'), self.user, self.node(self.food))
+        self.assertEqual(totals, {'total_income': None, 'total_expenses': Decimal('14.50')})
+
+    def test_rollup_groups_categories_under_their_ancestor(self):
+        self.spend('10.00', self.food)
+        self.spend('2.00', self.dining)
+        self.spend('4.50', self.coffee)
+        self.spend('300.00', self.travel)
+        self.spend('7.00', Category.objects.create(name='Not in the tree'))
+
+        def totals(depth):
+            return {row['category__name']: row['total']
+                    for row in tree.rollup(Transaction.objects.all(), self.user, depth)}
+
+        self.assertEqual(totals(1), {None: Decimal('7.00'), 'Food': Decimal('16.50'), 'Travel': Decimal('300.00')})
+        self.assertEqual(totals(2), {None: Decimal('7.00'), 'Food': Decimal('10.00'),
+                                     'Dining': Decimal('6.50'), 'Travel': Decimal('300.00')})
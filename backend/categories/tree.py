@@ -0,0 +1,161 @@
+from django.db import router, transaction
+from django.db.models import F, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Concat, Substr
+
+from .models import CategoryNode
+
+
+"""_summary_
+
+        Materialized-path operations on per-user category trees.
+        Every path segment has the same width, so:
+        - a subtree is every node whose path starts with the subtree root's path,
+        - the ancestor of a node at depth d is the first d * SEGMENT_WIDTH characters
+          of its path, which SQL can group by directly,
+        - moving a subtree rewrites all of its paths with one UPDATE.
+        Totals and rollups are therefore single queries over the transaction table
+        joined to the user's nodes, with no recursive traversal in Python.
+
+"""
+
+# Category ids are issued per shard from n * SHARDING['ID_BLOCK'], so a segment holds
+# 15 digits: 1000 shards of the default block (see sharding.checks).
+SEGMENT_WIDTH = 15
+MAX_DEPTH = 25
+
+
+class TreeError(Exception):
+    pass
+
+
+def segment(category_id):
+    return f"{category_id:0{SEGMENT_WIDTH}d}"
+
+
+def category_of(path):
+    """The category id at the end of a path or path prefix."""
+    return int(path[-SEGMENT_WIDTH:])
+
+
+def get_node(user, category_id):
+    return CategoryNode.objects.filter(user=user, category_id=category_id).select_related('category').first()
+
+
+def place(user, category_id, parent_id=None):
+    """Add a category to the user's tree, as a root or under the node of ``parent_id``."""
+    parent = None
+    prefix = ''
+    if parent_id is not None:
+        parent = get_node(user, parent_id)
+        if parent is None:
+            raise TreeError("The parent category is not in your category tree.")
+        prefix = parent.path
+    if len(prefix) // SEGMENT_WIDTH >= MAX_DEPTH:
+        raise TreeError(f"Categories can be nested at most {MAX_DEPTH} levels deep.")
+    if CategoryNode.objects.filter(user=user, category_id=category_id).exists():
+        raise TreeError("This category is already in your category tree.")
+    return CategoryNode.objects.create(
+        user=user, category_id=category_id, parent=parent,
+        path=prefix + segment(category_id), depth=len(prefix) // SEGMENT_WIDTH + 1,
+    )
+
+
+def _rewrite_subtree(node, new_prefix):
+    # One UPDATE re-roots every path under ``node``, the node itself included.
+    CategoryNode.objects.filter(user_id=node.user_id, path__startswith=node.path).update(
+        path=Concat(Value(new_prefix), Substr('path', len(node.path) + 1)),
+        depth=F('depth') + (len(new_prefix) - len(node.path)) // SEGMENT_WIDTH,
+    )
+
+
+def move(node, parent_id=None):
+    """Move ``node`` and its subtree under the node of ``parent_id``, or to the root."""
+    parent = None
+    prefix = ''
+    if parent_id is not None:
+        parent = get_node(node.user_id, parent_id)
+        if parent is None:
+            raise TreeError("The parent category is not in your category tree.")
+        if parent.path.startswith(node.path):
+            raise TreeError("A category cannot be moved under itself.")
+        prefix = parent.path
+    new_path = prefix + segment(node.category_id)
+    deepest = max(
+        CategoryNode.objects.filter(user_id=node.user_id, path__startswith=node.path)
+        .values_list('depth', flat=True), default=node.depth,
+    )
+    if deepest + (len(new_path) - len(node.path)) // SEGMENT_WIDTH > MAX_DEPTH:
+        raise TreeError(f"Categories can be nested at most {MAX_DEPTH} levels deep.")
+
+    with transaction.atomic(using=router.db_for_write(CategoryNode, instance=node)):
+        _rewrite_subtree(node, new_path)
+        CategoryNode.objects.filter(pk=node.pk).update(parent=parent)
+    node.parent = parent
+    node.path = new_path
+    node.depth = len(new_path) // SEGMENT_WIDTH
+    return node
+
+
+def remove(node):
+    """Take ``node`` out of the tree; its children move up to its parent."""
+    with transaction.atomic(using=router.db_for_write(CategoryNode, instance=node)):
+        CategoryNode.objects.filter(parent=node).update(parent=node.parent_id)
+        children = CategoryNode.objects.filter(user_id=node.user_id, path__startswith=node.path).exclude(pk=node.pk)
+        # Dropping the node's own segment from the middle of each descendant path.
+        children.update(
+            path=Concat(Value(node.path[:-SEGMENT_WIDTH]), Substr('path', len(node.path) + 1)),
+            depth=F('depth') - 1,
+        )
+        node.delete()
+
+
+def with_nodes(transactions, user):
+    """Annotate ``transactions`` with ``node`` joined to the user's tree (LEFT JOIN)."""
+    return transactions.annotate(node=FilteredRelation('category__tree_nodes', condition=Q(category__tree_nodes__user=user)))
+
+
+def in_subtree(transactions, user, node):
+    """Restrict ``transactions`` to categories in the subtree rooted at ``node``."""
+    return with_nodes(transactions, user).filter(node__path__startswith=node.path)
+
+
+def sum_by(transactions, field):
+    return list(transactions.values(field).annotate(total=Sum('amount')).order_by(field))
+
+
+def subtree_totals(transactions, user, node, aggregate=sum_by):
+    """Income and expense totals over the subtree rooted at ``node``, in one query.
+
+    ``aggregate`` is as for rollup(). Returns total_income and total_expenses, None without rows.
+    """
+    totals = {row['type']: row['total'] for row in aggregate(in_subtree(transactions, user, node), 'type')}
+    return {'total_income': totals.get('income'), 'total_expenses': totals.get('expense')}
+
+
+def rollup(transactions, user, depth, aggregate=sum_by):
+    """Totals per category, with every category rolled up to its ancestor at ``depth``.
+
+    Categories shallower than ``depth`` keep their own total; transactions whose
+    category is not in the user's tree are grouped under ``category: None``.
+    ``aggregate(queryset, field)`` sums the annotated queryset per ``field``; pass
+    another one to change how totals are computed, e.g. across currencies.
+    Returns a list of dicts with category, category__name, path and total.
+    """
+    rows = aggregate(
+        with_nodes(transactions, user).annotate(ancestor=Substr('node__path', 1, depth * SEGMENT_WIDTH)),
+        'ancestor',
+    )
+    rows.sort(key=lambda row: row['ancestor'] or '')
+    names = dict(
+        CategoryNode.objects.filter(user=user, path__in=[row['ancestor'] for row in rows if row['ancestor']])
+        .values_list('path', 'category__name')
+    )
+    return [
+        {
+            'category': category_of(row['ancestor']) if row['ancestor'] else None,
+            'category__name': names.get(row['ancestor']),
+            'path': row['ancestor'],
+            'total': row['total'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CategoryTreeView, CategoryNodeView, CategorySubtreeTotalsView
+
+urlpatterns = [
+    path('', CategoryTreeView.as_view(), name='category-tree'),
+    path('<int:id>/', CategoryNodeView.as_view(), name='category-node'),
+    path('<int:id>/totals/', CategorySubtreeTotalsView.as_view(), name='category-subtree-totals'),
+]
@@ -0,0 +1,101 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from CRUD.models import Category, Transaction
+from currency import conversion
+from currency.rates import MissingRate
+from monitoring.querybudget import query_budget
+from .models import CategoryNode
+from .serializers import CategoryNodeSerializer
+from .tree import TreeError, get_node, move, place, remove, subtree_totals
+
+
+def parse_parent(data):
+    parent = data.get('parent')
+    if parent in (None, ''):
+        return None
+    return int(parent)
+
+
+"""
+        Retrieve the authenticated user's category tree, or add a category to it.
+        Expects a GET request, or a POST request with ``category`` and an optional ``parent``.
+        Nodes are returned in depth-first order, so each parent precedes its children.
+"""
+@query_budget(4)
+class CategoryTreeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        nodes = CategoryNode.objects.filter(user=request.user).select_related('category', 'parent').order_by('path')
+        return Response(CategoryNodeSerializer(nodes, many=True).data)
+
+    def post(self, request):
+        try:
+            category = get_object_or_404(Category, id=int(request.data.get('category')))
+            node = place(request.user, category.pk, parse_parent(request.data))
+        except (TypeError, ValueError):
+            return Response({"error": "category and parent must be category ids."}, status=400)
+        except TreeError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response(CategoryNodeSerializer(node).data, status=201)
+
+
+"""
+        Move a category within the authenticated user's tree, or remove it from the tree.
+        Expects a PUT request with the new ``parent`` (null for the root), or a DELETE request.
+        A moved category takes its whole subtree along; a removed category's children
+        move up to its parent. The categories themselves and their transactions are kept.
+"""
+@query_budget(7)
+class CategoryNodeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, id):
+        node = get_node(request.user, id)
+        if node is None:
+            return Response({"error": "Category not in your category tree."}, status=404)
+        try:
+            node = move(node, parse_parent(request.data))
+        except (TypeError, ValueError):
+            return Response({"error": "parent must be a category id."}, status=400)
+        except TreeError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response(CategoryNodeSerializer(node).data)
+
+    def delete(self, request, id):
+        node = get_node(request.user, id)
+        if node is None:
+            return Response({"error": "Category not in your category tree."}, status=404)
+        remove(node)
+        return Response({"message": "Category removed from your category tree."}, status=204)
+
+
+"""
+        Retrieve income and expense totals for a category and all of its subcategories.
+        Expects a GET request with the category ID in the URL.
+        Amounts are converted to the user's base currency, returned as ``currency``.
+        If the category is not in the user's tree, returns an error message.
+"""
+@query_budget(5)
+class CategorySubtreeTotalsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        node = get_node(request.user, id)
+        if node is None:
+            return Response({"error": "Category not in your category tree."}, status=404)
+        base = conversion.base_currency(request.user.pk)
+        try:
+            totals = subtree_totals(Transaction.objects.filter(user=request.user), request.user, node,
+                                    aggregate=conversion.summed_in(base))
+        except MissingRate as e:
+            return Response({"error": str(e)}, status=400)
+        return Response({
+            "category": node.category_id,
+            "total_income": totals['total_income'] or 0,
+            "total_expenses": totals['total_expenses'] or 0,
+            "currency": base,
+        })
@@ -0,0 +1,228 @@
+import re
+import uuid
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from .models import CategoryRule
+
+
+"""_summary_
+
+        Compiled per-user categorization matcher.
+        Every "contains" pattern of a user's rules goes into one Aho-Corasick automaton, so
+        a single pass over the description and a single pass over the payee find all
+        substring hits at once, whatever the number of rules. Rules are then walked in
+        priority order: substring rules are a set lookup, amount ranges a comparison, and
+        regular-expression rules, the only costly kind, are run lazily and only until
+        the first rule that matches.
+        Compiled matchers are memoized per process under (user id, rules version); the
+        version lives in the shared cache and is replaced by bump_rules_version() whenever
+        the user's rules change, so every process rebuilds exactly once per change.
+
+"""
+
+VERSION_CACHE_KEY = 'category_rules_version_{}'
+VERSION_CACHE_TIMEOUT = 60 * 60 * 24
+# Regex rules run on every transaction add, so they are kept short and free of
+# nested quantifiers such as (a+)+, which backtrack exponentially on a near miss.
+MAX_REGEX_LENGTH = 100
+
+
+def validate_pattern(match_type, pattern):
+    """Raise re.error if ``pattern`` is not a usable regular expression."""
+    if match_type == 'regex':
+        if len(pattern) > MAX_REGEX_LENGTH:
+            raise re.error(f"longer than {MAX_REGEX_LENGTH} characters")
+        re.compile(pattern, re.IGNORECASE)
+        if has_nested_quantifier(pattern):
+            raise re.error("a repeated group must not itself contain a repetition")
+
+
+def has_nested_quantifier(pattern):
+    """Return whether a quantified group in ``pattern`` contains a quantifier."""
+    groups = [False]  # per open group: whether it contains a quantifier
+    position, length = 0, len(pattern)
+    while position < length:
+        char = pattern[position]
+        if char == '\\':
+            position += 2
+            continue
+        if char == '[':
+            position += 1
+            if position < length and pattern[position] == '^':
+                position += 1
+            if position < length and pattern[position] == ']':
+                position += 1
+            while position < length and pattern[position] != ']':
+                position += 2 if pattern[position] == '\\' else 1
+            position += 1
+            continue
+        position += 1
+        if char == '(':
+            groups.append(False)
+        elif char == ')' and len(groups) > 1:
+            inner = groups.pop()
+            if inner and is_quantifier(pattern, position):
+                return True
+            groups[-1] = groups[-1] or inner
+        elif char in '*+?' or (char == '{' and is_quantifier(pattern, position - 1)):
+            # A lazy or possessive suffix and a "(?" group prefix are not repetitions.
+            if char != '?' or pattern[position - 2] not in '(*+?}':
+                groups[-1] = True
+    return False
+
+
+def is_quantifier(pattern, position):
+    """Return whether a repetition of the preceding item starts at ``position``."""
+    if position >= len(pattern):
+        return False
+    if pattern[position] in '*+':
+        return True
+    if pattern[position] == '{':
+        return re.match(r'\{(\d+(,\d*)?|,\d+)\}', pattern[position:]) is not None
+    return False
+
+
+class Automaton:
+    """Aho-Corasick automaton over lower-cased literals."""
+
+    def __init__(self, literals):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for index, literal in enumerate(literals):
+            state = 0
+            for char in literal:
+                following = self.goto[state].get(char)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[state][char] = following
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = following
+            self.output[state] += (index,)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(char, 0)
+                self.output[following] += self.output[self.fail[following]]
+
+    def search(self, text):
+        """Return the indexes of every literal occurring in ``text``."""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class CompiledRules:
+
+    def __init__(self, rules):
+        # Rules arrive ordered by priority, then id.
+        literals = {}
+        self.rules = []
+        for rule in rules:
+            literal = regex = None
+            if rule.pattern and rule.match_type == 'contains':
+                literal = literals.setdefault(rule.pattern.lower(), len(literals))
+            elif rule.pattern:
+                regex = re.compile(rule.pattern, re.IGNORECASE)
+            self.rules.append((rule.category_id, rule.field, literal, regex, rule.min_amount, rule.max_amount))
+        self.automaton = Automaton(list(literals)) if literals else None
+
+    def match(self, description='', payee='', amount=None):
+        """Return the category id of the winning rule, or None."""
+        if not self.rules:
+            return None
+        if self.automaton is not None:
+            description_hits = self.automaton.search(description) if description else ()
+            payee_hits = self.automaton.search(payee) if payee else ()
+        amount = to_decimal(amount)
+
+        for category_id, field, literal, regex, min_amount, max_amount in self.rules:
+            if min_amount is not None and (amount is None or amount < min_amount):
+                continue
+            if max_amount is not None and (amount is None or amount > max_amount):
+                continue
+            if literal is not None:
+                if field != 'payee' and literal in description_hits:
+                    return category_id
+                if field != 'description' and literal in payee_hits:
+                    return category_id
+            elif regex is not None:
+                if field != 'payee' and description and regex.search(description):
+                    return category_id
+                if field != 'description' and payee and regex.search(payee):
+                    return category_id
+            else:
+                return category_id
+        return None
+
+
+def to_decimal(value):
+    if value is None or isinstance(value, Decimal):
+        return value
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def rules_version(user_id):
+    key = VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(key, version, VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def bump_rules_version(user_id):
+    cache.set(VERSION_CACHE_KEY.format(user_id), uuid.uuid4().hex, VERSION_CACHE_TIMEOUT)
+
+
+@lru_cache(maxsize=2048)
+def _compiled(user_id, version):
+    return CompiledRules(list(CategoryRule.objects.filter(user_id=user_id, is_active=True).order_by('priority', 'id')))
+
+
+def get_matcher(user_id):
+    return _compiled(user_id, rules_version(user_id))
+
+
+def categorize(user_id, description='', payee='', amount=None):
+    """Return the category id the user's rules assign to one transaction, or None."""
+    return get_matcher(user_id).match(description or '', payee or '', amount)
+
+
+def categorize_many(user_id, rows):
+    """Fill in ``category`` for each row dict that has none; returns the number categorized.
+
+    Intended for bulk-ingest paths: the matcher is fetched once for the whole batch.
+    """
+    matcher = get_matcher(user_id)
+    categorized = 0
+    for row in rows:
+        if row.get('category'):
+            continue
+        category_id = matcher.match(row.get('description') or '', row.get('payee') or '', row.get('amount'))
+        if category_id is not None:
+            row['category'] = category_id
+            categorized += 1
+    return categorized
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        A CategoryRule assigns ``category`` to a user's transaction when all of its conditions
+        hold: ``pattern`` found in the chosen text field (as a case-insensitive substring or
+        a regular expression), and the amount within [min_amount, max_amount]. Empty
+        conditions always hold. When several rules match, the lowest ``priority`` wins,
+        then the oldest rule. Rules are compiled into one matcher per user by
+        categorization.matcher.
+
+"""
+class CategoryRule(models.Model):
+    FIELD_CHOICES = [
+        ('description', 'Description'),
+        ('payee', 'Payee'),
+        ('any', 'Description or payee'),
+    ]
+    MATCH_CHOICES = [
+        ('contains', 'Contains'),
+        ('regex', 'Regular expression'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='category_rules')
+    category = models.ForeignKey('CRUD.Category', on_delete=models.CASCADE, related_name='rules')
+    field = models.CharField(max_length=16, choices=FIELD_CHOICES, default='description')
+    match_type = models.CharField(max_length=16, choices=MATCH_CHOICES, default='contains')
+    pattern = models.CharField(max_length=255, blank=True)
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    max_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    priority = models.IntegerField(default=100)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['priority', 'id']
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='categ_rule_user_active_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.field} {self.match_type} {self.pattern!r} -> {self.category_id}"
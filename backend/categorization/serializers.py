@@ -0,0 +1,33 @@
+import re
+
+from rest_framework import serializers
+from .matcher import validate_pattern
+from .models import CategoryRule
+
+
+class CategoryRuleSerializer(serializers.ModelSerializer):
+    is_active = serializers.BooleanField(default=True)
+
+    class Meta:
+        model = CategoryRule
+        fields = [
+            'id', 'category', 'field', 'match_type', 'pattern',
+            'min_amount', 'max_amount', 'priority', 'is_active',
+        ]
+
+    def validate(self, attrs):
+        match_type = attrs.get('match_type', getattr(self.instance, 'match_type', 'contains'))
+        pattern = attrs.get('pattern', getattr(self.instance, 'pattern', ''))
+        min_amount = attrs.get('min_amount', getattr(self.instance, 'min_amount', None))
+        max_amount = attrs.get('max_amount', getattr(self.instance, 'max_amount', None))
+
+        if pattern:
+            try:
+                validate_pattern(match_type, pattern)
+            except re.error as e:
+                raise serializers.ValidationError({"pattern": f"Invalid regular expression: {e}"})
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            raise serializers.ValidationError({"max_amount": "max_amount must not be less than min_amount."})
+        if not pattern and min_amount is None and max_amount is None:
+            raise serializers.ValidationError("A rule needs a pattern or an amount range.")
+        return attrs
@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from CRUD.models import Category
+from .matcher import MAX_REGEX_LENGTH, Automaton, bump_rules_version, categorize, categorize_many
+from .models import CategoryRule
+
+
+class RulePatternTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.header = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(self.user)}"}
+        self.category = Category.objects.create(name='Travel')
+
+    def create(self, pattern, match_type='regex'):
+        return self.client.post(reverse('category-rules'), {
+            'category': self.category.pk, 'match_type': match_type, 'pattern': pattern,
+        }, **self.header)
+
+    def test_accepts_ordinary_regular_expressions(self):
+        for pattern in (r'uber|lyft', r'^starbucks\s+#\d+', r'(?i)(air)+line', r'[(+]+', r'\(a+\)+'):
+            self.assertEqual(self.create(pattern).status_code, 201, pattern)
+
+    def test_rejects_nested_quantifiers(self):
+        for pattern in (r'(a+)+$', r'(.*)*x', r'((ab)+c)*', r'(\d{2,})+', r'(?:\w+\s?)*$'):
+            response = self.create(pattern)
+            self.assertEqual(response.status_code, 400, pattern)
+            self.assertIn('pattern', response.json())
+        self.assertFalse(CategoryRule.objects.exists())
+
+    def test_rejects_long_regular_expressions(self):
+        self.assertEqual(self.create('a' * (MAX_REGEX_LENGTH + 1)).status_code, 400)
+        self.assertEqual(self.create('a' * (MAX_REGEX_LENGTH + 1), match_type='contains').status_code, 201)
+
+    def test_a_rule_cannot_be_changed_into_a_catastrophic_pattern(self):
+        rule = CategoryRule.objects.create(user=self.user, category=self.category, match_type='regex', pattern='uber')
+        response = self.client.put(reverse('category-rule', args=[rule.pk]), {'pattern': '(a+)+'},
+                                   content_type='application/json', **self.header)
+        self.assertEqual(response.status_code, 400)
+        rule.refresh_from_db()
+        self.assertEqual(rule.pattern, 'uber')
+
+
+class AutomatonTests(SimpleTestCase):
+
+    def test_finds_overlapping_and_nested_literals(self):
+        automaton = Automaton(['he', 'she', 'his', 'hers'])
+        self.assertEqual(automaton.search('ushers'), {0, 1, 3})
+        self.assertEqual(automaton.search('this'), {2})
+        self.assertEqual(automaton.search('xyz'), set())
+
+    def test_matches_through_failure_links(self):
+        automaton = Automaton(['abcd', 'bce', 'c'])
+        self.assertEqual(automaton.search('abce'), {1, 2})
+
+    def test_ignores_case_of_the_text(self):
+        self.assertEqual(Automaton(['starbucks']).search('POS 4411 STARBUCKS #12'), {0})
+
+
+class MatcherTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.food, self.travel, self.big = (Category.objects.create(name=name) for name in ('Food', 'Travel', 'Big'))
+
+    def rule(self, category, **fields):
+        rule = CategoryRule.objects.create(user=self.user, category=category, **fields)
+        bump_rules_version(self.user.pk)
+        return rule
+
+    def test_the_lowest_priority_rule_wins(self):
+        self.rule(self.food, pattern='uber eats', priority=10)
+        self.rule(self.travel, pattern='uber', priority=20)
+        self.assertEqual(categorize(self.user.pk, 'UBER EATS order'), self.food.pk)
+        self.assertEqual(categorize(self.user.pk, 'Uber trip'), self.travel.pk)
+        self.assertIsNone(categorize(self.user.pk, 'Groceries'))
+
+    def test_rules_apply_to_their_field(self):
+        self.rule(self.food, pattern='cafe', field='payee')
+        self.rule(self.travel, pattern='airline', field='description')
+        self.assertIsNone(categorize(self.user.pk, description='cafe'))
+        self.assertEqual(categorize(self.user.pk, payee='Corner Cafe'), self.food.pk)
+        self.assertIsNone(categorize(self.user.pk, payee='airline'))
+
+    def test_amount_ranges_and_regular_expressions(self):
+        self.rule(self.big, min_amount=Decimal('500'), priority=1)
+        self.rule(self.travel, match_type='regex', pattern=r'^flight\s+\d+', max_amount=Decimal('400'))
+        self.assertEqual(categorize(self.user.pk, 'Flight 202', amount='350'), self.travel.pk)
+        self.assertEqual(categorize(self.user.pk, 'Flight 202', amount='700'), self.big.pk)
+        self.assertIsNone(categorize(self.user.pk, 'Flight 202', amount='450'))
+        self.assertIsNone(categorize(self.user.pk, 'My flight 202', amount='350'))
+
+    def test_a_rule_change_rebuilds_the_matcher(self):
+        rule = self.rule(self.food, pattern='bakery')
+        self.assertEqual(categorize(self.user.pk, 'bakery'), self.food.pk)
+        rule.is_active = False
+        rule.save()
+        self.assertEqual(categorize(self.user.pk, 'bakery'), self.food.pk)
+        bump_rules_version(self.user.pk)
+        self.assertIsNone(categorize(self.user.pk, 'bakery'))
+
+    def test_categorize_many_fills_only_missing_categories(self):
+        self.rule(self.food, pattern='pizza')
+        rows = [{'description': 'Pizza'}, {'description': 'Pizza', 'category': self.travel.pk}, {'description': 'Tax'}]
+        self.assertEqual(categorize_many(self.user.pk, rows), 1)
+        self.assertEqual([row.get('category') for row in rows], [self.food.pk, self.travel.pk, None])
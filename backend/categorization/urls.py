@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CategoryRuleListView, CategoryRuleDetailView, CategorizePreviewView
+
+urlpatterns = [
+    path('', CategoryRuleListView.as_view(), name='category-rules'),
+    path('<int:id>/', CategoryRuleDetailView.as_view(), name='category-rule'),
+    path('preview/', CategorizePreviewView.as_view(), name='categorize-preview'),
+]
@@ -0,0 +1,78 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from .matcher import bump_rules_version, categorize
+from .models import CategoryRule
+from .serializers import CategoryRuleSerializer
+
+
+"""
+        List or create the authenticated user's categorization rules.
+        Expects a GET request, or a POST request with the rule data in the request body.
+        Returns the rules in the order they are applied, or the created rule.
+"""
+@query_budget(3)
+class CategoryRuleListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        rules = CategoryRule.objects.filter(user=request.user).order_by('priority', 'id')
+        return Response(CategoryRuleSerializer(rules, many=True).data)
+
+    def post(self, request):
+        serializer = CategoryRuleSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            bump_rules_version(request.user.pk)
+            return Response(serializer.data, status=201)
+        return Response(serializer.errors, status=400)
+
+
+"""
+        Update or delete one of the authenticated user's categorization rules.
+        Expects a PUT request with the changed fields, or a DELETE request.
+        If the rule is not found, returns an error message.
+"""
+@query_budget(4)
+class CategoryRuleDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, id):
+        try:
+            rule = CategoryRule.objects.get(id=id, user=request.user)
+        except CategoryRule.DoesNotExist:
+            return Response({"error": "Rule not found."}, status=404)
+        serializer = CategoryRuleSerializer(rule, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            bump_rules_version(request.user.pk)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=400)
+
+    def delete(self, request, id):
+        deleted, _ = CategoryRule.objects.filter(id=id, user=request.user).delete()
+        if not deleted:
+            return Response({"error": "Rule not found."}, status=404)
+        bump_rules_version(request.user.pk)
+        return Response({"message": "Rule deleted successfully."}, status=204)
+
+
+"""
+        Preview which category the authenticated user's rules assign.
+        Expects a POST request with ``description``, ``payee`` and ``amount``.
+        Returns the category id, or null when no rule matches.
+"""
+@query_budget(2)
+class CategorizePreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        category = categorize(
+            request.user.pk,
+            request.data.get('description', ''),
+            request.data.get('payee', ''),
+            request.data.get('amount'),
+        )
+        return Response({"category": category})
@@ -0,0 +1,22 @@
+from django.contrib import admin
+from .models import ExchangeRate
+from .rates import bump_rates_version
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['date', 'currency', 'rate']
+    list_filter = ['currency']
+    date_hierarchy = 'date'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_rates_version()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_rates_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_rates_version()
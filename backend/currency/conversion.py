@@ -0,0 +1,131 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import DateField, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import BudgetCurrency, TransactionCurrency, UserCurrency
+from .rates import factor, get_setting, rates_on
+
+
+"""_summary_
+
+        Currency-aware totals. Summaries never convert row by row: the database groups
+        a user's transactions by currency and month (plus any grouping the caller asks
+        for), and the few resulting groups are converted to the user's base currency at
+        once, each month at the rate of its last day (or today, for the current month).
+
+"""
+
+BASE_CACHE_KEY = 'base_currency_{}'
+BASE_CACHE_TIMEOUT = 60 * 60
+CENT = Decimal('0.01')
+
+
+def validate_currency(code):
+    """Return ``code`` normalized, or raise ValueError if it is not a supported currency."""
+    code = (code or '').strip().upper()
+    if code not in get_setting('SUPPORTED'):
+        raise ValueError(f"Unsupported currency. Choose one of: {', '.join(get_setting('SUPPORTED'))}.")
+    return code
+
+
+def base_currency(user_id):
+    key = BASE_CACHE_KEY.format(user_id)
+    currency = cache.get(key)
+    if currency is None:
+        currency = (
+            UserCurrency.objects.filter(user_id=user_id).values_list('base_currency', flat=True).first()
+            or get_setting('DEFAULT')
+        )
+        cache.set(key, currency, BASE_CACHE_TIMEOUT)
+    return currency
+
+
+def invalidate_base_currency(user_id):
+    cache.delete(BASE_CACHE_KEY.format(user_id))
+
+
+def set_transaction_currency(transaction_obj, currency, created=False):
+    if created:
+        TransactionCurrency.objects.create(transaction=transaction_obj, currency=currency)
+        return
+    # Replaces a currency_info loaded with select_related, which would be stale otherwise.
+    transaction_obj.currency_info, _ = TransactionCurrency.objects.update_or_create(
+        transaction=transaction_obj, defaults={'currency': currency},
+    )
+
+
+def set_budget_currency(budget, currency):
+    BudgetCurrency.objects.update_or_create(budget=budget, defaults={'currency': currency})
+
+
+def _currency_of(obj, base):
+    try:
+        return obj.currency_info.currency
+    except ObjectDoesNotExist:
+        return base
+
+
+def transaction_currency(transaction_obj, base):
+    """The currency of a transaction; select_related('currency_info') avoids a query."""
+    return _currency_of(transaction_obj, base)
+
+
+def budget_currency(budget, base):
+    return _currency_of(budget, base)
+
+
+def grouped_totals(transactions, base, *fields):
+    """Sum ``transactions`` grouped by ``fields``, currency and month, in one query."""
+    return list(
+        transactions.annotate(
+            txn_currency=Coalesce('currency_info__currency', Value(base)),
+            month=TruncMonth('date_created', output_field=DateField()),
+        )
+        .values(*fields, 'txn_currency', 'month')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+
+
+def rate_day(month, today):
+    month_end = (month.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return min(month_end, today)
+
+
+def convert(rows, base, fields=(), today=None):
+    """Convert grouped_totals() rows to ``base`` and sum them per ``fields``.
+
+    Returns a list of dicts holding ``fields`` and ``total``, in first-seen order.
+    Raises rates.MissingRate if a currency has no rate for one of the months.
+    """
+    today = today or timezone.localdate()
+    days = {row['month']: rate_day(row['month'], today) for row in rows}
+    rates = rates_on(days.values())
+    factors = {
+        (currency, month): factor(rates[days[month]], currency, base, days[month])
+        for currency, month in {(row['txn_currency'], row['month']) for row in rows}
+    }
+
+    totals = {}
+    for row in rows:
+        key = tuple(row[field] for field in fields)
+        totals[key] = totals.get(key, 0) + row['total'] * factors[(row['txn_currency'], row['month'])]
+    return [
+        dict(zip(fields, key), total=Decimal(total).quantize(CENT))
+        for key, total in totals.items()
+    ]
+
+
+def summed_in(base):
+    """An ``aggregate(queryset, field)`` for categories.tree that sums per field in ``base``."""
+    return lambda transactions, field: convert(grouped_totals(transactions, base, field), base, (field,))
+
+
+def convert_amount(amount, source, target, day=None):
+    day = day or timezone.localdate()
+    return (amount * factor(rates_on([day])[day], source, target, day)).quantize(CENT)
@@ -0,0 +1,45 @@
+import csv
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from currency.models import ExchangeRate
+from currency.rates import bump_rates_version, get_setting
+
+
+class Command(BaseCommand):
+    help = (
+        "Load exchange rates from a CSV file with the columns date, currency, rate, where "
+        "rate is the number of units of currency per unit of the reference currency. "
+        "Existing rates for the same currency and date are replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        reference = get_setting('REFERENCE')
+        rates = []
+        with open(options['path'], newline='') as handle:
+            for line, row in enumerate(csv.DictReader(handle), start=2):
+                try:
+                    rate = ExchangeRate(
+                        date=date.fromisoformat(row['date'].strip()),
+                        currency=row['currency'].strip().upper(),
+                        rate=Decimal(row['rate'].strip()),
+                    )
+                except (KeyError, AttributeError, ValueError, InvalidOperation):
+                    raise CommandError(f"Line {line}: expected date, currency and rate, got {row}.")
+                if rate.rate <= 0:
+                    raise CommandError(f"Line {line}: rate must be positive.")
+                if rate.currency != reference:
+                    rates.append(rate)
+
+        ExchangeRate.objects.bulk_create(
+            rates, batch_size=options['batch_size'],
+            update_conflicts=True, unique_fields=['currency', 'date'], update_fields=['rate'],
+        )
+        bump_rates_version()
+        self.stdout.write(self.style.SUCCESS(f"Loaded {len(rates)} exchange rates against {reference}."))
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('CRUD', '__first__'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetCurrency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3)),
+                ('budget', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='currency_info', to='CRUD.budget')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=20)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'currency'], name='exchange_rate_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('currency', 'date'), name='exchange_rate_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionCurrency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3)),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='currency_info', to='CRUD.transaction')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserCurrency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_currency', models.CharField(max_length=3)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='currency_settings', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
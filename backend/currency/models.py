@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        ExchangeRate is one day's rate of ``currency`` against the reference currency
+        (CURRENCY['REFERENCE']): one unit of the reference currency buys ``rate`` units
+        of ``currency``. Rates are loaded with the load_fx_rates command or the admin.
+
+"""
+class ExchangeRate(models.Model):
+    date = models.DateField()
+    currency = models.CharField(max_length=3)
+    rate = models.DecimalField(max_digits=20, decimal_places=8)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['currency', 'date'], name='exchange_rate_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'currency'], name='exchange_rate_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.currency} {self.rate}"
+
+
+"""_summary_
+
+        The currency a user's summaries are reported in. Users without a row use
+        CURRENCY['DEFAULT'].
+
+"""
+class UserCurrency(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='currency_settings')
+    base_currency = models.CharField(max_length=3)
+
+
+"""_summary_
+
+        The currency of a transaction or a budget. The Transaction and Budget tables
+        predate multi-currency support, so the currency is kept alongside them; a row
+        without one is in its owner's base currency.
+
+"""
+class TransactionCurrency(models.Model):
+    transaction = models.OneToOneField('CRUD.Transaction', on_delete=models.CASCADE, related_name='currency_info')
+    currency = models.CharField(max_length=3)
+
+
+class BudgetCurrency(models.Model):
+    budget = models.OneToOneField('CRUD.Budget', on_delete=models.CASCADE, related_name='currency_info')
+    currency = models.CharField(max_length=3)
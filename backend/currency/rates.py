@@ -0,0 +1,131 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ExchangeRate
+
+
+"""_summary_
+
+        Exchange-rate lookups with a per-process, date-keyed LRU cache.
+        rates_on() returns, for each requested day, the latest rate of every currency
+        published on or before that day (and at most RATE_MAX_AGE_DAYS earlier). Days
+        missing from the cache are loaded together with one range query, and the least
+        recently used days are evicted once CACHE_SIZE days are held. Cache entries are
+        keyed by a rates version kept in the shared cache; loading rates replaces the
+        version, so every process drops its stale days.
+
+"""
+
+DEFAULTS = {
+    'DEFAULT': 'NPR',
+    'REFERENCE': 'USD',
+    'SUPPORTED': ['NPR', 'USD', 'INR'],
+    'RATE_MAX_AGE_DAYS': 31,
+    'CACHE_SIZE': 1024,
+}
+
+VERSION_CACHE_KEY = 'fx_rates_version'
+VERSION_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_setting(name):
+    return getattr(settings, 'CURRENCY', {}).get(name, DEFAULTS[name])
+
+
+class MissingRate(Exception):
+
+    def __init__(self, currency, day):
+        super().__init__(f"No exchange rate for {currency} on {day.isoformat()}.")
+        self.currency = currency
+        self.day = day
+
+
+class DateLRU:
+    """A thread-safe LRU mapping of day -> rates."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_rates = DateLRU(get_setting('CACHE_SIZE'))
+
+
+def rates_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(VERSION_CACHE_KEY, version, VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def bump_rates_version():
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, VERSION_CACHE_TIMEOUT)
+
+
+def rates_on(days):
+    """Return {day: {currency: rate}} for every day in ``days``."""
+    version = rates_version()
+    found = {}
+    missing = set()
+    for day in set(days):
+        rates = _rates.get((version, day))
+        if rates is None:
+            missing.add(day)
+        else:
+            found[day] = rates
+    if not missing:
+        return found
+
+    max_age = timedelta(days=get_setting('RATE_MAX_AGE_DAYS'))
+    history = list(
+        ExchangeRate.objects.filter(date__gte=min(missing) - max_age, date__lte=max(missing))
+        .order_by('date')
+        .values_list('date', 'currency', 'rate')
+    )
+    reference = get_setting('REFERENCE')
+    for day in missing:
+        rates = {reference: Decimal(1)}
+        for rate_date, currency, rate in history:
+            if rate_date > day:
+                break
+            if rate_date >= day - max_age:
+                rates[currency] = rate
+        _rates.put((version, day), rates)
+        found[day] = rates
+    return found
+
+
+def factor(rates, source, target, day):
+    """The multiplier taking an amount in ``source`` to ``target`` with one day's ``rates``."""
+    if source == target:
+        return Decimal(1)
+    for currency in (source, target):
+        if currency not in rates:
+            raise MissingRate(currency, day)
+    return rates[target] / rates[source]
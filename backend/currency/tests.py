@@ -0,0 +1,137 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from categories import tree
+from CRUD.models import Category, Transaction
+from . import conversion
+from .models import ExchangeRate, TransactionCurrency, UserCurrency
+from .rates import DateLRU, MissingRate, bump_rates_version, factor, rates_on
+
+
+class ConvertedTotalsTests(TestCase):
+    """NPR is the default base currency; 1 USD is 133 NPR."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.header = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(self.user)}"}
+        ExchangeRate.objects.create(date=timezone.localdate().replace(day=1), currency='NPR', rate=Decimal('133'))
+        bump_rates_version()
+
+    def add(self, amount, currency=None, **fields):
+        transaction = Transaction.objects.create(user=self.user, amount=Decimal(amount), **fields)
+        if currency is not None:
+            TransactionCurrency.objects.create(transaction=transaction, currency=currency)
+        return transaction
+
+    def test_subtree_totals_are_in_the_base_currency(self):
+        food, coffee = Category.objects.create(name='Food'), Category.objects.create(name='Coffee')
+        tree.place(self.user, food.pk)
+        tree.place(self.user, coffee.pk, food.pk)
+        self.add('133.00', type='expense', category=food)
+        self.add('2.00', 'USD', type='expense', category=coffee)
+        self.add('1.00', 'USD', type='income', category=coffee)
+
+        data = self.client.get(reverse('category-subtree-totals', args=[food.pk]), **self.header).json()
+        self.assertEqual(data['currency'], 'NPR')
+        self.assertEqual(Decimal(str(data['total_expenses'])), Decimal('399.00'))
+        self.assertEqual(Decimal(str(data['total_income'])), Decimal('133.00'))
+
+    def test_subtree_totals_report_a_missing_rate(self):
+        food = Category.objects.create(name='Food')
+        tree.place(self.user, food.pk)
+        self.add('2.00', 'INR', type='expense', category=food)
+        response = self.client.get(reverse('category-subtree-totals', args=[food.pk]), **self.header)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('INR', response.json()['error'])
+
+
+class RateArithmeticTests(SimpleTestCase):
+
+    def test_factor_goes_through_the_reference_rates(self):
+        rates = {'USD': Decimal(1), 'NPR': Decimal('133'), 'INR': Decimal('83')}
+        day = date(2026, 1, 5)
+        self.assertEqual(factor(rates, 'USD', 'NPR', day), Decimal('133'))
+        self.assertEqual(factor(rates, 'NPR', 'NPR', day), 1)
+        self.assertEqual(Decimal('83') * factor(rates, 'INR', 'NPR', day), Decimal('133'))
+        with self.assertRaises(MissingRate):
+            factor({'USD': Decimal(1)}, 'USD', 'NPR', day)
+
+    def test_a_month_is_converted_at_its_last_day_or_today(self):
+        self.assertEqual(conversion.rate_day(date(2026, 2, 1), date(2026, 5, 10)), date(2026, 2, 28))
+        self.assertEqual(conversion.rate_day(date(2026, 5, 1), date(2026, 5, 10)), date(2026, 5, 10))
+
+    def test_validate_currency(self):
+        self.assertEqual(conversion.validate_currency(' usd '), 'USD')
+        with self.assertRaises(ValueError):
+            conversion.validate_currency('EUR')
+
+    def test_date_lru_evicts_the_least_recently_used_day(self):
+        lru = DateLRU(2)
+        lru.put(date(2026, 1, 1), {'a': 1})
+        lru.put(date(2026, 1, 2), {'b': 2})
+        lru.get(date(2026, 1, 1))
+        lru.put(date(2026, 1, 3), {'c': 3})
+        self.assertIsNone(lru.get(date(2026, 1, 2)))
+        self.assertEqual(lru.get(date(2026, 1, 1)), {'a': 1})
+
+
+class ConversionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for day, rate in ((date(2026, 1, 1), '130'), (date(2026, 1, 20), '132'), (date(2026, 2, 10), '134')):
+            ExchangeRate.objects.create(date=day, currency='NPR', rate=Decimal(rate))
+        bump_rates_version()
+
+    def test_rates_on_takes_the_latest_recent_rate(self):
+        rates = rates_on([date(2026, 1, 10), date(2026, 1, 31), date(2026, 4, 1)])
+        self.assertEqual(rates[date(2026, 1, 10)]['NPR'], Decimal('130'))
+        self.assertEqual(rates[date(2026, 1, 31)]['NPR'], Decimal('132'))
+        self.assertNotIn('NPR', rates[date(2026, 4, 1)])
+        self.assertEqual(rates[date(2026, 4, 1)]['USD'], 1)
+
+    def test_rates_are_reloaded_when_the_version_changes(self):
+        self.assertEqual(rates_on([date(2026, 2, 15)])[date(2026, 2, 15)]['NPR'], Decimal('134'))
+        ExchangeRate.objects.create(date=date(2026, 2, 14), currency='NPR', rate=Decimal('135'))
+        with self.assertNumQueries(0):
+            self.assertEqual(rates_on([date(2026, 2, 15)])[date(2026, 2, 15)]['NPR'], Decimal('134'))
+        bump_rates_version()
+        self.assertEqual(rates_on([date(2026, 2, 15)])[date(2026, 2, 15)]['NPR'], Decimal('135'))
+
+    def test_convert_sums_each_month_at_its_own_rate(self):
+        rows = [
+            {'type': 'expense', 'txn_currency': 'USD', 'month': date(2026, 1, 1), 'total': Decimal('1.00')},
+            {'type': 'expense', 'txn_currency': 'USD', 'month': date(2026, 2, 1), 'total': Decimal('1.00')},
+            {'type': 'expense', 'txn_currency': 'NPR', 'month': date(2026, 2, 1), 'total': Decimal('10.00')},
+            {'type': 'income', 'txn_currency': 'NPR', 'month': date(2026, 2, 1), 'total': Decimal('5.00')},
+        ]
+        converted = conversion.convert(rows, 'NPR', ('type',), today=date(2026, 2, 20))
+        self.assertEqual(converted, [
+            {'type': 'expense', 'total': Decimal('276.00')},
+            {'type': 'income', 'total': Decimal('5.00')},
+        ])
+        self.assertEqual(conversion.convert(rows[:1], 'USD', today=date(2026, 2, 20)), [{'total': Decimal('1.00')}])
+
+    def test_convert_reports_a_missing_rate(self):
+        rows = [{'txn_currency': 'INR', 'month': date(2026, 1, 1), 'total': Decimal('1.00')}]
+        with self.assertRaises(MissingRate) as raised:
+            conversion.convert(rows, 'NPR', today=date(2026, 2, 20))
+        self.assertEqual((raised.exception.currency, raised.exception.day), ('INR', date(2026, 1, 31)))
+
+    def test_convert_amount(self):
+        self.assertEqual(conversion.convert_amount(Decimal('13.20'), 'NPR', 'USD', date(2026, 1, 25)), Decimal('0.10'))
+
+    def test_base_currency_falls_back_to_the_default(self):
+        user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.assertEqual(conversion.base_currency(user.pk), 'NPR')
+        UserCurrency.objects.create(user=user, base_currency='USD')
+        conversion.invalidate_base_currency(user.pk)
+        self.assertEqual(conversion.base_currency(user.pk), 'USD')
@@ -0,0 +1,65 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from CRUD.models import Budget, Transaction
+from alerts.tracker import forget_totals
+from goals.projection import forget_cash_flow
+from monitoring.querybudget import query_budget
+from sharding import shardmap
+from .conversion import base_currency, invalidate_base_currency, validate_currency
+from .models import BudgetCurrency, TransactionCurrency, UserCurrency
+from .rates import get_setting
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def pin_currency(user, currency):
+    """Record ``currency`` on the user's transactions and budget that have none yet."""
+    missing = Transaction.objects.filter(user=user, currency_info__isnull=True).values_list('pk', flat=True)
+    while True:
+        batch = list(missing[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            break
+        TransactionCurrency.objects.bulk_create(
+            [TransactionCurrency(transaction_id=pk, currency=currency) for pk in batch],
+        )
+    for pk in Budget.objects.filter(user=user, currency_info__isnull=True).values_list('pk', flat=True):
+        BudgetCurrency.objects.create(budget_id=pk, currency=currency)
+
+
+"""
+        Retrieve or change the authenticated user's base currency.
+        Expects a GET request, or a PUT request with ``base_currency``.
+        Summaries and budget analysis are reported in the base currency. Transactions
+        and budgets recorded without a currency keep the previous base currency.
+"""
+@query_budget(8)
+class CurrencySettingsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({
+            "base_currency": base_currency(request.user.pk),
+            "supported": get_setting('SUPPORTED'),
+        })
+
+    def put(self, request):
+        try:
+            currency = validate_currency(request.data.get('base_currency'))
+        except ValueError as e:
+            return Response({"base_currency": [str(e)]}, status=400)
+        previous = base_currency(request.user.pk)
+        if currency != previous:
+            with shardmap.atomic():
+                pin_currency(request.user, previous)
+                UserCurrency.objects.update_or_create(user=request.user, defaults={'base_currency': currency})
+                # Month-to-date totals were kept in the previous base currency.
+                forget_totals(request.user.pk)
+                forget_cash_flow(request.user.pk)
+            invalidate_base_currency(request.user.pk)
+        return Response({
+            "base_currency": currency,
+            "supported": get_setting('SUPPORTED'),
+        })
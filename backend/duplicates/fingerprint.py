@@ -0,0 +1,143 @@
+import hashlib
+import re
+from datetime import timedelta
+from decimal import Decimal
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TransactionFingerprint
+
+
+"""_summary_
+
+        Fingerprinting and duplicate lookup for transactions.
+        A description is normalized by lower-casing it, dropping punctuation and
+        reference-like digit runs and collapsing whitespace, so "POS 4411 STARBUCKS #12"
+        and "Starbucks" compare equal. Exact duplicates have the same fingerprint; near
+        duplicates have the same amount within DUPLICATE_DETECTION['WINDOW_HOURS'] and
+        descriptions at least SIMILARITY alike. Both are found with one indexed range query
+        per transaction, or one query per batch in find_batch_duplicates().
+
+"""
+
+DEFAULTS = {
+    'WINDOW_HOURS': 72,
+    'SIMILARITY': 0.8,
+    'REJECT_EXACT': False,
+}
+
+_NOISE = re.compile(r'\d{3,}|[^\w\s]')
+_SPACES = re.compile(r'\s+')
+
+
+def get_setting(name):
+    return getattr(settings, 'DUPLICATE_DETECTION', {}).get(name, DEFAULTS[name])
+
+
+def window():
+    # The lookup must span at least the one-day bucket of the fingerprint.
+    return max(timedelta(hours=get_setting('WINDOW_HOURS')), timedelta(days=1))
+
+
+def normalize_description(description):
+    text = _NOISE.sub(' ', (description or '').lower())
+    return _SPACES.sub(' ', text).strip()[:255]
+
+
+def normalize_amount(amount):
+    return Decimal(str(amount)).quantize(Decimal('0.01'))
+
+
+def compute(user_id, amount, occurred_at, description):
+    """Return (fingerprint, amount, description_key) for one transaction."""
+    amount = normalize_amount(amount)
+    description_key = normalize_description(description)
+    day = timezone.localtime(occurred_at).date() if timezone.is_aware(occurred_at) else occurred_at.date()
+    digest = hashlib.sha256(f'{user_id}|{amount}|{day.isoformat()}|{description_key}'.encode()).hexdigest()
+    return digest, amount, description_key
+
+
+def similar(a, b):
+    if a == b:
+        return True
+    return SequenceMatcher(None, a, b).ratio() >= get_setting('SIMILARITY')
+
+
+def find_duplicates(user_id, amount, occurred_at, description, exclude_transaction=None):
+    """Return (exact_ids, near_ids) of the user's transactions that duplicate the given values."""
+    fingerprint, amount, description_key = compute(user_id, amount, occurred_at, description)
+    span = window()
+    candidates = TransactionFingerprint.objects.filter(
+        user_id=user_id, amount=amount, occurred_at__range=(occurred_at - span, occurred_at + span),
+    )
+    if exclude_transaction is not None:
+        candidates = candidates.exclude(transaction_id=exclude_transaction)
+
+    exact, near = [], []
+    for transaction_id, candidate_fingerprint, candidate_key in candidates.values_list(
+            'transaction_id', 'fingerprint', 'description_key'):
+        if candidate_fingerprint == fingerprint:
+            exact.append(transaction_id)
+        elif similar(candidate_key, description_key):
+            near.append(transaction_id)
+    return exact, near
+
+
+def find_batch_duplicates(user_id, rows):
+    """For bulk ingest: map each row index to the transaction ids it exactly duplicates.
+
+    ``rows`` are dicts with amount, date and description. One query checks the whole
+    batch against the fingerprint index; duplicates inside the batch are reported
+    with the index of the earlier row as a negative number, -(index + 1).
+    """
+    fingerprints = [compute(user_id, row['amount'], row['date'], row.get('description'))[0] for row in rows]
+    existing = {}
+    for transaction_id, fingerprint in TransactionFingerprint.objects.filter(
+            user_id=user_id, fingerprint__in=set(fingerprints)).values_list('transaction_id', 'fingerprint'):
+        existing.setdefault(fingerprint, []).append(transaction_id)
+
+    duplicates = {}
+    seen = {}
+    for index, fingerprint in enumerate(fingerprints):
+        matches = list(existing.get(fingerprint, ()))
+        if fingerprint in seen:
+            matches.append(-(seen[fingerprint] + 1))
+        else:
+            seen[fingerprint] = index
+        if matches:
+            duplicates[index] = matches
+    return duplicates
+
+
+def index_values(transaction_obj):
+    fingerprint, amount, description_key = compute(
+        transaction_obj.user_id, transaction_obj.amount, transaction_obj.date_created,
+        getattr(transaction_obj, 'description', ''),
+    )
+    return {
+        'user_id': transaction_obj.user_id,
+        'fingerprint': fingerprint,
+        'amount': amount,
+        'occurred_at': transaction_obj.date_created,
+        'description_key': description_key,
+    }
+
+
+def index_transaction(transaction_obj, created=False):
+    """Create, or refresh after an update, the fingerprint row of a saved transaction."""
+    if created:
+        TransactionFingerprint.objects.create(transaction_id=transaction_obj.pk, **index_values(transaction_obj))
+        return
+    TransactionFingerprint.objects.update_or_create(
+        transaction_id=transaction_obj.pk, defaults=index_values(transaction_obj),
+    )
+
+
+def index_many(transactions, batch_size=1000):
+    """Bulk-create fingerprint rows for transactions that have none yet (bulk ingest, backfill)."""
+    TransactionFingerprint.objects.bulk_create(
+        [TransactionFingerprint(transaction_id=obj.pk, **index_values(obj)) for obj in transactions],
+        batch_size=batch_size, ignore_conflicts=True,
+    )
@@ -0,0 +1,108 @@
+import json
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from CRUD.models import Transaction
+from duplicates.fingerprint import index_many, similar, window
+from duplicates.models import TransactionFingerprint
+from sharding.shardmap import shard_aliases, use_shard
+
+
+class Command(BaseCommand):
+    help = (
+        "Index transactions that have no fingerprint yet, then report historical exact and "
+        "near duplicates. Works in batches so it can run against the full table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--user', type=int, help="Only scan this user id.")
+        parser.add_argument('--no-near', action='store_true', help="Report exact duplicates only.")
+        parser.add_argument('--output', help="Also write the report to this JSON file.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        indexed = 0
+        report = {'exact': [], 'near': []}
+        for alias in shard_aliases():
+            with use_shard(alias):
+                indexed += self.backfill(options['user'], batch_size)
+
+                fingerprints = TransactionFingerprint.objects.all()
+                if options['user']:
+                    fingerprints = fingerprints.filter(user_id=options['user'])
+
+                report['exact'] += self.exact_groups(fingerprints, batch_size)
+                if not options['no_near']:
+                    report['near'] += self.near_pairs(fingerprints, batch_size)
+        self.stdout.write(f"Indexed {indexed} transactions.")
+
+        for group in report['exact']:
+            self.stdout.write(f"exact  user={group['user']} transactions={group['transactions']}")
+        for pair in report['near']:
+            self.stdout.write(f"near   user={pair['user']} transactions={pair['transactions']}")
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(report['exact'])} exact duplicate groups, {len(report['near'])} near duplicate pairs."
+        ))
+
+    def backfill(self, user_id, batch_size):
+        # Keyset pagination over primary keys keeps every batch an index range scan.
+        missing = Transaction.objects.filter(fingerprint__isnull=True).order_by('pk')
+        if user_id:
+            missing = missing.filter(user_id=user_id)
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(missing.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return indexed
+            index_many(batch, batch_size)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+
+    def exact_groups(self, fingerprints, batch_size):
+        # One streaming query over the members of every repeated fingerprint, in group order.
+        repeated = (
+            fingerprints.values('user_id', 'fingerprint')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+            .values('fingerprint')
+        )
+        members = (
+            fingerprints.filter(fingerprint__in=repeated)
+            .order_by('user_id', 'fingerprint', 'transaction_id')
+            .values_list('user_id', 'fingerprint', 'transaction_id')
+        )
+        found = []
+        for (user_id, _), group in groupby(members.iterator(chunk_size=batch_size), key=itemgetter(0, 1)):
+            transactions = [transaction_id for _, _, transaction_id in group]
+            if len(transactions) > 1:
+                found.append({'user': user_id, 'transactions': transactions})
+        return found
+
+    def near_pairs(self, fingerprints, batch_size):
+        # One streaming pass in (user, amount, occurred_at) index order: near duplicates
+        # are always within the window of each other in this order.
+        span = window()
+        found = []
+        recent = []
+        rows = fingerprints.order_by('user_id', 'amount', 'occurred_at').values_list(
+            'user_id', 'amount', 'occurred_at', 'fingerprint', 'description_key', 'transaction_id',
+        )
+        for row in rows.iterator(chunk_size=batch_size):
+            user_id, amount, occurred_at, fingerprint, description_key, transaction_id = row
+            recent = [
+                earlier for earlier in recent
+                if earlier[0] == user_id and earlier[1] == amount and occurred_at - earlier[2] <= span
+            ]
+            for earlier in recent:
+                if earlier[3] != fingerprint and similar(earlier[4], description_key):
+                    found.append({'user': user_id, 'transactions': [earlier[5], transaction_id]})
+            recent.append(row)
+        return found
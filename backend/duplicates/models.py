@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        TransactionFingerprint is the duplicate-detection index of a transaction: the
+        normalized values it is compared on and a SHA-256 ``fingerprint`` of
+        (user, amount, day, normalized description). Exact duplicates share a fingerprint;
+        near duplicates share user and amount within a time window, which the
+        (user, amount, occurred_at) index answers with a range scan.
+
+"""
+class TransactionFingerprint(models.Model):
+    transaction = models.OneToOneField('CRUD.Transaction', on_delete=models.CASCADE, related_name='fingerprint')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    fingerprint = models.CharField(max_length=64)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    occurred_at = models.DateTimeField()
+    description_key = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'fingerprint'], name='dup_fp_user_fingerprint_idx'),
+            models.Index(fields=['user', 'amount', 'occurred_at'], name='dup_fp_user_amount_time_idx'),
+        ]
@@ -0,0 +1,46 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from CRUD.models import Transaction
+from .fingerprint import index_many
+from .management.commands.find_duplicates import Command
+from .models import TransactionFingerprint
+
+
+class ExactGroupTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.other = get_user_model().objects.create_user(username='b', email='b@example.com', password='x')
+
+    def add(self, user, amount, description):
+        return Transaction.objects.create(user=user, amount=Decimal(amount), type='expense', description=description)
+
+    def test_groups_are_loaded_with_a_single_query(self):
+        coffee = [self.add(self.user, '4.50', f"POS {n}411 STARBUCKS #12") for n in range(3)]
+        rent = [self.add(self.user, '900.00', 'Rent') for _ in range(2)]
+        self.add(self.user, '12.00', 'Cinema')
+        other_rent = [self.add(self.other, '900.00', 'Rent') for _ in range(2)]
+        index_many(Transaction.objects.all())
+
+        with self.assertNumQueries(1):
+            groups = Command().exact_groups(TransactionFingerprint.objects.all(), batch_size=2)
+        self.assertCountEqual(groups, [
+            {'user': self.user.pk, 'transactions': [t.pk for t in coffee]},
+            {'user': self.user.pk, 'transactions': [t.pk for t in rent]},
+            {'user': self.other.pk, 'transactions': [t.pk for t in other_rent]},
+        ])
+
+    def test_command_reports_exact_duplicates_of_one_user(self):
+        first, second = self.add(self.user, '900.00', 'Rent'), self.add(self.user, '900.00', 'Rent')
+        self.add(self.other, '900.00', 'Rent')
+        self.add(self.other, '900.00', 'Rent')
+
+        out = StringIO()
+        call_command('find_duplicates', user=self.user.pk, no_near=True, stdout=out)
+        self.assertIn(f"exact  user={self.user.pk} transactions={[first.pk, second.pk]}", out.getvalue())
+        self.assertIn("1 exact duplicate groups", out.getvalue())
@@ -0,0 +1,281 @@
+import csv
+import io
+import json
+import os
+import time
+import uuid
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from audit.models import AuditEvent
+from categories.models import CategoryNode
+from CRUD.models import Budget, Category, Transaction
+from currency.conversion import base_currency
+from sharding.shardmap import shard_for, use_shard
+from .models import ExportJob
+
+
+"""_summary_
+
+        Writing and expiring full-account export archives.
+        run_export() writes one ZIP per job: transactions (NDJSON and CSV), budgets,
+        categories and the audit trail as NDJSON, and the profile as JSON when the
+        userProfile app provides one. Rows are read with QuerySet.iterator(), which uses
+        server-side cursors on PostgreSQL and fetches CHUNK_SIZE rows at a time
+        elsewhere, and each ZIP entry is streamed to
+        disk, so memory stays bounded however large the account is. The archive is
+        written under a temporary name and renamed when complete. Progress is saved,
+        with a heartbeat, every PROGRESS_EVERY rows; a job whose heartbeat is older than
+        STALE_AFTER_MINUTES is taken to have lost its worker. Downloads are authorized
+        by a signed link valid until the archive expires after RETENTION_HOURS.
+
+"""
+
+DEFAULTS = {
+    'DIRECTORY': 'exports',
+    'CHUNK_SIZE': 2000,
+    'PROGRESS_EVERY': 5000,
+    'RETENTION_HOURS': 48,
+    'STALE_AFTER_MINUTES': 60,
+}
+
+SIGNING_SALT = 'spentra.exports'
+
+TRANSACTION_FIELDS = ['id', 'date_created', 'type', 'amount', 'currency', 'category_id', 'category_name', 'description']
+BUDGET_FIELDS = ['id', 'monthly_budget', 'currency']
+AUDIT_FIELDS = ['id', 'created_at', 'action', 'entity_id', 'data', 'ip_address']
+
+
+def get_setting(name):
+    return getattr(settings, 'EXPORTS', {}).get(name, DEFAULTS[name])
+
+
+def export_directory():
+    return Path(settings.MEDIA_ROOT) / get_setting('DIRECTORY')
+
+
+def sign_job(job):
+    return signing.Signer(salt=SIGNING_SALT).sign(str(job.pk))
+
+
+def unsign_job(value):
+    """Return the job id of a signed download link, or None."""
+    try:
+        return int(signing.Signer(salt=SIGNING_SALT).unsign(value))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def transactions_of(user):
+    return (
+        Transaction.objects.filter(user=user)
+        .annotate(currency=Coalesce('currency_info__currency', Value(base_currency(user.pk))),
+                  category_name=F('category__name'))
+        .order_by('id')
+        .values(*TRANSACTION_FIELDS)
+    )
+
+
+def budgets_of(user):
+    return (
+        Budget.objects.filter(user=user)
+        .annotate(currency=Coalesce('currency_info__currency', Value(base_currency(user.pk))))
+        .order_by('id')
+        .values(*BUDGET_FIELDS)
+    )
+
+
+def categories_of(user):
+    """The categories in the user's tree or used by their transactions, with their place in the tree."""
+    nodes = {
+        node['category_id']: node
+        for node in CategoryNode.objects.filter(user=user).values('category_id', 'parent__category_id', 'path', 'depth')
+    }
+    used = Transaction.objects.filter(user=user, category__isnull=False).values('category_id')
+    for category in Category.objects.filter(Q(id__in=list(nodes)) | Q(id__in=used)).order_by('id').values('id', 'name'):
+        node = nodes.get(category['id'], {})
+        yield {
+            **category,
+            'parent_id': node.get('parent__category_id'),
+            'path': node.get('path'),
+            'depth': node.get('depth'),
+        }
+
+
+def audit_of(user):
+    return AuditEvent.objects.filter(user=user).order_by('created_at', 'id').values(*AUDIT_FIELDS)
+
+
+def has_profiles():
+    """Whether users have the ``profile`` relation of the userProfile app."""
+    try:
+        get_user_model()._meta.get_field('profile')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def profile_of(user):
+    # Imported here: userProfile is optional, and exports must load without it.
+    from userProfile.serializers import UserSerializer
+    from userProfile.views import load_user
+
+    user = load_user(user.pk)
+    if hasattr(user, 'profile'):
+        return UserSerializer(user).data
+    return {'id': user.pk, 'username': user.username, 'email': user.email}
+
+
+class Progress:
+    """Counts written rows, saving them on the job every PROGRESS_EVERY rows."""
+
+    def __init__(self, job):
+        self.job = job
+        self.every = get_setting('PROGRESS_EVERY')
+        self.saved = 0
+
+    def section(self, name):
+        self.job.section = name
+        self.save()
+
+    def advance(self):
+        self.job.rows_written += 1
+        if self.job.rows_written - self.saved >= self.every:
+            self.save()
+
+    def save(self):
+        ExportJob.objects.filter(pk=self.job.pk).update(
+            section=self.job.section, rows_written=self.job.rows_written, heartbeat_at=timezone.now(),
+        )
+        self.saved = self.job.rows_written
+
+
+def write_ndjson(archive, name, rows, progress):
+    with archive.open(name, 'w', force_zip64=True) as entry, io.TextIOWrapper(entry, encoding='utf-8') as out:
+        for row in rows:
+            out.write(json.dumps(row, cls=DjangoJSONEncoder))
+            out.write('\n')
+            progress.advance()
+
+
+def write_csv(archive, name, fields, rows, progress):
+    with archive.open(name, 'w', force_zip64=True) as entry, \
+            io.TextIOWrapper(entry, encoding='utf-8', newline='') as out:
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            progress.advance()
+
+
+def write_archive(job, path):
+    user = job.user
+    chunk_size = get_setting('CHUNK_SIZE')
+    job.rows_total = (
+        transactions_of(user).count() * 2 + budgets_of(user).count() + audit_of(user).count()
+        + len(list(categories_of(user))) + has_profiles()
+    )
+    job.rows_written = 0
+    ExportJob.objects.filter(pk=job.pk).update(rows_total=job.rows_total, rows_written=0)
+    progress = Progress(job)
+
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        progress.section('transactions')
+        write_ndjson(archive, 'transactions.ndjson', transactions_of(user).iterator(chunk_size=chunk_size), progress)
+        write_csv(archive, 'transactions.csv', TRANSACTION_FIELDS,
+                  transactions_of(user).iterator(chunk_size=chunk_size), progress)
+        progress.section('budgets')
+        write_ndjson(archive, 'budgets.ndjson', budgets_of(user).iterator(chunk_size=chunk_size), progress)
+        progress.section('categories')
+        write_ndjson(archive, 'categories.ndjson', categories_of(user), progress)
+        if has_profiles():
+            progress.section('profile')
+            archive.writestr('profile.json', json.dumps(profile_of(user), cls=DjangoJSONEncoder, indent=2))
+            progress.advance()
+        progress.section('audit')
+        write_ndjson(archive, 'audit.ndjson', audit_of(user).iterator(chunk_size=chunk_size), progress)
+
+
+def claim_next():
+    """Mark the oldest pending job running and return it, or None.
+
+    A job left running by a worker that died is claimed again once its heartbeat is
+    STALE_AFTER_MINUTES old.
+    """
+    now = timezone.now()
+    stale = now - timedelta(minutes=get_setting('STALE_AFTER_MINUTES'))
+    with transaction.atomic():
+        job = (
+            # of=('self',): the joined user row is read, not locked.
+            ExportJob.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(Q(status='pending') | Q(status='running', heartbeat_at__lt=stale))
+            .select_related('user').order_by('created_at').first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = job.heartbeat_at = now
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_export(job):
+    """Write the archive of a claimed job; returns True if it is ready."""
+    directory = export_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    file_name = f"{job.user_id}-{uuid.uuid4().hex}.zip"
+    partial = directory / f"{file_name}.part"
+    try:
+        with use_shard(shard_for(job.user_id)):
+            write_archive(job, partial)
+        os.replace(partial, directory / file_name)
+    except Exception as e:
+        partial.unlink(missing_ok=True)
+        ExportJob.objects.filter(pk=job.pk).update(
+            status='failed', error=f"{type(e).__name__}: {e}", finished_at=timezone.now(),
+        )
+        return False
+
+    now = timezone.now()
+    job.status = 'ready'
+    job.file_name = file_name
+    job.size = (directory / file_name).stat().st_size
+    job.section = ''
+    job.finished_at = now
+    job.expires_at = now + timedelta(hours=get_setting('RETENTION_HOURS'))
+    job.save(update_fields=['status', 'file_name', 'size', 'section', 'rows_written', 'finished_at', 'expires_at'])
+    return True
+
+
+def cleanup_expired():
+    """Delete the archives of expired jobs; returns how many were removed.
+
+    Partial archives left by workers that died, untouched for STALE_AFTER_MINUTES, are deleted too.
+    """
+    directory = export_directory()
+    abandoned = time.time() - get_setting('STALE_AFTER_MINUTES') * 60
+    for partial in directory.glob('*.part'):
+        try:
+            if partial.stat().st_mtime < abandoned:
+                partial.unlink()
+        except FileNotFoundError:
+            # Renamed or removed meanwhile.
+            continue
+    expired = list(
+        ExportJob.objects.filter(status='ready', expires_at__lte=timezone.now()).values_list('pk', 'file_name')
+    )
+    for _, file_name in expired:
+        (directory / file_name).unlink(missing_ok=True)
+    ExportJob.objects.filter(pk__in=[pk for pk, _ in expired]).update(status='expired')
+    return len(expired)
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exports.archive import claim_next, cleanup_expired, run_export
+
+
+class Command(BaseCommand):
+    help = "Write pending account export archives and delete expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new export jobs.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            removed = cleanup_expired()
+            if removed:
+                self.stdout.write(f"Deleted {removed} expired archives.")
+            job = claim_next()
+            if job is not None:
+                ready = run_export(job)
+                self.stdout.write(f"Export {job.pk} for user {job.user_id}: {'ready' if ready else 'failed'}.")
+            if not options['loop']:
+                if job is None:
+                    break
+                continue
+            if job is None:
+                time.sleep(options['interval'])
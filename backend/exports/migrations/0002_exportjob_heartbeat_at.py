@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:09
+
+from django.db import migrations, models
+
+
+def heartbeat_from_start(apps, schema_editor):
+    # Jobs running across the upgrade are judged by their start, as before.
+    ExportJob = apps.get_model('exports', 'ExportJob')
+    ExportJob.objects.using(schema_editor.connection.alias).filter(status='running').update(
+        heartbeat_at=models.F('started_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(heartbeat_from_start, migrations.RunPython.noop),
+    ]
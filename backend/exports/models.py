@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        An ExportJob is one request of a user for an archive of all their data.
+        The job is queued as pending, claimed and written by the run_exports worker
+        (see exports.archive), and then ready until ``expires_at``, when the worker
+        deletes its archive and marks it expired. ``rows_written`` against
+        ``rows_total`` and ``section`` report the progress of a running job, and
+        ``heartbeat_at`` when its worker last reported it.
+
+"""
+class ExportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    section = models.CharField(max_length=32, blank=True)
+    rows_total = models.PositiveBigIntegerField(default=0)
+    rows_written = models.PositiveBigIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='export_job_status_idx'),
+            models.Index(fields=['user', '-created_at'], name='export_job_user_idx'),
+        ]
+
+    @property
+    def progress(self):
+        """Percentage of rows written; 100 once the archive is ready."""
+        if self.status == 'ready':
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(99, self.rows_written * 100 // self.rows_total)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.status} ({self.created_at:%Y-%m-%d %H:%M})"
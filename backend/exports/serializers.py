@@ -0,0 +1,23 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .archive import sign_job
+from .models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'status', 'progress', 'section', 'rows_written', 'rows_total', 'size', 'error',
+            'created_at', 'finished_at', 'expires_at', 'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'ready':
+            return None
+        return reverse('export-download', args=[sign_job(obj)])
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .archive import Progress, claim_next, cleanup_expired, export_directory, sign_job
+from .models import ExportJob
+from .views import parse_range
+
+
+def use_temporary_media(test):
+    media = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media, ignore_errors=True)
+    settings = override_settings(MEDIA_ROOT=media)
+    settings.enable()
+    test.addCleanup(settings.disable)
+    export_directory().mkdir(parents=True)
+
+
+class ClaimTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.long_ago = timezone.now() - timedelta(hours=3)
+
+    def running_job(self, heartbeat_at):
+        return ExportJob.objects.create(user=self.user, status='running', started_at=self.long_ago,
+                                        heartbeat_at=heartbeat_at)
+
+    def test_a_long_running_job_with_a_recent_heartbeat_is_left_alone(self):
+        self.running_job(heartbeat_at=timezone.now())
+        self.assertIsNone(claim_next())
+
+    def test_a_job_whose_heartbeat_stopped_is_claimed_again(self):
+        job = self.running_job(heartbeat_at=self.long_ago)
+        claimed = claim_next()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertGreater(ExportJob.objects.get(pk=job.pk).heartbeat_at, self.long_ago)
+
+    def test_saving_progress_refreshes_the_heartbeat(self):
+        job = self.running_job(heartbeat_at=self.long_ago)
+        Progress(job).section('transactions')
+        self.assertGreater(ExportJob.objects.get(pk=job.pk).heartbeat_at, self.long_ago)
+        self.assertIsNone(claim_next())
+
+
+class CleanupTests(TestCase):
+
+    def setUp(self):
+        use_temporary_media(self)
+
+    def test_partial_archives_of_dead_workers_are_removed(self):
+        abandoned = export_directory() / '1-old.zip.part'
+        writing = export_directory() / '1-new.zip.part'
+        abandoned.write_bytes(b'x')
+        writing.write_bytes(b'x')
+        two_hours_ago = time.time() - 2 * 60 * 60
+        os.utime(abandoned, (two_hours_ago, two_hours_ago))
+
+        cleanup_expired()
+        self.assertFalse(abandoned.exists())
+        self.assertTrue(writing.exists())
+
+
+class RangeParsingTests(SimpleTestCase):
+
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range(' bytes=990-2000 ', 1000), (990, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+
+    def test_ranges_answered_with_the_whole_file(self):
+        for header in ('bytes=0-1,5-9', 'items=0-9', 'bytes=-', 'bytes=a-b', ''):
+            self.assertIsNone(parse_range(header, 1000), header)
+
+    def test_unsatisfiable_ranges(self):
+        for header in ('bytes=1000-', 'bytes=500-100', 'bytes=-0'):
+            with self.assertRaises(ValueError, msg=header):
+                parse_range(header, 1000)
+
+
+class DownloadTests(TestCase):
+
+    def setUp(self):
+        use_temporary_media(self)
+        user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.content = bytes(range(256)) * 4
+        self.job = ExportJob.objects.create(
+            user=user, status='ready', file_name='1-archive.zip', size=len(self.content),
+            finished_at=timezone.now(), expires_at=timezone.now() + timedelta(days=1),
+        )
+        (export_directory() / self.job.file_name).write_bytes(self.content)
+        self.url = reverse('export-download', args=[sign_job(self.job)])
+
+    def test_a_range_request_resumes_the_download(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1000-1023/1024')
+        self.assertEqual(b''.join(response.streaming_content), self.content[1000:])
+
+    def test_a_stale_if_range_sends_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-', HTTP_IF_RANGE='"other.zip"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_an_unsatisfiable_range_is_refused(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import ExportJobDetailView, ExportJobListView, export_download
+
+urlpatterns = [
+    path('', ExportJobListView.as_view(), name='export-jobs'),
+    path('<int:id>/', ExportJobDetailView.as_view(), name='export-job'),
+    path('download/<str:signed>/', export_download, name='export-download'),
+]
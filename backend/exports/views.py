@@ -0,0 +1,132 @@
+import re
+
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from .archive import export_directory, unsign_job
+from .models import ExportJob
+from .serializers import ExportJobSerializer
+
+
+JOBS_PAGE_SIZE = 10
+STREAM_CHUNK_SIZE = 64 * 1024
+
+BYTE_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+"""
+        List the export jobs of the authenticated user, or request a new export.
+        Expects a GET request, or a POST request with no body.
+        A POST while an export is pending or running returns that job instead of queueing
+        another one. The archive is written by the run_exports worker; poll the job for
+        its ``progress`` until ``download_url`` is set.
+"""
+@query_budget(3)
+class ExportJobListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        jobs = ExportJob.objects.filter(user=request.user).order_by('-created_at')[:JOBS_PAGE_SIZE]
+        return Response(ExportJobSerializer(jobs, many=True).data)
+
+    def post(self, request):
+        job = ExportJob.objects.filter(user=request.user, status__in=['pending', 'running']).first()
+        if job is not None:
+            return Response(ExportJobSerializer(job).data, status=200)
+        job = ExportJob.objects.create(user=request.user)
+        return Response(ExportJobSerializer(job).data, status=202)
+
+
+"""
+        Retrieve one export job of the authenticated user, with its progress.
+        If the job is not found, returns an error message.
+"""
+@query_budget(2)
+class ExportJobDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        job = ExportJob.objects.filter(id=id, user=request.user).first()
+        if job is None:
+            return Response({"error": "Export not found."}, status=404)
+        return Response(ExportJobSerializer(job).data)
+
+
+def parse_range(header, size):
+    """The inclusive (start, end) of a single byte range, or None to send the whole file.
+
+    Raises ValueError if the range cannot be satisfied.
+    """
+    match = BYTE_RANGE.fullmatch(header.strip())
+    if match is None:
+        # Multiple ranges and other units are answered with the whole file.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(handle, start, end):
+    handle.seek(start)
+    remaining = end - start + 1
+    try:
+        while remaining > 0:
+            chunk = handle.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+@require_safe
+def export_download(request, signed):
+    """Serve a ready archive; the signed link is the authorization. Supports single byte ranges."""
+    job_id = unsign_job(signed)
+    job = ExportJob.objects.filter(pk=job_id, status='ready', expires_at__gt=timezone.now()).first() if job_id else None
+    if job is None:
+        raise Http404
+    path = export_directory() / job.file_name
+    if not path.exists():
+        raise Http404
+
+    etag = f'"{job.file_name}"'
+    filename = f"spentra-export-{job.finished_at:%Y-%m-%d}.zip"
+    header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    byte_range = None
+    if header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(header, job.size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{job.size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(open(path, 'rb'), start, end), status=206,
+                                         content_type='application/zip')
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f"bytes {start}-{end}/{job.size}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-store'
+    return response
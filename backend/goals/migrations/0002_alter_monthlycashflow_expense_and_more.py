@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='monthlycashflow',
+            name='expense',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14, null=True),
+        ),
+        migrations.AlterField(
+            model_name='monthlycashflow',
+            name='income',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14, null=True),
+        ),
+    ]
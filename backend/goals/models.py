@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        Models for savings goals and the cash-flow history they are projected from.
+        SavingsGoal is a target amount, optionally by a date, with the amount already
+        put aside. MonthlyCashFlow is a user's income and expense total per month,
+        maintained on every transaction write like alerts.MonthlySpend, so a projection
+        reads a handful of rows instead of summing the ledger.
+
+"""
+class SavingsGoal(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='savings_goals')
+    name = models.CharField(max_length=100)
+    target_amount = models.DecimalField(max_digits=14, decimal_places=2)
+    saved_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    target_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'target_date'], name='goals_goal_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.name}"
+
+
+class MonthlyCashFlow(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_cash_flow')
+    period = models.DateField()
+    # NULL until summed again from the ledger (see goals.projection).
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0, null=True)
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=0, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period'], name='goals_monthlycashflow_user_period_unique'),
+        ]
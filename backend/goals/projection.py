@@ -0,0 +1,261 @@
+import calendar
+import math
+from collections import defaultdict
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from alerts.tracker import period_of
+from CRUD.models import Transaction
+from currency.conversion import base_currency, convert, grouped_totals
+from currency.rates import MissingRate
+from .models import MonthlyCashFlow, SavingsGoal
+
+
+"""_summary_
+
+        Net monthly savings and savings goal projections.
+        Write paths call apply_cash_flow_change() (or apply_cash_flow_deltas() for bulk
+        writes) next to alerts.tracker.apply_expense_change(); the change is applied to
+        the user's MonthlyCashFlow row for that month as an F() update, and a month is
+        only summed from the ledger the first time it is seen.
+        Totals are in the user's base currency (see currency.conversion). A change that
+        cannot be converted, or a new base currency, sets the month's totals to NULL;
+        they stay NULL through later updates and are summed again from the ledger when
+        the month is next read.
+        The savings rate is the average income minus expense over the HISTORY_MONTHS
+        complete months before the current one, ignoring the months before the user's
+        first transaction. Goals are funded one at a time, earliest target date first,
+        so each completes once the rate has covered what is still needed for it and for
+        every goal before it: one running sum over the user's goals gives every date.
+        Projections are cached per user and month, and dropped when a goal changes or a
+        transaction in the history window is written; writes to the current month do not
+        change the rate until it is complete.
+
+"""
+
+DEFAULTS = {
+    'HISTORY_MONTHS': 6,
+    'MAX_GOALS': 20,
+    'CACHE_TIMEOUT': 60 * 60,
+}
+
+PROJECTION_CACHE_KEY = 'savings_projection_{}_{}'
+CENT = Decimal('0.01')
+ZERO = Decimal('0')
+
+
+def get_setting(name):
+    return getattr(settings, 'SAVINGS_GOALS', {}).get(name, DEFAULTS[name])
+
+
+def money(value):
+    return str(Decimal(value).quantize(CENT))
+
+
+def add_months(day, months):
+    """``day`` moved by ``months``, clamped to the end of a shorter month."""
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def history_window(today=None):
+    """The complete months the savings rate is measured over, oldest first."""
+    current = period_of(today or timezone.localdate())
+    return [add_months(current, -months) for months in range(get_setting('HISTORY_MONTHS'), 0, -1)]
+
+
+def ledger_totals(user_id, start, end):
+    """{month: (income, expense)} summed from the ledger for the months from ``start`` up to ``end``.
+
+    Totals are in the user's base currency; raises MissingRate if a currency has no rate.
+    """
+    base = base_currency(user_id)
+    transactions = Transaction.objects.filter(
+        user_id=user_id, type__in=('income', 'expense'), date_created__date__gte=start, date_created__date__lt=end,
+    )
+    totals = defaultdict(lambda: {'income': ZERO, 'expense': ZERO})
+    for row in convert(grouped_totals(transactions, base, 'type'), base, ('month', 'type')):
+        totals[row['month']][row['type']] = row['total']
+    return {month: (total['income'], total['expense']) for month, total in totals.items()}
+
+
+def apply_cash_flow_change(user, before=None, after=None):
+    """Apply one transaction write to the monthly totals.
+
+    ``before`` and ``after`` are alerts.tracker.snapshot() triples, or None for a create
+    or a delete. Call it once the ledger holds the result of the write.
+    """
+    deltas = {}
+    for values, sign in ((before, -1), (after, 1)):
+        if values is None:
+            continue
+        key = (period_of(values[2]), values[0])
+        if values[1] is None or (key in deltas and deltas[key] is None):
+            deltas[key] = None
+        else:
+            deltas[key] = deltas.get(key, 0) + sign * values[1]
+    apply_cash_flow_deltas(user.pk, deltas)
+
+
+def apply_cash_flow_deltas(user_id, deltas):
+    """Apply summed changes keyed by (month, type), e.g. from a bulk write.
+
+    A None change could not be converted to the base currency.
+    """
+    months = defaultdict(lambda: {'income': 0, 'expense': 0})
+    for (period, kind), delta in deltas.items():
+        if kind in ('income', 'expense'):
+            month = months[period]
+            month[kind] = None if delta is None or month[kind] is None else month[kind] + delta
+    window = set(history_window())
+    for period, delta in months.items():
+        if delta['income'] == 0 and delta['expense'] == 0:
+            continue
+        add_to_month(user_id, period, delta['income'], delta['expense'])
+        if period in window:
+            invalidate_projection(user_id)
+
+
+def add_to_month(user_id, period, income, expense):
+    """Add to the user's income and expense totals for ``period``; None makes them NULL."""
+    if income is None or expense is None:
+        changes = {'income': None, 'expense': None}
+    else:
+        changes = {'income': F('income') + income, 'expense': F('expense') + expense}
+    if MonthlyCashFlow.objects.filter(user_id=user_id, period=period).update(**changes):
+        return
+
+    # First write of the month: seed the totals from the ledger, which already includes this write.
+    try:
+        seeded_income, seeded_expense = ledger_totals(user_id, period, add_months(period, 1)).get(period, (0, 0))
+    except MissingRate:
+        seeded_income = seeded_expense = None
+    try:
+        with transaction.atomic():
+            MonthlyCashFlow.objects.create(user_id=user_id, period=period, income=seeded_income, expense=seeded_expense)
+    except IntegrityError:
+        add_to_month(user_id, period, income, expense)
+
+
+def monthly_history(user_id, today=None):
+    """[(month, income, expense)] over the history window, summing untracked or NULL months from the ledger once.
+
+    Raises MissingRate if one of those months cannot be converted to the base currency.
+    """
+    window = history_window(today)
+    stored = {
+        period: (income, expense)
+        for period, income, expense in MonthlyCashFlow.objects.filter(user_id=user_id, period__in=window)
+        .values_list('period', 'income', 'expense')
+    }
+    rows = {period: totals for period, totals in stored.items() if None not in totals}
+    missing = [period for period in window if period not in rows]
+    if missing:
+        totals = ledger_totals(user_id, missing[0], add_months(missing[-1], 1))
+        seeded = {period: totals.get(period, (ZERO, ZERO)) for period in missing}
+        # A concurrent write may have seeded a month first; its row is kept.
+        MonthlyCashFlow.objects.bulk_create(
+            [
+                MonthlyCashFlow(user_id=user_id, period=period, income=income, expense=expense)
+                for period, (income, expense) in seeded.items() if period not in stored
+            ],
+            ignore_conflicts=True,
+        )
+        stale = [period for period in missing if period in stored]
+        if stale:
+            MonthlyCashFlow.objects.filter(user_id=user_id, period__in=stale, income__isnull=True).update(
+                income=Case(*[When(period=period, then=Value(seeded[period][0])) for period in stale]),
+                expense=Case(*[When(period=period, then=Value(seeded[period][1])) for period in stale]),
+            )
+        rows.update(seeded)
+    return [(period, *rows[period]) for period in window]
+
+
+def monthly_savings(history):
+    """Average net savings per month, from the first month with any activity."""
+    active = list(history)
+    while active and active[0][1] == 0 and active[0][2] == 0:
+        active.pop(0)
+    if not active:
+        return ZERO
+    return (sum(income - expense for _, income, expense in active) / len(active)).quantize(CENT)
+
+
+def project(goals, savings, today):
+    """Completion dates of ``goals`` when funded one after another, in order, at ``savings`` a month.
+
+    ``goals`` are (id, name, target_amount, saved_amount, target_date) rows.
+    """
+    remaining = [max(target - saved, ZERO) for _, _, target, saved, _ in goals]
+    needed = accumulate(remaining)
+    projections = []
+    for (goal_id, name, target, saved, target_date), left, cumulative in zip(goals, remaining, needed):
+        if left == 0:
+            months = 0
+        elif savings > 0:
+            months = math.ceil(cumulative / savings)
+        else:
+            months = None
+        projected = add_months(today, months) if months is not None else None
+
+        on_track = required = None
+        if target_date is not None:
+            on_track = left == 0 or (projected is not None and projected <= target_date)
+            if left > 0:
+                # What this goal alone would need each month to be met on time.
+                months_left = max((target_date.year - today.year) * 12 + target_date.month - today.month, 1)
+                required = money(left / months_left)
+        projections.append({
+            'id': goal_id,
+            'name': name,
+            'remaining': money(left),
+            'months': months,
+            'projected_date': projected.isoformat() if projected else None,
+            'on_track': on_track,
+            'required_monthly': required,
+        })
+    return projections
+
+
+def projection(user_id, today=None):
+    """The user's savings rate and goal projections, cached until a relevant write."""
+    today = today or timezone.localdate()
+    key = PROJECTION_CACHE_KEY.format(user_id, period_of(today).isoformat())
+    data = cache.get(key)
+    if data is None:
+        history = monthly_history(user_id, today)
+        savings = monthly_savings(history)
+        goals = list(
+            SavingsGoal.objects.filter(user_id=user_id)
+            .order_by(F('target_date').asc(nulls_last=True), 'id')
+            .values_list('id', 'name', 'target_amount', 'saved_amount', 'target_date')
+        )
+        data = {
+            'as_of': today.isoformat(),
+            'monthly_savings': money(savings),
+            'history': [
+                {'period': period.isoformat(), 'income': money(income), 'expense': money(expense),
+                 'net': money(income - expense)}
+                for period, income, expense in history
+            ],
+            'goals': project(goals, savings, today),
+        }
+        cache.set(key, data, get_setting('CACHE_TIMEOUT'))
+    return data
+
+
+def forget_cash_flow(user_id):
+    """Have the user's monthly totals summed again, e.g. after their base currency changed."""
+    MonthlyCashFlow.objects.filter(user_id=user_id).update(income=None, expense=None)
+    invalidate_projection(user_id)
+
+
+def invalidate_projection(user_id):
+    cache.delete(PROJECTION_CACHE_KEY.format(user_id, period_of(timezone.localdate()).isoformat()))
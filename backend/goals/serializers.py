@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import SavingsGoal
+
+
+class SavingsGoalSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavingsGoal
+        fields = ['id', 'name', 'target_amount', 'saved_amount', 'target_date', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
+
+    def validate(self, attrs):
+        target_amount = attrs.get('target_amount', getattr(self.instance, 'target_amount', None))
+        saved_amount = attrs.get('saved_amount', getattr(self.instance, 'saved_amount', 0))
+
+        if target_amount is not None and target_amount <= 0:
+            raise serializers.ValidationError({"target_amount": "target_amount must be positive."})
+        if saved_amount is not None and saved_amount < 0:
+            raise serializers.ValidationError({"saved_amount": "saved_amount must not be negative."})
+        return attrs
@@ -0,0 +1,110 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from alerts.tracker import period_of
+from CRUD.models import Transaction
+from .models import MonthlyCashFlow, SavingsGoal
+from .projection import add_months, history_window, monthly_savings, project, projection
+
+
+BUDGETS = {'ENABLED': True, 'MODE': 'raise', 'N_PLUS_ONE_THRESHOLD': 3}
+
+
+@override_settings(QUERY_BUDGET=BUDGETS)
+class FirstWriteOfTheMonthTests(TestCase):
+    """The first write of a month seeds both trackers from the ledger, the most a write costs."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.header = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def test_delete_in_an_untracked_month_fits_the_budget(self):
+        expense = Transaction.objects.create(user=self.user, type='expense', amount=Decimal('100.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('delete-transaction', args=[expense.pk]), **self.header)
+        self.assertEqual(response.status_code, 204)
+        period = period_of(timezone.now())
+        self.assertEqual(MonthlyCashFlow.objects.values_list('income', 'expense').get(user=self.user, period=period),
+                         (0, 0))
+
+
+class ProjectionArithmeticTests(SimpleTestCase):
+
+    def test_add_months_clamps_to_the_end_of_the_month(self):
+        self.assertEqual(add_months(date(2026, 1, 31), 1), date(2026, 2, 28))
+        self.assertEqual(add_months(date(2026, 11, 15), 3), date(2027, 2, 15))
+        self.assertEqual(add_months(date(2026, 3, 31), -13), date(2025, 2, 28))
+
+    @override_settings(SAVINGS_GOALS={'HISTORY_MONTHS': 3})
+    def test_history_window_is_the_complete_months_before_today(self):
+        self.assertEqual(history_window(date(2026, 2, 17)), [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1)])
+
+    def test_monthly_savings_ignores_months_before_any_activity(self):
+        history = [
+            (date(2026, 1, 1), Decimal('0'), Decimal('0')),
+            (date(2026, 2, 1), Decimal('1000'), Decimal('700')),
+            (date(2026, 3, 1), Decimal('0'), Decimal('0')),
+            (date(2026, 4, 1), Decimal('1000'), Decimal('600')),
+        ]
+        self.assertEqual(monthly_savings(history), Decimal('233.33'))
+        self.assertEqual(monthly_savings(history[:1]), 0)
+
+    def test_goals_are_funded_one_after_another(self):
+        today = date(2026, 1, 10)
+        goals = [
+            (1, 'Laptop', Decimal('1000'), Decimal('400'), date(2026, 3, 1)),
+            (2, 'Trip', Decimal('900'), Decimal('0'), date(2026, 6, 1)),
+            (3, 'Done', Decimal('50'), Decimal('80'), None),
+        ]
+        laptop, trip, done = project(goals, Decimal('300'), today)
+        self.assertEqual((laptop['months'], laptop['projected_date'], laptop['on_track']), (2, '2026-03-10', False))
+        self.assertEqual(laptop['required_monthly'], '300.00')
+        self.assertEqual((trip['months'], trip['projected_date'], trip['on_track']), (5, '2026-06-10', False))
+        self.assertEqual((done['remaining'], done['months'], done['on_track']), ('0.00', 0, None))
+
+    def test_no_projected_date_without_savings(self):
+        goal, = project([(1, 'Car', Decimal('100'), Decimal('0'), date(2026, 12, 1))], Decimal('-5'), date(2026, 1, 1))
+        self.assertEqual((goal['months'], goal['projected_date'], goal['on_track']), (None, None, False))
+        self.assertEqual(goal['required_monthly'], '9.09')
+
+
+@override_settings(SAVINGS_GOALS={'HISTORY_MONTHS': 2})
+class ProjectionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.today = timezone.localdate()
+        self.last_month, self.month_before = add_months(self.today, -1), add_months(self.today, -2)
+
+    def add(self, amount, type, day):
+        transaction = Transaction.objects.create(user=self.user, type=type, amount=Decimal(amount))
+        Transaction.objects.filter(pk=transaction.pk).update(
+            date_created=timezone.make_aware(datetime.combine(day, time(12))),
+        )
+
+    def test_untracked_and_stale_months_are_summed_from_the_ledger(self):
+        self.add('900.00', 'income', self.month_before)
+        self.add('500.00', 'expense', self.month_before)
+        self.add('800.00', 'income', self.last_month)
+        MonthlyCashFlow.objects.create(user=self.user, period=period_of(self.last_month), income=None, expense=None)
+        SavingsGoal.objects.create(user=self.user, name='Laptop', target_amount=Decimal('1200'))
+
+        data = projection(self.user.pk, self.today)
+        self.assertEqual(data['monthly_savings'], '600.00')
+        self.assertEqual([row['net'] for row in data['history']], ['400.00', '800.00'])
+        self.assertEqual(data['goals'][0]['months'], 2)
+        self.assertEqual(
+            set(MonthlyCashFlow.objects.filter(user=self.user).values_list('income', 'expense')),
+            {(Decimal('900.00'), Decimal('500.00')), (Decimal('800.00'), Decimal('0.00'))},
+        )
+        with self.assertNumQueries(0):
+            projection(self.user.pk, self.today)
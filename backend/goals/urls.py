@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import SavingsGoalDetailView, SavingsGoalListView, SavingsProjectionView
+
+urlpatterns = [
+    path('', SavingsGoalListView.as_view(), name='savings-goals'),
+    path('<int:id>/', SavingsGoalDetailView.as_view(), name='savings-goal'),
+    path('projection/', SavingsProjectionView.as_view(), name='savings-projection'),
+]
@@ -0,0 +1,91 @@
+from django.db.models import F
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from currency.rates import MissingRate
+from monitoring.querybudget import query_budget
+from .models import SavingsGoal
+from .projection import get_setting, invalidate_projection, projection
+from .serializers import SavingsGoalSerializer
+
+
+"""
+        List or create the authenticated user's savings goals.
+        Expects a GET request, or a POST request with ``name``, ``target_amount`` and
+        optionally ``saved_amount`` and ``target_date``.
+        A user has at most SAVINGS_GOALS['MAX_GOALS'] goals.
+"""
+@query_budget(3)
+class SavingsGoalListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        goals = SavingsGoal.objects.filter(user=request.user).order_by(F('target_date').asc(nulls_last=True), 'id')
+        return Response(SavingsGoalSerializer(goals, many=True).data)
+
+    def post(self, request):
+        serializer = SavingsGoalSerializer(data=request.data)
+        if serializer.is_valid():
+            if SavingsGoal.objects.filter(user=request.user).count() >= get_setting('MAX_GOALS'):
+                return Response({"error": f"You can have at most {get_setting('MAX_GOALS')} savings goals."}, status=400)
+            serializer.save(user=request.user)
+            invalidate_projection(request.user.pk)
+            return Response(serializer.data, status=201)
+        return Response(serializer.errors, status=400)
+
+
+"""
+        Retrieve, update or delete one of the authenticated user's savings goals.
+        Update ``saved_amount`` as money is put aside for the goal.
+        If the goal is not found, returns an error message.
+"""
+@query_budget(3)
+class SavingsGoalDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        try:
+            goal = SavingsGoal.objects.get(id=id, user=request.user)
+        except SavingsGoal.DoesNotExist:
+            return Response({"error": "Savings goal not found."}, status=404)
+        return Response(SavingsGoalSerializer(goal).data)
+
+    def put(self, request, id):
+        try:
+            goal = SavingsGoal.objects.get(id=id, user=request.user)
+        except SavingsGoal.DoesNotExist:
+            return Response({"error": "Savings goal not found."}, status=404)
+        serializer = SavingsGoalSerializer(goal, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            invalidate_projection(request.user.pk)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=400)
+
+    def delete(self, request, id):
+        deleted, _ = SavingsGoal.objects.filter(id=id, user=request.user).delete()
+        if not deleted:
+            return Response({"error": "Savings goal not found."}, status=404)
+        invalidate_projection(request.user.pk)
+        return Response({"message": "Savings goal deleted successfully."}, status=204)
+
+
+"""
+        Project when the authenticated user reaches each savings goal at the current rate.
+        Expects a GET request. Returns ``monthly_savings`` (average income minus expense
+        over the recent complete months), the ``history`` it was measured over, and for
+        each goal, funded earliest target date first, the ``projected_date``, whether it
+        is ``on_track`` for its target date and the ``required_monthly`` amount to be.
+        ``projected_date`` is null while the user saves nothing. Amounts are in the
+        user's base currency; returns an error if an exchange rate is missing.
+"""
+@query_budget(7)
+class SavingsProjectionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            return Response(projection(request.user.pk))
+        except MissingRate as e:
+            return Response({"error": str(e)}, status=400)
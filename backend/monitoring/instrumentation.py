@@ -0,0 +1,180 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+"""_summary_
+
+        Per-request performance instrumentation for the Spentra backend.
+        A RequestMetrics object is bound to the current request through a context variable,
+        so database wrappers, renderers and outbound HTTP calls can add their timings to it
+        without the object being passed around. Finished requests are folded into an
+        in-process MetricsRegistry which the /metrics endpoint renders in Prometheus format.
+        The registry is per process: with several workers, Prometheus scrapes each one.
+
+"""
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar('spentra_request_metrics', default=None)
+
+
+def get_setting(name, default=None):
+    return getattr(settings, 'MONITORING', {}).get(name, default)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'db_time', 'spans')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans = {}
+
+    def add_span(self, name, duration):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    """Return the RequestMetrics of the request being handled, or None."""
+    return _current.get()
+
+
+def activate():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """Time a block of code and add it to the current request under ``name``."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_span(name, time.perf_counter() - started)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper hook counting queries and database time."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe, in-process aggregation of finished requests keyed by route."""
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or DEFAULT_LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._db_time = {}
+        self._queries = {}
+        self._responses = {}
+
+    def observe(self, route, method, status, metrics, duration):
+        key = (route, method)
+        status_key = (route, method, str(status))
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(self.buckets)
+            histogram.observe(duration)
+            self._db_time[key] = self._db_time.get(key, 0.0) + metrics.db_time
+            self._queries[key] = self._queries.get(key, 0) + metrics.queries
+            self._responses[status_key] = self._responses.get(status_key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._db_time.clear()
+            self._queries.clear()
+            self._responses.clear()
+
+    def render(self):
+        """Render all series in the Prometheus text exposition format."""
+        with self._lock:
+            latency = {key: (list(h.counts), h.total, h.count) for key, h in self._latency.items()}
+            db_time = dict(self._db_time)
+            queries = dict(self._queries)
+            responses = dict(self._responses)
+
+        lines = [
+            '# HELP spentra_request_duration_seconds Request latency by route.',
+            '# TYPE spentra_request_duration_seconds histogram',
+        ]
+        for (route, method), (counts, total, count) in sorted(latency.items()):
+            labels = f'route="{_escape(route)}",method="{method}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'spentra_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'spentra_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'spentra_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'spentra_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines.append('# HELP spentra_request_db_seconds_total Time spent in database queries by route.')
+        lines.append('# TYPE spentra_request_db_seconds_total counter')
+        for (route, method), value in sorted(db_time.items()):
+            lines.append(f'spentra_request_db_seconds_total{{route="{_escape(route)}",method="{method}"}} {value:.6f}')
+
+        lines.append('# HELP spentra_request_db_queries_total Database queries executed by route.')
+        lines.append('# TYPE spentra_request_db_queries_total counter')
+        for (route, method), value in sorted(queries.items()):
+            lines.append(f'spentra_request_db_queries_total{{route="{_escape(route)}",method="{method}"}} {value}')
+
+        lines.append('# HELP spentra_responses_total Responses by route and status code.')
+        lines.append('# TYPE spentra_responses_total counter')
+        for (route, method, status), value in sorted(responses.items()):
+            lines.append(
+                f'spentra_responses_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {value}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry(get_setting('LATENCY_BUCKETS'))
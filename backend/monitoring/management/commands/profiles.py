@@ -0,0 +1,80 @@
+import json
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring import profiling
+
+
+class Command(BaseCommand):
+    help = "List, aggregate and enable captured request profiles (see monitoring/profiling.py)."
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        list_parser = subparsers.add_parser('list', help='List captured profiles.')
+        list_parser.add_argument('--route', help='Only show profiles of this route, e.g. /crud/dashboard/summary/.')
+        list_parser.add_argument('--user', help='Only show profiles of this user id.')
+
+        aggregate_parser = subparsers.add_parser('aggregate', help='Merge profiles into one set of collapsed stacks.')
+        aggregate_parser.add_argument('--route', help='Only merge profiles of this route.')
+        aggregate_parser.add_argument('--user', help='Only merge profiles of this user id.')
+        aggregate_parser.add_argument('--since', help='Only merge profiles created at or after this ISO timestamp.')
+        aggregate_parser.add_argument('--format', choices=['collapsed', 'speedscope'], default='collapsed')
+        aggregate_parser.add_argument('--output', help='Write the merged profile to this file instead of stdout.')
+        aggregate_parser.add_argument('--top', type=int, default=0, help='Also print the N hottest leaf frames.')
+
+        sign_parser = subparsers.add_parser('sign', help='Print a signed X-Spentra-Profile header value.')
+        sign_parser.add_argument('label', nargs='?', default='manual')
+
+    def handle(self, *args, **options):
+        if options['action'] == 'sign':
+            self.stdout.write(profiling.sign_header(options['label']))
+            return
+
+        profiles = [meta for meta in profiling.iter_profiles() if self.matches(meta, options)]
+        if options['action'] == 'list':
+            for meta in profiles:
+                self.stdout.write(
+                    f"{meta['id']}  {meta['method']:<6} {meta['route']:<40} user={meta['user_id'] or '-'} "
+                    f"{meta['duration_ms']:>9.2f}ms  {meta['samples']:>6} samples  {meta['reason']}"
+                )
+            self.stdout.write(f"{len(profiles)} profile(s)")
+            return
+
+        if not profiles:
+            raise CommandError("No profiles match the given filters.")
+        stacks = Counter()
+        for meta in profiles:
+            stacks.update(profiling.load_stacks(meta))
+
+        if options['format'] == 'speedscope':
+            interval = profiles[0]['interval']
+            output = json.dumps(profiling.speedscope(stacks, f"{len(profiles)} profiles", interval))
+        else:
+            output = profiling.collapsed(stacks)
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(f"Merged {len(profiles)} profile(s) into {options['output']}")
+        else:
+            self.stdout.write(output, ending='')
+
+        if options['top']:
+            leaves = Counter()
+            for stack, count in stacks.items():
+                leaves[stack.rsplit(';', 1)[-1]] += count
+            total = sum(leaves.values())
+            for frame, count in leaves.most_common(options['top']):
+                self.stderr.write(f"{count / total:7.2%}  {frame}")
+
+    @staticmethod
+    def matches(meta, options):
+        if options.get('route') and meta['route'] != options['route']:
+            return False
+        if options.get('user') and str(meta['user_id']) != options['user']:
+            return False
+        if options.get('since') and meta['created'] < options['since']:
+            return False
+        return True
@@ -0,0 +1,183 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import instrumentation, profiling, querybudget
+
+
+logger = logging.getLogger('spentra.requests')
+
+
+def token_user_id(request):
+    """The user id of the request's access token, or None; runs no query."""
+    # Authentication happens inside the DRF view, so read the user id from the token directly.
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = authenticator.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return str(token.get(jwt_settings.USER_ID_CLAIM))
+
+
+"""_summary_
+
+        RequestMetricsMiddleware wraps every request with the instrumentation in
+        monitoring.instrumentation. It counts queries and database time on every configured
+        connection, then reports the totals three ways: a Server-Timing response header,
+        one structured log line on the "spentra.requests" logger, and the in-process
+        registry rendered by /metrics. It should sit near the top of MIDDLEWARE so that
+        queries made by other middleware (sessions, authentication) are included.
+
+"""
+class RequestMetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = instrumentation.get_setting('SERVER_TIMING', True)
+        self.log_requests = instrumentation.get_setting('LOG_REQUESTS', True)
+        self.exclude_paths = tuple(instrumentation.get_setting('EXCLUDE_PATHS', ('/metrics',)))
+
+    def __call__(self, request):
+        if request.path.startswith(self.exclude_paths):
+            return self.get_response(request)
+
+        metrics, token = instrumentation.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(instrumentation.db_execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+
+        duration = metrics.elapsed
+        match = getattr(request, 'resolver_match', None)
+        route = '/' + match.route if match is not None else '<unresolved>'
+        view = (match.view_name or match._func_path) if match is not None else ''
+
+        instrumentation.registry.observe(route, request.method, response.status_code, metrics, duration)
+        if self.server_timing:
+            response['Server-Timing'] = self.format_server_timing(metrics, duration)
+        if self.log_requests:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'route': route,
+                'view': view,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'queries': metrics.queries,
+                'db_ms': round(metrics.db_time * 1000, 2),
+                **{f'{name}_ms': round(value * 1000, 2) for name, value in metrics.spans.items()},
+            }))
+        return response
+
+    @staticmethod
+    def format_server_timing(metrics, duration):
+        parts = [f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"']
+        for name, value in metrics.spans.items():
+            parts.append(f'{name};dur={value * 1000:.2f}')
+        parts.append(f'total;dur={duration * 1000:.2f}')
+        return ', '.join(parts)
+
+
+
+"""_summary_
+
+        ProfilingMiddleware captures a statistical profile of selected requests
+        (see monitoring.profiling). A request is profiled when it carries a valid signed
+        X-Spentra-Profile header, or when it matches PROFILING['ROUTES'] (route pattern or
+        URL name) and PROFILING['USERS'] (user ids taken from the JWT) and passes the
+        PROFILING['SAMPLE_RATE'] draw; empty filters match everything. When
+        PROFILING['ENABLED'] is false the middleware removes itself at startup.
+
+"""
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        if not profiling.get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = profiling.get_setting('SAMPLE_RATE')
+        self.routes = set(profiling.get_setting('ROUTES'))
+        self.users = {str(user_id) for user_id in profiling.get_setting('USERS')}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        sampler = getattr(request, '_profile_sampler', None)
+        if sampler is not None:
+            sampler.stop()
+            profile_id = profiling.save_profile(
+                sampler, request, '/' + request.resolver_match.route,
+                user_id=request._profile_user_id, reason=request._profile_reason,
+            )
+            response['X-Spentra-Profile-Id'] = profile_id
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        user_id = None
+        header = request.META.get(profiling.PROFILE_HEADER)
+        label = profiling.check_header(header) if header else None
+        if label is not None:
+            reason = f'header:{label}'
+        else:
+            match = request.resolver_match
+            if self.routes and '/' + match.route not in self.routes and match.view_name not in self.routes:
+                return None
+            if self.users:
+                user_id = self.get_user_id(request)
+                if user_id not in self.users:
+                    return None
+            if random.random() >= self.sample_rate:
+                return None
+            reason = 'sampled'
+
+        request._profile_reason = reason
+        request._profile_user_id = user_id
+        request._profile_sampler = profiling.StackSampler().start()
+        return None
+
+    @staticmethod
+    def get_user_id(request):
+        return token_user_id(request)
+
+
+
+"""_summary_
+
+        QueryBudgetMiddleware runs each view under a querybudget.QueryGuard and reports
+        requests that exceed the view's declared query budget or repeat one SQL shape
+        (N+1). It is meant for debug and test runs and removes itself at startup unless
+        QUERY_BUDGET['ENABLED'] is set.
+
+"""
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        if not querybudget.get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        guard = getattr(request, '_query_guard', None)
+        if guard is not None:
+            guard.__exit__(None, None, None)
+            guard.check()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        label = f'{request.method} /{request.resolver_match.route}'
+        request._query_guard = querybudget.QueryGuard(querybudget.get_query_budget(view_func), label).__enter__()
+        return None
@@ -0,0 +1,194 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+
+"""_summary_
+
+        Statistical request profiler used by monitoring.middleware.ProfilingMiddleware.
+        A StackSampler runs a daemon thread that reads the stack of the request thread
+        every PROFILING['INTERVAL'] seconds through sys._current_frames(), so the profiled
+        code itself is not traced. Samples are folded into "collapsed stacks"
+        (frame;frame;frame count) and written under MEDIA_ROOT/<DIRECTORY> either as
+        .folded text or as speedscope JSON, each with a .json metadata sidecar that the
+        "profiles" management command reads to list and aggregate captures.
+
+"""
+
+PROFILE_HEADER = 'HTTP_X_SPENTRA_PROFILE'
+SIGNING_SALT = 'spentra.profiling'
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.0,
+    'ROUTES': (),
+    'USERS': (),
+    'INTERVAL': 0.005,
+    'FORMAT': 'collapsed',
+    'DIRECTORY': 'profiles',
+    'HEADER_MAX_AGE': 3600,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'PROFILING', {}).get(name, DEFAULTS[name])
+
+
+def profile_directory():
+    return Path(settings.MEDIA_ROOT) / get_setting('DIRECTORY')
+
+
+def sign_header(label='manual'):
+    """Return a value for the X-Spentra-Profile header that enables profiling."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(label)
+
+
+def check_header(value):
+    """Return the label of a valid signed header value, or None."""
+    try:
+        return signing.TimestampSigner(salt=SIGNING_SALT).unsign(value, max_age=get_setting('HEADER_MAX_AGE'))
+    except signing.BadSignature:
+        return None
+
+
+def frame_name(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f'{module}:{code.co_name}:{code.co_firstlineno}'
+
+
+class StackSampler:
+
+    def __init__(self, interval=None):
+        self.interval = interval or get_setting('INTERVAL')
+        self.stacks = Counter()
+        self.samples = 0
+        self.target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='spentra-profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None or self._stop.is_set():
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+            self.samples += 1
+
+
+def collapsed(stacks):
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def speedscope(stacks, name, interval):
+    frames = []
+    index = {}
+    samples = []
+    weights = []
+    for stack, count in stacks.items():
+        sample = []
+        for frame in stack.split(';'):
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({'name': frame})
+            sample.append(index[frame])
+        samples.append(sample)
+        weights.append(count * interval)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+    }
+
+
+def save_profile(sampler, request, route, user_id=None, reason=''):
+    """Write the sampled stacks and their metadata sidecar, returning the profile id."""
+    directory = profile_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f'{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+    output_format = get_setting('FORMAT')
+    name = f'{request.method} {route}'
+
+    if output_format == 'speedscope':
+        filename = f'{profile_id}.speedscope.json'
+        (directory / filename).write_text(json.dumps(speedscope(sampler.stacks, name, sampler.interval)))
+    else:
+        filename = f'{profile_id}.folded'
+        (directory / filename).write_text(collapsed(sampler.stacks))
+
+    meta = {
+        'id': profile_id,
+        'file': filename,
+        'format': output_format,
+        'method': request.method,
+        'path': request.path,
+        'route': route,
+        'user_id': user_id,
+        'reason': reason,
+        'duration_ms': round(sampler.duration * 1000, 2),
+        'samples': sampler.samples,
+        'interval': sampler.interval,
+        'created': timezone.now().isoformat(),
+    }
+    (directory / f'{profile_id}.json').write_text(json.dumps(meta))
+    return profile_id
+
+
+def iter_profiles():
+    """Yield the metadata of every stored profile, oldest first."""
+    directory = profile_directory()
+    if not directory.exists():
+        return
+    for path in sorted(directory.glob('*.json')):
+        if path.name.endswith('.speedscope.json'):
+            continue
+        yield json.loads(path.read_text())
+
+
+def load_stacks(meta):
+    """Read a stored profile back into a Counter of collapsed stacks."""
+    path = profile_directory() / meta['file']
+    stacks = Counter()
+    if meta['format'] == 'speedscope':
+        document = json.loads(path.read_text())
+        frames = [frame['name'] for frame in document['shared']['frames']]
+        profile = document['profiles'][0]
+        for sample, weight in zip(profile['samples'], profile['weights']):
+            stacks[';'.join(frames[i] for i in sample)] += round(weight / meta['interval'])
+    else:
+        for line in path.read_text().splitlines():
+            stack, _, count = line.rpartition(' ')
+            stacks[stack] += int(count)
+    return stacks
@@ -0,0 +1,128 @@
+import logging
+import re
+import traceback
+import warnings
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('spentra.querybudget')
+
+
+"""_summary_
+
+        Query budgets for views. A view declares the maximum number of queries one request
+        may run, either with the @query_budget(n) decorator or a ``query_budget = n`` class
+        attribute. While QUERY_BUDGET['ENABLED'] is on (debug and test runs),
+        monitoring.middleware.QueryBudgetMiddleware runs every view under a QueryGuard,
+        which records each query's SQL shape and the application stack that issued it.
+        A request that exceeds its budget, or repeats one SQL shape N_PLUS_ONE_THRESHOLD
+        times or more (the signature of an N+1 lookup in a nested serializer), is reported
+        by raising QueryBudgetExceeded or by a warning, depending on QUERY_BUDGET['MODE'].
+
+"""
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MODE': 'warn',
+    'N_PLUS_ONE_THRESHOLD': 3,
+}
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+# Not counted: outside TestCase's wrapping transaction every atomic() block issues BEGIN.
+_TRANSACTION_CONTROL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+_BACKEND_ROOT = str(settings.BASE_DIR)
+_SKIP_PATHS = ('site-packages', 'monitoring/querybudget.py', 'monitoring/middleware.py', 'monitoring/instrumentation.py')
+
+
+def get_setting(name):
+    return getattr(settings, 'QUERY_BUDGET', {}).get(name, DEFAULTS[name])
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of queries a view may run per request."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(view_func):
+    view = getattr(view_func, 'view_class', view_func)
+    return getattr(view, 'query_budget', None)
+
+
+def sql_shape(sql):
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def application_stack():
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(_BACKEND_ROOT) and not any(skip in frame.filename for skip in _SKIP_PATHS)
+    ]
+    return ''.join(traceback.format_list(frames)) or '  (no application frames)\n'
+
+
+class QueryGuard:
+    """Record every query run inside the block and check it against a budget."""
+
+    def __init__(self, budget=None, label='', threshold=None):
+        self.budget = budget
+        self.label = label
+        self.threshold = max(2, threshold or get_setting('N_PLUS_ONE_THRESHOLD'))
+        self.count = 0
+        self.shapes = defaultdict(list)
+        self._stack = ExitStack()
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._stack.close()
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(_TRANSACTION_CONTROL):
+            return execute(sql, params, many, context)
+        self.count += 1
+        shape = sql_shape(sql)
+        stacks = self.shapes[shape]
+        # Only the first occurrences are kept; they are enough to locate the loop.
+        if len(stacks) < self.threshold:
+            stacks.append(application_stack())
+        else:
+            stacks.append(None)
+        return execute(sql, params, many, context)
+
+    def problems(self):
+        problems = []
+        if self.budget is not None and self.count > self.budget:
+            problems.append(f"{self.label} ran {self.count} queries, budget is {self.budget}.")
+        for shape, stacks in self.shapes.items():
+            if len(stacks) >= self.threshold:
+                problems.append(
+                    f"{self.label} repeated the same query {len(stacks)} times (possible N+1):\n"
+                    f"    {shape}\n"
+                    f"  first repeat issued from:\n{stacks[1]}"
+                )
+        return problems
+
+    def check(self, mode=None):
+        problems = self.problems()
+        if not problems:
+            return
+        message = '\n'.join(problems)
+        if (mode or get_setting('MODE')) == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        warnings.warn(message, RuntimeWarning, stacklevel=2)
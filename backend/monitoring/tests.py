@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from alerts.views import NotificationListView
+from .querybudget import QueryBudgetExceeded, QueryGuard
+
+
+BUDGETS = {'ENABLED': True, 'MODE': 'raise', 'N_PLUS_ONE_THRESHOLD': 3}
+
+
+class QueryGuardTests(TransactionTestCase):
+    """Runs in autocommit, like a real request: every atomic() block issues BEGIN and COMMIT."""
+
+    def test_transaction_control_is_not_counted(self):
+        User = get_user_model()
+        with QueryGuard(budget=2) as guard:
+            with transaction.atomic():
+                User.objects.exists()
+            User.objects.bulk_create([User(username='a', email='a@example.com')])
+        self.assertEqual(guard.count, 2)
+        self.assertEqual(guard.problems(), [])
+
+    def test_exceeding_the_budget_raises(self):
+        with QueryGuard(budget=1, label='GET /x/') as guard:
+            get_user_model().objects.exists()
+            get_user_model().objects.count()
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'GET /x/ ran 2 queries, budget is 1.'):
+            guard.check(mode='raise')
+
+    def test_repeated_queries_are_reported_with_their_stack(self):
+        with QueryGuard(label='GET /x/', threshold=3) as guard:
+            for pk in range(3):
+                get_user_model().objects.filter(pk=pk).exists()
+        problems = guard.problems()
+        self.assertEqual(len(problems), 1)
+        self.assertIn('possible N+1', problems[0])
+        self.assertIn('monitoring/tests.py', problems[0])
+
+
+@override_settings(QUERY_BUDGET=BUDGETS)
+class QueryBudgetMiddlewareTests(TransactionTestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='a', email='a@example.com', password='x')
+        self.header = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(user)}"}
+
+    def test_views_within_budget_pass(self):
+        self.assertEqual(self.client.get('/alerts/notifications/', **self.header).status_code, 200)
+
+    def test_views_over_budget_fail(self):
+        with mock.patch.object(NotificationListView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/alerts/notifications/', **self.header)
@@ -0,0 +1,13 @@
+from django.http import HttpResponse
+
+from .instrumentation import registry
+
+
+"""
+        Expose the request metrics collected by RequestMetricsMiddleware.
+        Expects a GET request, typically from a Prometheus scraper.
+        Returns latency histograms, query counts and database time per route
+        in the Prometheus text exposition format.
+"""
+def metrics_view(request):
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
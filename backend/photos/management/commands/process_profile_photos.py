@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from photos.processing import process_pending
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and WebP variants for uploaded profile photos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new uploads.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            ready, failed = process_pending(options['batch_size'])
+            if ready or failed:
+                self.stdout.write(f"Processed {ready} photos, {failed} failed.")
+            if not options['loop']:
+                break
+            if ready + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+"""_summary_
+
+        A StoredPhoto is one distinct uploaded image, stored once under its SHA-256
+        however many times it is uploaded. ``status`` tracks the off-request generation
+        of its variants (see photos.processing); ``variants`` lists the ones written.
+
+"""
+class StoredPhoto(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    original = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=32)
+    size = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    variants = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='stored_photo_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256} ({self.status})"
@@ -0,0 +1,68 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import StoredPhoto
+from .storage import get_setting, variant_name
+
+
+"""_summary_
+
+        Off-request generation of photo variants: square thumbnails of every configured
+        size in every configured format (WebP and a JPEG fallback by default).
+        process_pending() is run by the process_profile_photos command; each photo is
+        claimed with SKIP LOCKED where supported, so several workers can run at once.
+        Pillow is only imported here, by the worker.
+
+"""
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+
+
+def render_variants(photo):
+    from PIL import Image, ImageOps
+
+    with default_storage.open(photo.original, 'rb') as handle:
+        image = Image.open(handle)
+        image.seek(0)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    written = []
+    for size in get_setting('SIZES'):
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for image_format in get_setting('FORMATS'):
+            name = variant_name(photo.sha256, size, image_format)
+            if not default_storage.exists(name):
+                buffer = BytesIO()
+                thumbnail.save(buffer, PIL_FORMATS[image_format], quality=get_setting('QUALITY'), optimize=True)
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+            written.append(name)
+    return written
+
+
+def process_pending(limit=50):
+    """Generate variants for up to ``limit`` pending photos; returns (ready, failed)."""
+    ready = failed = 0
+    for _ in range(limit):
+        with transaction.atomic():
+            photo = (
+                StoredPhoto.objects.select_for_update(skip_locked=True)
+                .filter(status='pending').order_by('created_at').first()
+            )
+            if photo is None:
+                break
+            try:
+                photo.variants = render_variants(photo)
+                photo.status = 'ready'
+                photo.error = ''
+                ready += 1
+            except Exception as e:
+                photo.status = 'failed'
+                photo.error = f"{type(e).__name__}: {e}"
+                failed += 1
+            photo.processed_at = timezone.now()
+            photo.save(update_fields=['variants', 'status', 'error', 'processed_at'])
+    return ready, failed
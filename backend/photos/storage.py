@@ -0,0 +1,152 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+
+from .models import StoredPhoto
+
+
+"""_summary_
+
+        Content-addressed storage for profile photos.
+        Uploads go through HashingUploadHandler, which writes each chunk straight to a
+        temporary file on disk while hashing and sniffing it, and stops reading as soon
+        as the upload is too large, so a photo is never held in memory. store() then
+        saves the file under its SHA-256; a photo that was uploaded before is not
+        written again. Originals and variants are served by photos.views.photo_file
+        with far-future cache headers, which is safe because a name never changes
+        content.
+
+"""
+
+DEFAULTS = {
+    'MAX_UPLOAD_SIZE': 10 * 1024 * 1024,
+    'SIZES': [64, 128, 256],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'CACHE_MAX_AGE': 60 * 60 * 24 * 365,
+    'LOCATION': 'photos',
+}
+
+# Magic numbers of the accepted formats, checked against the first chunk.
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', 'png'),
+    (b'GIF87a', 'image/gif', 'gif'),
+    (b'GIF89a', 'image/gif', 'gif'),
+]
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+SHA256 = re.compile(r'[0-9a-f]{64}')
+
+
+def get_setting(name):
+    return getattr(settings, 'PROFILE_PHOTOS', {}).get(name, DEFAULTS[name])
+
+
+def sniff(head):
+    """Return (content_type, extension) for the leading bytes of an image, or (None, None)."""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    for signature, content_type, extension in SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    return None, None
+
+
+class UploadRejected(Exception):
+    pass
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Streams an upload to a temporary file, hashing and size-checking it chunk by chunk."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > get_setting('MAX_UPLOAD_SIZE'):
+            raise StopUpload(connection_reset=True)
+        if len(self.head) < 16:
+            self.head += raw_data[:16 - len(self.head)]
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.digest.hexdigest()
+        uploaded.content_type, uploaded.extension = sniff(self.head)
+        return uploaded
+
+
+def photo_name(sha256, extension):
+    return f"{get_setting('LOCATION')}/{sha256[:2]}/{sha256}.{extension}"
+
+
+def variant_name(sha256, size, image_format):
+    return f"{get_setting('LOCATION')}/{sha256[:2]}/{sha256}_{size}.{EXTENSIONS[image_format]}"
+
+
+def fingerprint(uploaded):
+    """Hash and sniff a file that did not come through HashingUploadHandler."""
+    digest = hashlib.sha256()
+    head = b''
+    for chunk in uploaded.chunks():
+        if len(head) < 16:
+            head += chunk[:16 - len(head)]
+        digest.update(chunk)
+    uploaded.seek(0)
+    uploaded.sha256 = digest.hexdigest()
+    uploaded.content_type, uploaded.extension = sniff(head)
+
+
+def store(uploaded):
+    """Save an uploaded image under its hash and return its StoredPhoto."""
+    if not hasattr(uploaded, 'sha256'):
+        fingerprint(uploaded)
+    if uploaded.content_type is None:
+        raise UploadRejected("Upload a JPEG, PNG, GIF or WebP image.")
+    existing = StoredPhoto.objects.filter(sha256=uploaded.sha256).first()
+    if existing is not None:
+        return existing
+
+    name = photo_name(uploaded.sha256, uploaded.extension)
+    if not default_storage.exists(name):
+        default_storage.save(name, uploaded)
+    try:
+        with transaction.atomic():
+            return StoredPhoto.objects.create(
+                sha256=uploaded.sha256, original=name, content_type=uploaded.content_type, size=uploaded.size,
+            )
+    except IntegrityError:
+        # The same photo was uploaded concurrently.
+        return StoredPhoto.objects.get(sha256=uploaded.sha256)
+
+
+def photo_urls(name):
+    """URLs of a stored photo and of its variants, derived from the name alone (no query).
+
+    Variants that are not generated yet are redirected to the original by the serving view.
+    """
+    if not name:
+        return None
+    filename = name.rsplit('/', 1)[-1]
+    sha256 = filename.split('.', 1)[0]
+    if not SHA256.fullmatch(sha256):
+        # Uploaded before content addressing: only the original exists.
+        return {'original': default_storage.url(name)}
+    urls = {'original': reverse('photo-file', args=[filename])}
+    for size in get_setting('SIZES'):
+        for image_format in get_setting('FORMATS'):
+            variant = variant_name(sha256, size, image_format).rsplit('/', 1)[-1]
+            urls[f"{size}_{image_format}"] = reverse('photo-file', args=[variant])
+    return urls
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ProfilePhotoView, photo_file
+
+urlpatterns = [
+    path('profile/', ProfilePhotoView.as_view(), name='profile-photo'),
+    path('<str:filename>', photo_file, name='photo-file'),
+]
@@ -0,0 +1,81 @@
+import re
+
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified, HttpResponseRedirect
+from django.template.defaultfilters import filesizeformat
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from userProfile.cache import invalidate_profile
+from .models import StoredPhoto
+from .storage import HashingUploadHandler, UploadRejected, get_setting, photo_urls, store
+
+
+FILENAME = re.compile(r'(?P<sha256>[0-9a-f]{64})(?:_\d+)?\.(?:jpg|png|gif|webp)')
+
+
+"""
+        Upload the authenticated user's profile photo.
+        Expects a PUT or POST multipart request with the image in ``photo``.
+        The upload is streamed to disk, stored once per distinct image, and its
+        thumbnails are generated by the process_profile_photos worker.
+        Returns the URLs of the photo and of its variants.
+"""
+@query_budget(5)
+class ProfilePhotoView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request):
+        try:
+            profile = request.user.profile
+        except AttributeError:
+            return Response({"error": "Profile not found."}, status=404)
+
+        request.upload_handlers = [HashingUploadHandler(request)]
+        uploaded = request.FILES.get('photo')
+        if uploaded is None:
+            limit = filesizeformat(get_setting('MAX_UPLOAD_SIZE'))
+            return Response({"photo": [f"No photo was uploaded, or it is larger than {limit}."]}, status=400)
+        try:
+            photo = store(uploaded)
+        except UploadRejected as e:
+            return Response({"photo": [str(e)]}, status=400)
+        finally:
+            uploaded.close()
+
+        profile.photo = photo.original
+        profile.save(update_fields=['photo'])
+        invalidate_profile(request.user.pk)
+        return Response({"photo": photo_urls(photo.original), "status": photo.status})
+
+    post = put
+
+
+@require_safe
+def photo_file(request, filename):
+    """Serve an original or a variant; the name is content-addressed, so it can be cached forever."""
+    match = FILENAME.fullmatch(filename)
+    if match is None:
+        raise Http404
+    sha256 = match.group('sha256')
+    name = f"{get_setting('LOCATION')}/{sha256[:2]}/{filename}"
+
+    if request.headers.get('If-None-Match') == f'"{filename}"' and default_storage.exists(name):
+        response = HttpResponseNotModified()
+    elif default_storage.exists(name):
+        response = FileResponse(default_storage.open(name, 'rb'))
+    else:
+        # A variant the worker has not generated yet: fall back to the original, uncached.
+        original = StoredPhoto.objects.filter(sha256=sha256).values_list('original', flat=True).first()
+        if original is None or original == name:
+            raise Http404
+        response = HttpResponseRedirect(reverse('photo-file', args=[original.rsplit('/', 1)[-1]]))
+        response['Cache-Control'] = 'no-cache'
+        return response
+    response['Cache-Control'] = f"public, max-age={get_setting('CACHE_MAX_AGE')}, immutable"
+    response['ETag'] = f'"{filename}"'
+    return response
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+"""_summary_
+
+        Per-user fan-out of live dashboard events.
+        InProcessBroker keeps, for every user, the set of open event-stream subscriptions
+        in this process and hands each event to the subscriber's event loop with
+        call_soon_threadsafe, so views running in worker threads can publish safely.
+        RedisBroker extends it for deployments with several processes: events are
+        published to a Redis channel per user and every process relays them to its own
+        local subscribers. Streams subscribe with asubscribe() and aunsubscribe(), which
+        run RedisBroker's blocking Redis calls in a thread, so a slow Redis never stalls
+        the event loop serving the other streams. The broker class is chosen by
+        LIVE_UPDATES['BROKER'].
+
+"""
+
+DEFAULTS = {
+    'BROKER': 'realtime.broker.InProcessBroker',
+    'OPTIONS': {},
+    'PATH': '/live/events/',
+    'HEARTBEAT': 25,
+    'QUEUE_SIZE': 8,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'LIVE_UPDATES', {}).get(name, DEFAULTS[name])
+
+
+class Subscription:
+    """One open event stream. Only the newest events are kept if the client falls behind."""
+
+    __slots__ = ('user_id', 'loop', 'queue')
+
+    def __init__(self, user_id, loop, queue_size):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class InProcessBroker:
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or get_setting('QUEUE_SIZE')
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Register a stream for ``user_id``; must be called from the stream's event loop."""
+        subscription = Subscription(str(user_id), asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[subscription.user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    async def asubscribe(self, user_id):
+        """subscribe() for the stream's event loop."""
+        return self.subscribe(user_id)
+
+    async def aunsubscribe(self, subscription):
+        self.unsubscribe(subscription)
+
+    def has_subscribers(self, user_id):
+        return str(user_id) in self._subscriptions
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, user_id, event):
+        self.deliver(str(user_id), event)
+
+    def deliver(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down; its stream is gone.
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(InProcessBroker):
+    CHANNEL_PREFIX = 'spentra:live:'
+    PRESENCE_KEY = 'spentra:live:presence'
+
+    def __init__(self, url='redis://localhost:6379/0', queue_size=None):
+        super().__init__(queue_size)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker requires the 'redis' package.")
+        self.redis = redis.Redis.from_url(url)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = super().subscribe(user_id)
+        self._join(subscription.user_id)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        super().unsubscribe(subscription)
+        self._leave(subscription.user_id)
+
+    async def asubscribe(self, user_id):
+        # Registered on the stream's loop; redis-py blocks, so it is called from a thread.
+        subscription = super().subscribe(user_id)
+        await asyncio.to_thread(self._join, subscription.user_id)
+        return subscription
+
+    async def aunsubscribe(self, subscription):
+        super().unsubscribe(subscription)
+        await asyncio.to_thread(self._leave, subscription.user_id)
+
+    def _join(self, user_id):
+        self.redis.hincrby(self.PRESENCE_KEY, user_id, 1)
+        self._ensure_listener()
+
+    def _leave(self, user_id):
+        self.redis.hincrby(self.PRESENCE_KEY, user_id, -1)
+
+    def has_subscribers(self, user_id):
+        count = self.redis.hget(self.PRESENCE_KEY, str(user_id))
+        return count is not None and int(count) > 0
+
+    def publish(self, user_id, event):
+        self.redis.publish(f'{self.CHANNEL_PREFIX}{user_id}', json.dumps(event))
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='spentra-live-redis', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f'{self.CHANNEL_PREFIX}*')
+        for message in pubsub.listen():
+            channel = message['channel'].decode()
+            self.deliver(channel[len(self.CHANNEL_PREFIX):], json.loads(message['data']))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(get_setting('BROKER'))(**get_setting('OPTIONS'))
+    return _broker
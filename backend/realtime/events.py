@@ -0,0 +1,63 @@
+import logging
+
+from django.db import transaction
+
+from CRUD.models import Budget, Transaction
+from currency import conversion
+from currency.rates import MissingRate
+from .broker import get_broker
+
+
+"""_summary_
+
+        Publishing side of the live dashboard channel.
+        Write views call publish_dashboard_update() inside their atomic block. After the
+        write commits, and only if the user has an open stream somewhere, the dashboard
+        totals are recomputed with one grouped query, converted to the user's base
+        currency like FinancialSummaryView's, and pushed to the user's streams, so writes
+        by users without a live dashboard cost nothing extra.
+
+"""
+
+logger = logging.getLogger('spentra.realtime')
+
+
+def dashboard_totals(user_id):
+    """The dashboard event for ``user_id``; raises MissingRate if a currency cannot be converted."""
+    base = conversion.base_currency(user_id)
+    rows = conversion.grouped_totals(Transaction.objects.filter(user_id=user_id), base, 'type')
+    totals = {row['type']: row['total'] for row in conversion.convert(rows, base, ('type',))}
+    total_income = totals.get('income', 0)
+    total_expenses = totals.get('expense', 0)
+    event = {
+        'type': 'dashboard',
+        'total_income': str(total_income),
+        'total_expenses': str(total_expenses),
+        'balance': str(total_income - total_expenses),
+        'currency': base,
+    }
+    budget = Budget.objects.select_related('currency_info').filter(user_id=user_id).first()
+    if budget is not None:
+        monthly_budget = conversion.convert_amount(
+            budget.monthly_budget, conversion.budget_currency(budget, base), base,
+        )
+        remaining_budget = monthly_budget - total_expenses
+        event.update({
+            'monthly_budget': str(monthly_budget),
+            'remaining_budget': str(remaining_budget),
+            'status': "Under Budget" if remaining_budget >= 0 else "Over Budget",
+        })
+    return event
+
+
+def publish_dashboard_update(user_id):
+    def publish():
+        broker = get_broker()
+        if broker.has_subscribers(user_id):
+            try:
+                broker.publish(user_id, dashboard_totals(user_id))
+            except MissingRate as e:
+                # The summary endpoints report this too; the stream keeps its last totals.
+                logger.warning("Dashboard update for user %s skipped: %s", user_id, e)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.tokens import is_revoked
+
+from .broker import get_broker, get_setting
+
+
+"""_summary_
+
+        Server-Sent Events endpoint for live dashboard updates, served as a plain ASGI
+        application next to Django (see Spentra/asgi.py). A stream is authenticated with a
+        SimpleJWT access token, sent either as "Authorization: Bearer <token>" or, because
+        browsers' EventSource cannot set headers, as ?token=<token>. The token is only
+        verified cryptographically and checked against the revocation list in the shared
+        cache, so opening a stream runs no database query, and the stream is closed when
+        the token expires so the client reconnects with a fresh one.
+        An idle stream is one coroutine and one small queue, woken only by events for its
+        user, heartbeats and disconnects.
+
+"""
+
+
+def authenticate(scope):
+    """Return the user id carried by the request's access token, or None."""
+    raw_token = None
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            parts = value.decode('latin1').split()
+            if len(parts) == 2 and parts[0] in jwt_settings.AUTH_HEADER_TYPES:
+                raw_token = parts[1]
+            break
+    if raw_token is None:
+        raw_token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if not raw_token:
+        return None, None
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return None, None
+    if is_revoked(token):
+        return None, None
+    return token.get(jwt_settings.USER_ID_CLAIM), token.get('exp')
+
+
+def format_event(event):
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+async def send_json_error(send, status, message):
+    body = json.dumps({"error": message}).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class EventStreamApp:
+
+    def __init__(self, broker=None, heartbeat=None):
+        self._broker = broker
+        self.heartbeat = heartbeat or get_setting('HEARTBEAT')
+
+    @property
+    def broker(self):
+        return self._broker or get_broker()
+
+    async def __call__(self, scope, receive, send):
+        if scope['method'] != 'GET':
+            await send_json_error(send, 405, "Method not allowed.")
+            return
+        user_id, expires = await sync_to_async(authenticate)(scope)
+        if user_id is None:
+            await send_json_error(send, 401, "Authentication credentials were not provided or are invalid.")
+            return
+
+        broker = self.broker
+        subscription = await broker.asubscribe(user_id)
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(receive))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+
+            while not disconnected.done():
+                timeout = self.heartbeat
+                if expires is not None:
+                    remaining = expires - time.time()
+                    if remaining <= 0:
+                        break
+                    timeout = min(timeout, remaining)
+
+                next_event = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait({next_event, disconnected}, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    await send({'type': 'http.response.body', 'body': format_event(next_event.result()),
+                                'more_body': True})
+                    continue
+                next_event.cancel()
+                if not disconnected.done():
+                    await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            await broker.aunsubscribe(subscription)
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
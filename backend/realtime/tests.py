@@ -0,0 +1,139 @@
+import asyncio
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.tokens import GENERATION_CACHE_KEY
+
+from .broker import InProcessBroker, RedisBroker
+from .sse import EventStreamApp
+
+
+def access_token(user_id):
+    token = AccessToken()
+    token['user_id'] = user_id
+    # A cached token generation lets the revocation check skip the database.
+    cache.set(GENERATION_CACHE_KEY.format(user_id), 0)
+    return str(token)
+
+
+class FakeConnection:
+
+    def __init__(self, app, token=None, query_token=None):
+        headers = [(b'authorization', f'Bearer {token}'.encode())] if token else []
+        self.scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/live/events/',
+            'headers': headers,
+            'query_string': f'token={query_token}'.encode() if query_token else b'',
+        }
+        self.app = app
+        self.messages = []
+        self.closed = asyncio.Event()
+
+    async def receive(self):
+        await self.closed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    def start(self):
+        return asyncio.ensure_future(self.app(self.scope, self.receive, self.send))
+
+    @property
+    def body(self):
+        return b''.join(message.get('body', b'') for message in self.messages)
+
+
+class EventStreamTests(SimpleTestCase):
+
+    async def test_holds_thousands_of_idle_connections(self):
+        broker = InProcessBroker()
+        app = EventStreamApp(broker=broker, heartbeat=60)
+        users = 500
+        per_user = 4
+        tokens = [access_token(user_id) for user_id in range(users)]
+        connections = [FakeConnection(app, tokens[user_id]) for user_id in range(users) for _ in range(per_user)]
+        tasks = [connection.start() for connection in connections]
+
+        for _ in range(100):
+            if broker.subscriber_count() == len(connections):
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(broker.subscriber_count(), users * per_user)
+
+        # Publish from a worker thread, as a synchronous view would.
+        await asyncio.to_thread(broker.publish, 7, {'type': 'dashboard', 'total_expenses': '12.00'})
+        await asyncio.sleep(0.05)
+
+        for index, connection in enumerate(connections):
+            self.assertEqual(connection.messages[0]['status'], 200)
+            received = b'event: dashboard' in connection.body
+            self.assertEqual(received, index // per_user == 7)
+
+        for connection in connections:
+            connection.closed.set()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=10)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_rejects_missing_or_invalid_token(self):
+        app = EventStreamApp(broker=InProcessBroker())
+        for connection in (FakeConnection(app), FakeConnection(app, token='not-a-token')):
+            await connection.start()
+            self.assertEqual(connection.messages[0]['status'], 401)
+
+    async def test_accepts_token_in_query_string(self):
+        broker = InProcessBroker()
+        app = EventStreamApp(broker=broker)
+        connection = FakeConnection(app, query_token=access_token(3))
+        task = connection.start()
+        await asyncio.sleep(0.01)
+        self.assertTrue(broker.has_subscribers(3))
+        connection.closed.set()
+        await asyncio.wait_for(task, timeout=5)
+        self.assertFalse(broker.has_subscribers(3))
+
+
+class SlowRedis:
+    """Stands in for a redis-py client whose server answers slowly."""
+
+    def __init__(self):
+        self.presence = Counter()
+
+    def hincrby(self, key, field, amount):
+        time.sleep(0.2)
+        self.presence[field] += amount
+
+
+class RedisBrokerTests(SimpleTestCase):
+
+    async def test_redis_calls_do_not_stall_the_event_loop(self):
+        client = SlowRedis()
+        redis = SimpleNamespace(Redis=SimpleNamespace(from_url=lambda url: client))
+        with mock.patch.dict(sys.modules, {'redis': redis}):
+            broker = RedisBroker()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        with mock.patch.object(RedisBroker, '_ensure_listener'):
+            subscription = await broker.asubscribe(7)
+            self.assertEqual(client.presence['7'], 1)
+            await broker.aunsubscribe(subscription)
+        ticker.cancel()
+        self.assertEqual(client.presence['7'], 0)
+        # Other streams kept being served while Redis answered.
+        self.assertGreater(ticks, 10)
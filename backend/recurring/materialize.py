@@ -0,0 +1,143 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.utils import timezone
+
+from CRUD.models import Transaction
+from CRUD.serializers import TransactionSerializer
+from alerts.tracker import apply_expense_deltas, period_of
+from goals.projection import apply_cash_flow_deltas
+from categorization.matcher import categorize_many
+from duplicates.fingerprint import index_many
+from realtime.events import publish_dashboard_update
+from sharding import shardmap
+from sharding.models import UserShard
+from sync.changelog import TRANSACTION, record_changes
+from .models import RecurringOccurrence, RecurringTransaction
+from .schedule import due_dates, first_on_or_after
+
+
+"""_summary_
+
+        Turns due recurring templates into ordinary transactions, so every summary,
+        budget and alert sees them without special cases.
+        materialize_due() takes due templates a chunk at a time from the (is_active,
+        next_run) index, locking them with SKIP LOCKED where the database supports it so
+        parallel schedulers share the work. Each chunk is one atomic block: occurrences
+        already recorded are skipped, the rest are written with bulk_create, and the
+        change log, fingerprint index, month-to-date totals and next_run are updated in
+        bulk as well. Every occurrence between next_run and the run date is materialized,
+        so a scheduler that was down for a while catches up on its next run.
+
+"""
+
+
+def occurrence_datetime(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def reschedule(template, today=None):
+    """Point ``next_run`` at the first occurrence from today on, e.g. after the schedule changes."""
+    today = today or timezone.localdate()
+    template.next_run = first_on_or_after(template, today)
+    if template.max_occurrences is not None and template.occurrences_created >= template.max_occurrences:
+        template.next_run = None
+
+
+def moving_users():
+    # The shard map is on the default database, so it cannot be joined to the templates.
+    return list(UserShard.objects.filter(moving=True).values_list('user_id', flat=True))
+
+
+def materialize_due(until=None, chunk_size=200, batch_size=1000):
+    """Materialize every occurrence due on or before ``until``; returns (templates, transactions)."""
+    until = until or timezone.localdate()
+    templates_done = transactions_done = 0
+    while True:
+        with shardmap.atomic():
+            chunk = list(
+                # of=('self',): the joined user rows are read, not locked.
+                RecurringTransaction.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('user')
+                .filter(is_active=True, next_run__lte=until)
+                # Users being moved to another shard are caught up once they have arrived.
+                .exclude(user_id__in=moving_users())
+                .order_by('next_run', 'id')[:chunk_size]
+            )
+            if not chunk:
+                return templates_done, transactions_done
+            transactions_done += materialize_chunk(chunk, until, batch_size)
+            templates_done += len(chunk)
+
+
+def materialize_chunk(templates, until, batch_size):
+    existing = set(
+        RecurringOccurrence.objects.filter(template__in=templates, date__lte=until)
+        .values_list('template_id', 'date')
+    )
+    pending = []
+    for template in templates:
+        dates, template.next_run = due_dates(template, until)
+        for day in dates:
+            if (template.pk, day) not in existing:
+                pending.append((template, day))
+        template.occurrences_created += len(dates)
+
+    # Occurrences without a category are put through their owner's categorization rules.
+    rows = [
+        {'category': template.category_id, 'description': template.description, 'amount': template.amount}
+        for template, _ in pending
+    ]
+    rows_by_user = defaultdict(list)
+    for (template, _), row in zip(pending, rows):
+        rows_by_user[template.user_id].append(row)
+    for user_id, user_rows in rows_by_user.items():
+        categorize_many(user_id, user_rows)
+
+    transactions = []
+    for (template, day), row in zip(pending, rows):
+        transactions.append(Transaction(
+            user_id=template.user_id,
+            category_id=row['category'],
+            type=template.type,
+            amount=template.amount,
+            description=template.description,
+            date_created=occurrence_datetime(day),
+        ))
+    Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+    # date_created may be filled in automatically on insert; put the occurrence date back.
+    for transaction_obj, (_, day) in zip(transactions, pending):
+        transaction_obj.date_created = occurrence_datetime(day)
+    Transaction.objects.bulk_update(transactions, ['date_created'], batch_size=batch_size)
+
+    RecurringOccurrence.objects.bulk_create(
+        [
+            RecurringOccurrence(template=template, date=day, transaction=transaction_obj)
+            for transaction_obj, (template, day) in zip(transactions, pending)
+        ],
+        batch_size=batch_size,
+    )
+    RecurringTransaction.objects.bulk_update(templates, ['next_run', 'occurrences_created'], batch_size=batch_size)
+    index_many(transactions, batch_size)
+
+    by_user = defaultdict(list)
+    for transaction_obj in transactions:
+        by_user[transaction_obj.user_id].append(transaction_obj)
+    users = {template.user_id: template.user for template in templates}
+    for user_id, user_transactions in by_user.items():
+        user = users[user_id]
+        record_changes(user, TRANSACTION, [
+            (transaction_obj.pk, 'create', TransactionSerializer(transaction_obj).data)
+            for transaction_obj in user_transactions
+        ])
+        deltas = defaultdict(int)
+        cash_flow = defaultdict(int)
+        for transaction_obj in user_transactions:
+            period = period_of(transaction_obj.date_created)
+            if transaction_obj.type == 'expense':
+                deltas[period] += transaction_obj.amount
+            cash_flow[(period, transaction_obj.type)] += transaction_obj.amount
+        apply_expense_deltas(user, deltas)
+        apply_cash_flow_deltas(user_id, cash_flow)
+        publish_dashboard_update(user_id)
+    return len(transactions)
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        A RecurringTransaction is a template for a transaction that repeats on an
+        rrule-style schedule: every ``interval`` days, weeks, months or years from
+        ``start_date``, optionally on a fixed ``day_of_month``, until ``end_date`` or
+        ``max_occurrences``. ``next_run`` is the date of the next occurrence not yet
+        materialized (null once the schedule is exhausted) and is indexed, so the
+        scheduler finds due templates without scanning the rest.
+
+"""
+class RecurringTransaction(models.Model):
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    ]
+    TYPE_CHOICES = [
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recurring_transactions')
+    category = models.ForeignKey('CRUD.Category', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    description = models.CharField(max_length=255, blank=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    day_of_month = models.PositiveSmallIntegerField(null=True, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    max_occurrences = models.PositiveIntegerField(null=True, blank=True)
+    occurrences_created = models.PositiveIntegerField(default=0)
+    next_run = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'next_run'], name='recurring_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.amount} {self.type} every {self.interval} {self.frequency}"
+
+
+"""_summary_
+
+        One materialized occurrence of a template. The (template, date) pair is the
+        idempotency key: a rerun of the scheduler, or two schedulers racing, can never
+        create the same occurrence twice.
+
+"""
+class RecurringOccurrence(models.Model):
+    template = models.ForeignKey(RecurringTransaction, on_delete=models.CASCADE, related_name='occurrences')
+    date = models.DateField()
+    transaction = models.OneToOneField(
+        'CRUD.Transaction', on_delete=models.SET_NULL, null=True, blank=True, related_name='recurring_occurrence',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'date'], name='recurring_occurrence_unique'),
+        ]
@@ -0,0 +1,77 @@
+import calendar
+from datetime import timedelta
+
+
+"""_summary_
+
+        Date arithmetic for recurring schedules. The n-th occurrence is always computed
+        from ``start_date`` rather than from the previous occurrence, so a monthly
+        schedule on the 31st falls on the last day of short months and returns to the
+        31st afterwards instead of drifting.
+
+"""
+
+
+def _add_months(day, months, day_of_month):
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def occurrence(template, n):
+    """Return the date of the n-th occurrence (counting from 0) of ``template``'s schedule."""
+    start = template.start_date
+    step = n * template.interval
+    if template.frequency == 'daily':
+        return start + timedelta(days=step)
+    if template.frequency == 'weekly':
+        return start + timedelta(weeks=step)
+    if template.frequency == 'monthly':
+        return _add_months(start, step, template.day_of_month or start.day)
+    return _add_months(start, 12 * step, start.day)
+
+
+def _estimate(template, day):
+    # A lower bound for the index of the first occurrence on or after ``day``.
+    start = template.start_date
+    if day <= start:
+        return 0
+    if template.frequency == 'daily':
+        return (day - start).days // template.interval
+    if template.frequency == 'weekly':
+        return (day - start).days // (7 * template.interval)
+    months = (day.year - start.year) * 12 + day.month - start.month
+    if template.frequency == 'yearly':
+        return max(months // (12 * template.interval) - 1, 0)
+    return max(months // template.interval - 1, 0)
+
+
+def first_on_or_after(template, day):
+    """Return the first occurrence on or after ``day``, or None if the schedule has ended by then."""
+    day = max(day, template.start_date)
+    n = _estimate(template, day)
+    date = occurrence(template, n)
+    while date < day:
+        n += 1
+        date = occurrence(template, n)
+    if template.end_date is not None and date > template.end_date:
+        return None
+    return date
+
+
+def due_dates(template, until):
+    """Return (dates, next_run): the occurrences due up to ``until`` and the one after them."""
+    dates = []
+    remaining = None
+    if template.max_occurrences is not None:
+        remaining = template.max_occurrences - template.occurrences_created
+    next_run = template.next_run
+    while next_run is not None and next_run <= until:
+        if remaining is not None and len(dates) >= remaining:
+            return dates, None
+        dates.append(next_run)
+        next_run = first_on_or_after(template, next_run + timedelta(days=1))
+    if remaining is not None and len(dates) >= remaining:
+        next_run = None
+    return dates, next_run
@@ -0,0 +1,43 @@
+from rest_framework import serializers
+from .models import RecurringTransaction
+
+
+class RecurringTransactionSerializer(serializers.ModelSerializer):
+    is_active = serializers.BooleanField(default=True)
+    rrule = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecurringTransaction
+        fields = [
+            'id', 'category', 'type', 'amount', 'description', 'frequency', 'interval',
+            'day_of_month', 'start_date', 'end_date', 'max_occurrences', 'is_active',
+            'occurrences_created', 'next_run', 'rrule',
+        ]
+        read_only_fields = ['occurrences_created', 'next_run']
+
+    def get_rrule(self, obj):
+        parts = [f"FREQ={obj.frequency.upper()}", f"INTERVAL={obj.interval}"]
+        if obj.frequency == 'monthly' and obj.day_of_month:
+            parts.append(f"BYMONTHDAY={obj.day_of_month}")
+        if obj.max_occurrences:
+            parts.append(f"COUNT={obj.max_occurrences}")
+        if obj.end_date:
+            parts.append(f"UNTIL={obj.end_date:%Y%m%d}")
+        return ';'.join(parts)
+
+    def validate(self, attrs):
+        interval = attrs.get('interval', getattr(self.instance, 'interval', 1))
+        day_of_month = attrs.get('day_of_month', getattr(self.instance, 'day_of_month', None))
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        amount = attrs.get('amount', getattr(self.instance, 'amount', None))
+
+        if interval < 1:
+            raise serializers.ValidationError({"interval": "interval must be at least 1."})
+        if day_of_month is not None and not 1 <= day_of_month <= 31:
+            raise serializers.ValidationError({"day_of_month": "day_of_month must be between 1 and 31."})
+        if end_date is not None and start_date is not None and end_date < start_date:
+            raise serializers.ValidationError({"end_date": "end_date must not be before start_date."})
+        if amount is not None and amount <= 0:
+            raise serializers.ValidationError({"amount": "amount must be positive."})
+        return attrs
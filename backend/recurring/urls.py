@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import RecurringTransactionListView, RecurringTransactionDetailView
+
+urlpatterns = [
+    path('', RecurringTransactionListView.as_view(), name='recurring-transactions'),
+    path('<int:id>/', RecurringTransactionDetailView.as_view(), name='recurring-transaction'),
+]
@@ -0,0 +1,74 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from .materialize import reschedule
+from .models import RecurringTransaction
+from .serializers import RecurringTransactionSerializer
+
+
+SCHEDULE_FIELDS = {'frequency', 'interval', 'day_of_month', 'start_date', 'end_date', 'max_occurrences', 'is_active'}
+
+
+"""
+        List or create the authenticated user's recurring transactions.
+        Expects a GET request, or a POST request with the template and its schedule.
+        Occurrences are created as ordinary transactions by the run_recurring command.
+"""
+@query_budget(2)
+class RecurringTransactionListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        templates = RecurringTransaction.objects.filter(user=request.user).order_by('next_run', 'id')
+        return Response(RecurringTransactionSerializer(templates, many=True).data)
+
+    def post(self, request):
+        serializer = RecurringTransactionSerializer(data=request.data)
+        if serializer.is_valid():
+            template = RecurringTransaction(user=request.user, **serializer.validated_data)
+            # A start date in the past is caught up on the scheduler's next run.
+            reschedule(template, template.start_date)
+            template.save()
+            return Response(RecurringTransactionSerializer(template).data, status=201)
+        return Response(serializer.errors, status=400)
+
+
+"""
+        Retrieve, update or delete one of the authenticated user's recurring transactions.
+        Changing the schedule or resuming a paused template moves the next run to the
+        first occurrence from today; transactions already created are left untouched.
+        If the template is not found, returns an error message.
+"""
+@query_budget(3)
+class RecurringTransactionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        try:
+            template = RecurringTransaction.objects.get(id=id, user=request.user)
+        except RecurringTransaction.DoesNotExist:
+            return Response({"error": "Recurring transaction not found."}, status=404)
+        return Response(RecurringTransactionSerializer(template).data)
+
+    def put(self, request, id):
+        try:
+            template = RecurringTransaction.objects.get(id=id, user=request.user)
+        except RecurringTransaction.DoesNotExist:
+            return Response({"error": "Recurring transaction not found."}, status=404)
+        serializer = RecurringTransactionSerializer(template, data=request.data, partial=True)
+        if serializer.is_valid():
+            for field, value in serializer.validated_data.items():
+                setattr(template, field, value)
+            if SCHEDULE_FIELDS & serializer.validated_data.keys():
+                reschedule(template)
+            template.save()
+            return Response(RecurringTransactionSerializer(template).data)
+        return Response(serializer.errors, status=400)
+
+    def delete(self, request, id):
+        deleted, _ = RecurringTransaction.objects.filter(id=id, user=request.user).delete()
+        if not deleted:
+            return Response({"error": "Recurring transaction not found."}, status=404)
+        return Response({"message": "Recurring transaction deleted successfully."}, status=204)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import UserShard
+
+
+@admin.register(UserShard)
+class UserShardAdmin(admin.ModelAdmin):
+    list_display = ['user', 'alias', 'moving', 'moved_at']
+    list_filter = ['alias', 'moving']
+    search_fields = ['user__username', 'user__email']
+    list_select_related = ['user']
+    # Changing the alias here would orphan the user's rows; use `manage.py rebalance_shards`.
+    readonly_fields = ['alias', 'moving', 'moved_at']
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class ShardingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sharding'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.checks import register
+        from django.db.models.signals import post_migrate, post_save
+
+        from . import checks, shardmap
+
+        register(checks.id_ranges_fit_category_paths)
+
+        post_save.connect(shardmap.place_new_user, sender=settings.AUTH_USER_MODEL,
+                          dispatch_uid='sharding.place_new_user')
+        post_migrate.connect(shardmap.reserve_id_range, sender=self, dispatch_uid='sharding.reserve_id_range')
@@ -0,0 +1,16 @@
+from django.core.checks import Error
+
+
+def id_ranges_fit_category_paths(app_configs, **kwargs):
+    """The ids of the last shard must fit a segment of a category path."""
+    from categories.tree import SEGMENT_WIDTH
+    from .shardmap import get_setting, shard_aliases
+
+    if len(shard_aliases()) * get_setting('ID_BLOCK') > 10 ** SEGMENT_WIDTH:
+        return [Error(
+            f"SHARDING['SHARDS'] times SHARDING['ID_BLOCK'] exceeds 10**{SEGMENT_WIDTH}, so category ids "
+            f"of the last shards do not fit a {SEGMENT_WIDTH}-digit category path segment.",
+            hint="Use a smaller ID_BLOCK.",
+            id='sharding.E001',
+        )]
+    return []
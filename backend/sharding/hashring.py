@@ -0,0 +1,28 @@
+import bisect
+import hashlib
+
+
+class HashRing:
+    """A consistent-hash ring: adding a node moves only about 1/N of the keys to it.
+
+    Every node is placed on the ring ``vnodes`` times so keys spread evenly.
+    """
+
+    def __init__(self, nodes, vnodes=64):
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node.")
+        self.nodes = list(nodes)
+        points = sorted(
+            (self.hash(f"{node}#{replica}"), node)
+            for node in self.nodes for replica in range(vnodes)
+        )
+        self.hashes = [point for point, _ in points]
+        self.owners = [node for _, node in points]
+
+    @staticmethod
+    def hash(key):
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def node_for(self, key):
+        index = bisect.bisect(self.hashes, self.hash(str(key))) % len(self.hashes)
+        return self.owners[index]
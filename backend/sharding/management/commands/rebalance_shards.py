@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sharding.rebalance import MoveIncomplete, move_user, plan
+from sharding.shardmap import placement, ring
+
+
+class Command(BaseCommand):
+    help = (
+        "Move users to the shard the hash ring assigns them, e.g. after appending a shard "
+        "to SHARDING['SHARDS']. Runs online: only the user being moved has writes paused."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only list the moves.")
+        parser.add_argument('--limit', type=int, help="Move at most this many users.")
+        parser.add_argument('--user', type=int, help="Move only this user id.")
+        parser.add_argument('--to', help="Target alias for --user (default: the ring's choice).")
+
+    def handle(self, *args, **options):
+        if options['user'] is not None:
+            moves = [(options['user'], placement(options['user'])[0], options['to'] or ring().node_for(options['user']))]
+        elif options['to']:
+            raise CommandError("--to needs --user.")
+        else:
+            moves = plan(options['limit'])
+
+        moved = 0
+        for user_id, source, target in moves:
+            if source == target:
+                continue
+            if options['dry_run']:
+                self.stdout.write(f"user {user_id}: {source} -> {target}")
+                continue
+            try:
+                rows = move_user(user_id, target)
+            except ValueError as e:
+                raise CommandError(str(e))
+            except MoveIncomplete as e:
+                self.stderr.write(f"user {user_id}: {e} Try again later.")
+                continue
+            moved += 1
+            self.stdout.write(f"user {user_id}: {source} -> {target}, {rows} rows copied.")
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} users."))
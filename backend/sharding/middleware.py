@@ -0,0 +1,36 @@
+from django.http import JsonResponse
+
+from monitoring.middleware import token_user_id
+from .shardmap import placement, shard_aliases, use_shard
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+"""_summary_
+
+        ShardMiddleware selects the shard of the request's user, read from the access
+        token before the view authenticates it, so every ledger query of the request
+        goes to that shard. While rebalance_shards moves the user, their writes are
+        answered with 503 and a Retry-After header; reads are served from the old shard.
+        With a single shard it does nothing.
+
+"""
+class ShardMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if len(shard_aliases()) == 1:
+            return self.get_response(request)
+        user_id = token_user_id(request)
+        if user_id is None:
+            return self.get_response(request)
+        alias, moving = placement(user_id)
+        if moving and request.method not in SAFE_METHODS:
+            response = JsonResponse({"error": "Your account is being moved; try again in a moment."}, status=503)
+            response['Retry-After'] = '5'
+            return response
+        with use_shard(alias):
+            return self.get_response(request)
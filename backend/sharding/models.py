@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        UserShard is the shard map: the database alias holding a user's ledger. It lives
+        on the default database with the users. A user without a row predates sharding
+        and stays on the first shard; new users are placed on the hash ring when they
+        register. ``moving`` is set while rebalance_shards copies the user to another
+        shard, during which their writes are refused.
+
+"""
+class UserShard(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='shard')
+    alias = models.CharField(max_length=64, db_index=True)
+    moving = models.BooleanField(default=False)
+    moved_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.alias}{' (moving)' if self.moving else ''}"
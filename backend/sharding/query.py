@@ -0,0 +1,18 @@
+import heapq
+from operator import itemgetter
+
+from .shardmap import shard_aliases
+
+
+def across_shards(queryset, order_field, limit, descending=True):
+    """Run a ``values()`` queryset on every shard and merge the rows by ``order_field``.
+
+    Each shard returns at most ``limit`` rows already ordered, so the merge reads no more
+    than ``limit`` rows per shard. Every row gets the alias it came from as ``shard``.
+    """
+    ordering = f"-{order_field}" if descending else order_field
+    per_shard = [
+        [{**row, 'shard': alias} for row in queryset.using(alias).order_by(ordering)[:limit]]
+        for alias in shard_aliases()
+    ]
+    return list(heapq.merge(*per_shard, key=itemgetter(order_field), reverse=descending))[:limit]
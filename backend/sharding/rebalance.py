@@ -0,0 +1,193 @@
+import logging
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UserShard
+from .shardmap import (
+    ensure_user_stub, get_setting, invalidate_placement, placement, ring, shard_aliases, sharded_models,
+)
+
+
+"""_summary_
+
+        Online rebalancing: moving one user's ledger between shards while the service
+        keeps running. move_user() flags the user as moving (ShardMiddleware then
+        refuses their writes; reads continue from the old shard), waits
+        MOVE_GRACE_SECONDS for writes already in flight and copies every ledger row to
+        the target. Only the rows it copied are deleted from the source, and only once
+        a pass finds nothing new there: writers that do not go through the middleware
+        (find_duplicates, processes holding a cached placement) are caught up, and the
+        move is undone if they keep writing. The shard map then points at the target,
+        and rows still written to the source shortly after are moved as well. Other
+        users are never blocked. Rows keep their primary keys, which are unique across
+        shards (see reserve_id_range).
+
+"""
+
+logger = logging.getLogger('spentra.sharding')
+
+COPY_BATCH_SIZE = 1000
+MOVE_ATTEMPTS = 3
+
+
+class MoveIncomplete(Exception):
+    """Rows kept appearing on the source shard while a user was being moved."""
+
+
+def plan(limit=None):
+    """[(user_id, source, target)] for every user the hash ring places elsewhere."""
+    aliases = shard_aliases()
+    moves = []
+    # Users without a placement are on the first shard.
+    rows = (
+        get_user_model().objects.exclude(shard__moving=True).order_by('pk')
+        .values_list('pk', 'shard__alias')
+    )
+    for user_id, alias in rows.iterator():
+        alias = alias or aliases[0]
+        target = ring().node_for(user_id)
+        if alias != target:
+            moves.append((user_id, alias, target))
+            if limit and len(moves) >= limit:
+                break
+    return moves
+
+
+def owned_rows(model, lookup, user_id, alias):
+    return model._base_manager.using(alias).filter(**{lookup: user_id}).order_by('pk')
+
+
+def owned_pks(model, lookup, user_id, alias):
+    return set(owned_rows(model, lookup, user_id, alias).values_list('pk', flat=True))
+
+
+def copy_rows(queryset, target):
+    copied = 0
+    batch = []
+    for obj in queryset.iterator(chunk_size=COPY_BATCH_SIZE):
+        batch.append(obj)
+        if len(batch) >= COPY_BATCH_SIZE:
+            type(obj)._base_manager.using(target).bulk_create(batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        type(batch[0])._base_manager.using(target).bulk_create(batch)
+        copied += len(batch)
+    return copied
+
+
+def copy_categories(user_id, source, target, models):
+    """Copy the shared categories the user's rows refer to that the target lacks."""
+    Category = apps.get_model('CRUD', 'Category')
+    referenced = set()
+    for model, lookup in models:
+        if lookup is None:
+            continue
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model is Category:
+                referenced.update(
+                    owned_rows(model, lookup, user_id, source).exclude(**{field.attname: None})
+                    .values_list(field.attname, flat=True).distinct()
+                )
+    present = set(Category._base_manager.using(target).filter(pk__in=referenced).values_list('pk', flat=True))
+    return copy_rows(Category._base_manager.using(source).filter(pk__in=referenced - present).order_by('pk'), target)
+
+
+def in_batches(pks):
+    pks = sorted(pks)
+    for start in range(0, len(pks), COPY_BATCH_SIZE):
+        yield pks[start:start + COPY_BATCH_SIZE]
+
+
+def copy_new_rows(user_id, source, target, models, copied):
+    """Copy the user's rows on ``source`` whose keys are not in ``copied`` yet, recording them there."""
+    count = 0
+    with transaction.atomic(using=target):
+        count += copy_categories(user_id, source, target, models)
+        for model, lookup in models:
+            if lookup is None:
+                continue
+            new = owned_pks(model, lookup, user_id, source) - copied[model]
+            for pks in in_batches(new):
+                count += copy_rows(model._base_manager.using(source).filter(pk__in=pks).order_by('pk'), target)
+            copied[model].update(new)
+    return count
+
+
+def delete_rows(alias, models, copied):
+    for model, lookup in reversed(models):
+        if lookup is None:
+            continue
+        for pks in in_batches(copied[model]):
+            model._base_manager.using(alias).filter(pk__in=pks).delete()
+
+
+def delete_copied(user_id, source, models, copied):
+    """Delete the copied rows from ``source``, unless rows that were not copied are left there.
+
+    Returns whether the rows were deleted.
+    """
+    with transaction.atomic(using=source):
+        for model, lookup in models:
+            if lookup is not None and owned_pks(model, lookup, user_id, source) - copied[model]:
+                return False
+        delete_rows(source, models, copied)
+    return True
+
+
+def transfer(user_id, source, target, models, copied):
+    """Copy the user's rows until a pass finds nothing new, then delete what was copied from ``source``.
+
+    Raises MoveIncomplete if rows keep appearing on ``source`` for MOVE_ATTEMPTS passes.
+    """
+    count = 0
+    for _ in range(MOVE_ATTEMPTS):
+        count += copy_new_rows(user_id, source, target, models, copied)
+        if delete_copied(user_id, source, models, copied):
+            return count
+        # Something wrote to the source meanwhile (a worker, or a process with a stale placement).
+        time.sleep(get_setting('MOVE_GRACE_SECONDS'))
+    raise MoveIncomplete(f"Rows of user {user_id} kept being written to {source}; nothing was deleted there.")
+
+
+def move_user(user_id, target):
+    """Move a user's ledger to ``target``; returns the number of rows copied."""
+    if target not in shard_aliases():
+        raise ValueError(f"{target} is not in SHARDING['SHARDS'].")
+    source, moving = placement(user_id)
+    if source == target:
+        return 0
+    shard, _ = UserShard.objects.get_or_create(user_id=user_id, defaults={'alias': source})
+    UserShard.objects.filter(pk=shard.pk).update(moving=True)
+    invalidate_placement(user_id)
+    time.sleep(get_setting('MOVE_GRACE_SECONDS'))
+
+    models = sharded_models()
+    copied = defaultdict(set)
+    try:
+        ensure_user_stub(user_id, target)
+        count = transfer(user_id, source, target, models, copied)
+    except Exception:
+        # The source still holds every row; drop the copies so a later move starts clean.
+        with transaction.atomic(using=target):
+            delete_rows(target, models, copied)
+        UserShard.objects.filter(pk=shard.pk).update(moving=False)
+        invalidate_placement(user_id)
+        raise
+
+    UserShard.objects.filter(pk=shard.pk).update(alias=target, moving=False, moved_at=timezone.now())
+    invalidate_placement(user_id)
+
+    # Processes that cached the old placement may still write to the source for a while.
+    time.sleep(get_setting('MOVE_GRACE_SECONDS'))
+    late = defaultdict(set)
+    try:
+        count += transfer(user_id, source, target, models, late)
+    except MoveIncomplete:
+        logger.warning("Rows of user %s are still being written to %s after the move to %s.", user_id, source, target)
+    return count
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+
+from .shardmap import current_shard, is_sharded, shard_for
+
+
+class ShardRouter:
+    """Routes ledger models to their owner's shard; every other model is left to the default database.
+
+    The shard comes from, in order: the database a ledger instance was loaded from,
+    the database of a ledger object it is linked to, its owner's placement, and
+    finally the shard selected with use_shard() for the request. Related managers of
+    a user (user.category_rules) go to that user's shard.
+    """
+
+    def _shard(self, model, **hints):
+        if not is_sharded(model):
+            return None
+        instance = hints.get('instance')
+        if isinstance(instance, get_user_model()):
+            return shard_for(instance.pk)
+        if instance is not None and is_sharded(type(instance)):
+            if instance._state.db:
+                return instance._state.db
+            for field in instance._meta.concrete_fields:
+                if field.is_relation and field.is_cached(instance):
+                    related = field.get_cached_value(instance)
+                    if related is not None and is_sharded(type(related)) and related._state.db:
+                        return related._state.db
+            user_id = getattr(instance, 'user_id', None)
+            if user_id is not None:
+                return shard_for(user_id)
+        return current_shard()
+
+    db_for_read = _shard
+    db_for_write = _shard
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_sharded(type(obj1)) and is_sharded(type(obj2)):
+            return obj1._state.db == obj2._state.db
+        # Ledger rows point at users and other rows kept on the default database.
+        if is_sharded(type(obj1)) or is_sharded(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every shard gets the full schema, so foreign keys to users can be enforced.
+        return None
@@ -0,0 +1,207 @@
+import contextvars
+import logging
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+
+from .hashring import HashRing
+
+
+"""_summary_
+
+        The shard map: which database alias holds a user's ledger.
+        The ledger models (SHARDED_MODELS) of one user always live together on one of
+        the aliases in SHARDING['SHARDS']; users, the shard map and everything else stay
+        on the default database. New users are placed by consistent hashing of their id,
+        so appending a shard only moves about 1/N of the users, and rebalance_shards
+        moves them. Placements are cached per user; with a single shard no lookup is
+        made at all.
+        ShardMiddleware selects the request user's shard with use_shard(), which the
+        ShardRouter reads for every query on a sharded model. Each shard holds a stub
+        row of its users so the ledger's foreign keys hold, and hands out primary keys
+        from its own ID_BLOCK range, so rows keep their ids when they move.
+
+"""
+
+logger = logging.getLogger('spentra.sharding')
+
+DEFAULTS = {
+    'SHARDS': [DEFAULT_DB_ALIAS],
+    'VIRTUAL_NODES': 64,
+    'ID_BLOCK': 10 ** 12,
+    'MOVE_GRACE_SECONDS': 2.0,
+}
+
+# Ledger models, with the lookup from each one to its owner's id. Category rows are
+# shared by the users of a shard, so they are copied, never moved.
+SHARDED_MODELS = {
+    'CRUD.category': None,
+    'CRUD.budget': 'user_id',
+    'CRUD.transaction': 'user_id',
+    'currency.budgetcurrency': 'budget__user_id',
+    'currency.transactioncurrency': 'transaction__user_id',
+    'duplicates.transactionfingerprint': 'user_id',
+    'categories.categorynode': 'user_id',
+    'categorization.categoryrule': 'user_id',
+    'recurring.recurringtransaction': 'user_id',
+    'recurring.recurringoccurrence': 'template__user_id',
+}
+SHARDED_LABELS = {label.lower() for label in SHARDED_MODELS}
+
+PLACEMENT_CACHE_KEY = 'user_shard_{}'
+PLACEMENT_CACHE_TIMEOUT = 60 * 60
+
+_current = contextvars.ContextVar('spentra_shard', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'SHARDING', {}).get(name, DEFAULTS[name])
+
+
+def shard_aliases():
+    return list(get_setting('SHARDS'))
+
+
+@lru_cache(maxsize=8)
+def _ring(aliases, vnodes):
+    return HashRing(aliases, vnodes)
+
+
+def ring():
+    return _ring(tuple(shard_aliases()), get_setting('VIRTUAL_NODES'))
+
+
+def is_sharded(model):
+    return model._meta.label.lower() in SHARDED_LABELS
+
+
+def sharded_models():
+    """(model, owner lookup) for every installed ledger model."""
+    found = []
+    for label, lookup in SHARDED_MODELS.items():
+        try:
+            found.append((apps.get_model(label), lookup))
+        except LookupError:
+            continue
+    return found
+
+
+def current_shard():
+    """The shard selected with use_shard(), or None."""
+    return _current.get()
+
+
+@contextmanager
+def use_shard(alias):
+    """Route queries on ledger models to ``alias`` inside the block."""
+    token = _current.set(alias)
+    try:
+        yield alias
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def atomic():
+    """One atomic block on the default database and one on the current shard.
+
+    The two commit one after the other; they are not a distributed transaction.
+    """
+    with ExitStack() as stack:
+        for alias in dict.fromkeys([DEFAULT_DB_ALIAS, current_shard() or DEFAULT_DB_ALIAS]):
+            stack.enter_context(transaction.atomic(using=alias))
+        yield
+
+
+def ensure_user_stub(user_id, alias):
+    """Copy the user's row to ``alias`` (with an unusable password) so ledger foreign keys hold."""
+    if alias == DEFAULT_DB_ALIAS:
+        return
+    model = get_user_model()
+    if model._base_manager.using(alias).filter(pk=user_id).exists():
+        return
+    stub = model._base_manager.using(DEFAULT_DB_ALIAS).get(pk=user_id)
+    stub.set_unusable_password()
+    try:
+        with transaction.atomic(using=alias):
+            stub.save(using=alias, force_insert=True)
+    except IntegrityError:
+        # Created concurrently.
+        pass
+
+
+def placement(user_id):
+    """Return (alias, moving) for a user."""
+    aliases = shard_aliases()
+    if len(aliases) == 1:
+        return aliases[0], False
+    key = PLACEMENT_CACHE_KEY.format(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+    from .models import UserShard
+
+    row = UserShard.objects.filter(user_id=user_id).values_list('alias', 'moving').first()
+    if row is None:
+        # Users without a placement were created before sharding: their data is on the first shard.
+        row = (aliases[0], False)
+    cache.set(key, row, PLACEMENT_CACHE_TIMEOUT)
+    return tuple(row)
+
+
+def shard_for(user_id):
+    return placement(user_id)[0]
+
+
+def invalidate_placement(user_id):
+    cache.delete(PLACEMENT_CACHE_KEY.format(user_id))
+
+
+def assign(user_id, alias):
+    from .models import UserShard
+
+    ensure_user_stub(user_id, alias)
+    UserShard.objects.update_or_create(user_id=user_id, defaults={'alias': alias})
+    invalidate_placement(user_id)
+
+
+def place_new_user(sender, instance, created, using=DEFAULT_DB_ALIAS, raw=False, **kwargs):
+    """post_save handler placing a newly registered user on the hash ring."""
+    if not created or raw or using != DEFAULT_DB_ALIAS or len(shard_aliases()) == 1:
+        return
+    assign(instance.pk, ring().node_for(instance.pk))
+
+
+def reserve_id_range(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate handler starting the ledger tables of the n-th shard at n * ID_BLOCK.
+
+    Aliases must therefore only ever be appended to SHARDING['SHARDS'].
+    """
+    aliases = shard_aliases()
+    if using not in aliases or aliases.index(using) == 0:
+        return
+    start = aliases.index(using) * get_setting('ID_BLOCK')
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model, _ in sharded_models():
+            table = model._meta.db_table
+            if connection.vendor == 'sqlite':
+                cursor.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s AND seq < %s", [start, table, start])
+                cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s "
+                    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)", [table, start, table],
+                )
+            elif connection.vendor == 'postgresql':
+                column = model._meta.pk.column
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence(%s, %s), GREATEST(%s, (SELECT COALESCE(MAX("
+                    f"{connection.ops.quote_name(column)}), 0) FROM {connection.ops.quote_name(table)})))",
+                    [table, column, start],
+                )
+            else:
+                logger.warning("Cannot reserve an id range on %s (%s); set the sequences by hand.", using, table)
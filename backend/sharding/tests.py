@@ -0,0 +1,292 @@
+import shutil
+import tempfile
+from collections import Counter
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from categories import tree
+from CRUD.models import Category, Transaction
+from currency.models import TransactionCurrency
+from .hashring import HashRing
+from .middleware import ShardMiddleware
+from .models import UserShard
+from . import rebalance
+from .rebalance import MoveIncomplete, move_user, plan
+from .shardmap import current_shard, get_setting, shard_for, use_shard
+from .views import CrossShardTransactionListView
+
+
+SHARDS = ['default', 'shard_a', 'shard_b']
+
+
+class HashRingTests(SimpleTestCase):
+
+    def test_spreads_keys_over_every_node(self):
+        ring = HashRing(SHARDS)
+        counts = Counter(ring.node_for(user_id) for user_id in range(3000))
+        self.assertEqual(set(counts), set(SHARDS))
+        for count in counts.values():
+            self.assertGreater(count, 600)
+
+    def test_appending_a_node_only_moves_keys_to_it(self):
+        before = HashRing(SHARDS)
+        after = HashRing(SHARDS + ['shard_c'])
+        moved = [key for key in range(3000) if before.node_for(key) != after.node_for(key)]
+        self.assertTrue(moved)
+        self.assertLess(len(moved), 3000 / 2)
+        self.assertTrue(all(after.node_for(key) == 'shard_c' for key in moved))
+
+
+@override_settings(SHARDING={'SHARDS': SHARDS, 'MOVE_GRACE_SECONDS': 0})
+class ShardedTestCase(TransactionTestCase):
+    """Runs against the default test database plus two SQLite files, one per extra shard."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The extra aliases only exist while the class runs, so the test runner must not
+        # see them when it sets up databases; they are declared here instead.
+        cls.databases = set(SHARDS)
+        cls.directory = tempfile.mkdtemp()
+        for alias in SHARDS[1:]:
+            name = f"{cls.directory}/{alias}.sqlite3"
+            connections.settings[alias] = {
+                **connections.settings['default'],
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': name,
+                'TEST': {**connections.settings['default']['TEST'], 'NAME': name},
+            }
+        super().setUpClass()
+        for alias in SHARDS[1:]:
+            call_command('migrate', database=alias, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in SHARDS[1:]:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def make_user(self, name):
+        return get_user_model().objects.create_user(username=name, email=f"{name}@example.com", password='x')
+
+    def users_on_every_shard(self):
+        users = {}
+        while set(users) != set(SHARDS):
+            user = self.make_user(f"user{get_user_model().objects.count()}")
+            users.setdefault(shard_for(user.pk), user)
+        return users
+
+    def user_on(self, alias):
+        while True:
+            user = self.make_user(f"user{get_user_model().objects.count()}")
+            if shard_for(user.pk) == alias:
+                return user
+
+    def add_transaction(self, user, amount, category=None):
+        # Saved rather than created through the manager, so the router sees the owner.
+        transaction = Transaction(user=user, amount=Decimal(amount), type='expense', description='coffee', category=category)
+        transaction.save()
+        return transaction
+
+
+class RoutingTests(ShardedTestCase):
+
+    def test_new_users_are_placed_on_the_ring(self):
+        users = self.users_on_every_shard()
+        for alias, user in users.items():
+            self.assertEqual(UserShard.objects.get(user=user).alias, alias)
+            # Each shard holds a stub of its users for the ledger's foreign keys.
+            self.assertTrue(get_user_model().objects.using(alias).filter(pk=user.pk).exists())
+
+    def test_ledger_rows_are_written_to_the_owners_shard(self):
+        users = self.users_on_every_shard()
+        for alias, user in users.items():
+            with use_shard(alias):
+                category = Category.objects.create(name=f"Food {alias}")
+                transaction = self.add_transaction(user, '4.50', category)
+                TransactionCurrency.objects.create(transaction=transaction, currency='USD')
+
+            self.assertEqual(transaction._state.db, alias)
+            for other in SHARDS:
+                self.assertEqual(Transaction.objects.using(other).filter(user=user).exists(), other == alias)
+            # Ids come from the shard's own range, so they stay unique when rows move.
+            block = get_setting('ID_BLOCK')
+            self.assertEqual(transaction.pk // block, SHARDS.index(alias))
+            with use_shard(alias):
+                self.assertEqual(Transaction.objects.get(pk=transaction.pk).currency_info.currency, 'USD')
+                self.assertEqual(Transaction.objects.get(pk=transaction.pk).category.name, f"Food {alias}")
+
+    def test_middleware_selects_the_token_users_shard(self):
+        users = self.users_on_every_shard()
+        seen = []
+
+        def view(request):
+            seen.append(current_shard())
+            return HttpResponse()
+
+        middleware = ShardMiddleware(view)
+        factory = RequestFactory()
+        for alias, user in users.items():
+            token = AccessToken.for_user(user)
+            middleware(factory.get('/crud/transactions/all/', HTTP_AUTHORIZATION=f"Bearer {token}"))
+        middleware(factory.get('/crud/transactions/all/'))
+        self.assertEqual(seen, list(users) + [None])
+
+    def test_writes_are_refused_while_a_user_moves(self):
+        user = self.make_user('mover')
+        UserShard.objects.filter(user=user).update(moving=True)
+        middleware = ShardMiddleware(lambda request: HttpResponse())
+        header = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(user)}"}
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.post('/crud/transactions/', **header)).status_code, 503)
+        self.assertEqual(middleware(factory.get('/crud/transactions/all/', **header)).status_code, 200)
+
+
+class CategoryTreeTests(ShardedTestCase):
+
+    def test_trees_on_later_shards_keep_their_category_ids(self):
+        user = self.user_on('shard_b')
+        with use_shard('shard_b'):
+            food, dining, coffee = (Category.objects.create(name=name) for name in ('Food', 'Dining', 'Coffee'))
+            self.assertGreaterEqual(coffee.pk, SHARDS.index('shard_b') * get_setting('ID_BLOCK'))
+            tree.place(user, food.pk)
+            tree.place(user, dining.pk, food.pk)
+            node = tree.place(user, coffee.pk, dining.pk)
+            self.assertEqual(tree.category_of(node.path), coffee.pk)
+            self.add_transaction(user, '3.00', coffee)
+            self.add_transaction(user, '7.00', dining)
+
+            def totals(depth):
+                return [(row['category'], row['total'])
+                        for row in tree.rollup(Transaction.objects.filter(user=user), user, depth)]
+
+            self.assertEqual(totals(1), [(food.pk, Decimal('10.00'))])
+            self.assertEqual(totals(2), [(dining.pk, Decimal('10.00'))])
+            self.assertEqual(totals(3), [(dining.pk, Decimal('7.00')), (coffee.pk, Decimal('3.00'))])
+            tree.move(node)
+            self.assertEqual(sorted(totals(1)), sorted([(food.pk, Decimal('7.00')), (coffee.pk, Decimal('3.00'))]))
+
+
+class CrossShardListingTests(ShardedTestCase):
+
+    def test_admin_lists_transactions_of_every_shard_newest_first(self):
+        users = self.users_on_every_shard()
+        for user in users.values():
+            for amount in ('1.00', '2.00'):
+                self.add_transaction(user, amount)
+        admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='x')
+
+        def fetch(**params):
+            request = APIRequestFactory().get('/shards/transactions/', params)
+            force_authenticate(request, user=admin)
+            return CrossShardTransactionListView.as_view()(request).data
+
+        page = fetch(limit=4)
+        self.assertEqual(len(page['results']), 4)
+        rest = fetch(limit=4, before=page['next'])
+        rows = page['results'] + rest['results']
+        self.assertEqual(len(rows), 6)
+        self.assertIsNone(rest['next'])
+        self.assertEqual([row['id'] for row in rows], sorted((row['id'] for row in rows), reverse=True))
+        self.assertEqual({row['shard'] for row in rows}, set(SHARDS))
+        for row in rows:
+            self.assertEqual(row['shard'], shard_for(row['user_id']))
+
+        only = fetch(user=users['shard_a'].pk)['results']
+        self.assertEqual({row['user_id'] for row in only}, {users['shard_a'].pk})
+
+    def test_non_admins_are_refused(self):
+        user = self.make_user('plain')
+        request = APIRequestFactory().get('/shards/transactions/')
+        force_authenticate(request, user=user)
+        self.assertEqual(CrossShardTransactionListView.as_view()(request).status_code, 403)
+
+
+class RebalanceTests(ShardedTestCase):
+
+    def test_move_user_copies_the_ledger_and_keeps_ids(self):
+        users = self.users_on_every_shard()
+        user = users['shard_a']
+        with use_shard('shard_a'):
+            category = Category.objects.create(name='Rent')
+            first = self.add_transaction(user, '10.00', category)
+            second = self.add_transaction(user, '20.00')
+            TransactionCurrency.objects.create(transaction=second, currency='INR')
+        # Another user's rows on the same shard must stay put.
+        neighbour = self.user_on('shard_a')
+        self.add_transaction(neighbour, '5.00')
+
+        copied = move_user(user.pk, 'shard_b')
+
+        self.assertEqual(copied, 4)
+        self.assertEqual(shard_for(user.pk), 'shard_b')
+        self.assertFalse(Transaction.objects.using('shard_a').filter(user=user).exists())
+        self.assertTrue(Transaction.objects.using('shard_a').filter(user=neighbour).exists())
+        moved = Transaction.objects.using('shard_b').filter(user=user).order_by('pk')
+        self.assertEqual([row.pk for row in moved], [first.pk, second.pk])
+        self.assertEqual(moved[0].category.name, 'Rent')
+        self.assertEqual(moved[1].currency_info.currency, 'INR')
+        # Shared categories are copied, not moved.
+        self.assertTrue(Category.objects.using('shard_a').filter(pk=category.pk).exists())
+        self.assertFalse(UserShard.objects.get(user=user).moving)
+
+    def test_rows_written_during_the_move_are_moved_too(self):
+        user = self.user_on('shard_a')
+        self.add_transaction(user, '10.00')
+        delete_copied = rebalance.delete_copied
+        late = []
+
+        def write_then_delete(*args):
+            if not late:
+                # A writer that ignores the moving flag, e.g. the recurring scheduler.
+                with use_shard('shard_a'):
+                    late.append(self.add_transaction(user, '30.00'))
+            return delete_copied(*args)
+
+        with mock.patch.object(rebalance, 'delete_copied', side_effect=write_then_delete):
+            self.assertEqual(move_user(user.pk, 'shard_b'), 2)
+
+        self.assertFalse(Transaction.objects.using('shard_a').filter(user=user).exists())
+        self.assertTrue(Transaction.objects.using('shard_b').filter(pk=late[0].pk).exists())
+
+    def test_a_move_is_undone_while_the_source_keeps_changing(self):
+        user = self.user_on('shard_a')
+        first = self.add_transaction(user, '10.00')
+        delete_copied = rebalance.delete_copied
+
+        def write_then_delete(*args):
+            with use_shard('shard_a'):
+                self.add_transaction(user, '30.00')
+            return delete_copied(*args)
+
+        with mock.patch.object(rebalance, 'delete_copied', side_effect=write_then_delete):
+            with self.assertRaises(MoveIncomplete):
+                move_user(user.pk, 'shard_b')
+
+        self.assertEqual(shard_for(user.pk), 'shard_a')
+        self.assertFalse(UserShard.objects.get(user=user).moving)
+        self.assertEqual(Transaction.objects.using('shard_a').filter(user=user).count(), 1 + rebalance.MOVE_ATTEMPTS)
+        self.assertTrue(Transaction.objects.using('shard_a').filter(pk=first.pk).exists())
+        self.assertFalse(Transaction.objects.using('shard_b').filter(user=user).exists())
+
+    def test_plan_lists_users_the_ring_places_elsewhere(self):
+        users = self.users_on_every_shard()
+        for user in users.values():
+            UserShard.objects.filter(user=user).update(alias='default')
+        planned = {user_id: target for user_id, _, target in plan()}
+        for alias, user in users.items():
+            self.assertEqual(planned.get(user.pk), None if alias == 'default' else alias)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import CrossShardTransactionListView, ShardStatusView
+
+urlpatterns = [
+    path('', ShardStatusView.as_view(), name='shard-status'),
+    path('transactions/', CrossShardTransactionListView.as_view(), name='shard-transactions'),
+]
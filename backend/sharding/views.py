@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+
+from CRUD.models import Transaction
+from .models import UserShard
+from .query import across_shards
+from .shardmap import shard_aliases
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+TRANSACTION_FIELDS = ['id', 'user_id', 'type', 'amount', 'category_id', 'description', 'date_created']
+
+
+"""
+        Admin overview of the shards: for every alias, the users placed on it, its
+        transaction count, and the users being moved.
+"""
+class ShardStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        aliases = shard_aliases()
+        placed = dict(UserShard.objects.values_list('alias').annotate(users=Count('pk')).order_by())
+        # Users without a placement predate sharding and are on the first shard.
+        placed[aliases[0]] = placed.get(aliases[0], 0) + get_user_model().objects.filter(shard__isnull=True).count()
+        return Response({
+            "shards": [
+                {
+                    "alias": alias,
+                    "users": placed.get(alias, 0),
+                    "transactions": Transaction.objects.using(alias).count(),
+                }
+                for alias in aliases
+            ],
+            "moving": list(UserShard.objects.filter(moving=True).values_list('user_id', flat=True)),
+        })
+
+
+"""
+        Admin listing of transactions across every shard, newest first.
+        Expects a GET request with optional ``user`` (a user id), ``limit`` and ``before``
+        (the last id of the previous page; ids are unique across shards).
+        Each row carries the ``shard`` it is stored on.
+"""
+class CrossShardTransactionListView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+            before = int(request.query_params['before']) if request.query_params.get('before') else None
+            user_id = int(request.query_params['user']) if request.query_params.get('user') else None
+        except ValueError:
+            return Response({"error": "limit, before and user must be integers."}, status=400)
+
+        transactions = Transaction.objects.all()
+        if before is not None:
+            transactions = transactions.filter(id__lt=before)
+        if user_id is not None:
+            transactions = transactions.filter(user_id=user_id)
+        rows = across_shards(transactions.values(*TRANSACTION_FIELDS), 'id', limit)
+        return Response({"results": rows, "next": rows[-1]['id'] if len(rows) == limit else None})
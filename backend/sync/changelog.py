@@ -0,0 +1,89 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import ChangeLogEntry, UserSequence
+
+
+"""_summary_
+
+        Helpers for writing to and reading from the per-user change log.
+        record_change() must be called inside the same atomic block as the write it
+        describes, so a change is logged exactly when the write commits. The user's
+        UserSequence row is updated first, which takes its row lock and serializes that
+        user's concurrent writers; sequence numbers therefore become visible in order and
+        a client that has seen seq N can never later miss a change numbered below N.
+
+"""
+
+TRANSACTION = 'transaction'
+BUDGET = 'budget'
+
+
+def next_seq(user, count=1):
+    """Reserve ``count`` sequence numbers for ``user`` and return the last of them."""
+    if not UserSequence.objects.filter(user=user).update(last_seq=F('last_seq') + count):
+        try:
+            with transaction.atomic():
+                UserSequence.objects.create(user=user, last_seq=count)
+            return count
+        except IntegrityError:
+            # Another request created the row first; its lock is now ours to wait on.
+            return next_seq(user, count)
+    return UserSequence.objects.filter(user=user).values_list('last_seq', flat=True).get()
+
+
+def record_change(user, entity, entity_id, action, data=None):
+    """Append one change for ``user`` and return its sequence number."""
+    with transaction.atomic():
+        seq = next_seq(user)
+        ChangeLogEntry.objects.create(
+            user=user, seq=seq, entity=entity, entity_id=entity_id, action=action, data=data,
+        )
+    return seq
+
+
+def record_changes(user, entity, changes):
+    """Append several (entity_id, action, data) changes for ``user`` with one sequence reservation."""
+    if not changes:
+        return
+    with transaction.atomic():
+        first = next_seq(user, len(changes)) - len(changes) + 1
+        ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(user=user, seq=first + offset, entity=entity, entity_id=entity_id, action=action, data=data)
+            for offset, (entity_id, action, data) in enumerate(changes)
+        ])
+
+
+def current_seq(user):
+    return UserSequence.objects.filter(user=user).values_list('last_seq', flat=True).first() or 0
+
+
+def changes_since(user, since, limit):
+    """Return (changes, cursor, has_more) for up to ``limit`` log entries after ``since``.
+
+    Within a batch only the newest entry per entity is kept, since it supersedes the
+    earlier ones; the cursor still advances past everything that was read.
+    """
+    entries = list(
+        ChangeLogEntry.objects.filter(user=user, seq__gt=since)
+        .order_by('seq')
+        .values('seq', 'entity', 'entity_id', 'action', 'data')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    cursor = entries[-1]['seq'] if entries else since
+
+    latest = {}
+    for entry in entries:
+        latest[(entry['entity'], entry['entity_id'])] = entry
+    changes = [
+        {
+            'seq': entry['seq'],
+            'entity': entry['entity'],
+            'id': entry['entity_id'],
+            'action': entry['action'],
+            'data': entry['data'],
+        }
+        for entry in sorted(latest.values(), key=lambda entry: entry['seq'])
+    ]
+    return changes, cursor, has_more
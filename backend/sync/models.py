@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import models
+
+
+"""_summary_
+
+        Models for the per-user change log used by delta sync.
+        UserSequence holds the last sequence number handed out to each user; its row is
+        locked while a change is recorded, so one user's changes commit in sequence order.
+        ChangeLogEntry is append-only: one row per create, update or delete of a synced
+        entity, carrying a snapshot of the entity (or nothing, for a tombstone).
+
+"""
+class UserSequence(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_sequence')
+    last_seq = models.BigIntegerField(default=0)
+
+
+class ChangeLogEntry(models.Model):
+    ACTION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='change_log')
+    seq = models.BigIntegerField()
+    entity = models.CharField(max_length=32)
+    entity_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    data = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'seq'], name='sync_changelog_user_seq_unique'),
+        ]
+        ordering = ['seq']
+
+    def __str__(self):
+        return f"{self.user_id}#{self.seq} {self.action} {self.entity}:{self.entity_id}"
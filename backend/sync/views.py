@@ -0,0 +1,42 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.querybudget import query_budget
+from .changelog import changes_since, current_seq
+
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+
+"""
+        Return the changes to the user's transactions and budget after a sequence number.
+        Expects a GET request with ``since`` (the cursor from the previous response) and an
+        optional ``limit`` query parameter.
+        Returns {"changes", "cursor", "has_more"}; each change carries its entity, id, action
+        and, for creates and updates, a full snapshot of the entity, so clients apply creates
+        and updates as upserts and deletes as tombstones. While has_more is true the client
+        calls again with the returned cursor.
+        Without ``since`` only the current cursor is returned: a new client takes it, then
+        downloads the full ledger once, and syncs from that cursor onwards.
+"""
+@query_budget(2)
+class SyncView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is None:
+            return Response({"changes": [], "cursor": current_seq(request.user), "has_more": False})
+
+        try:
+            since = int(since)
+            limit = min(int(request.query_params.get('limit', DEFAULT_BATCH_SIZE)), MAX_BATCH_SIZE)
+        except ValueError:
+            return Response({"error": "since and limit must be integers."}, status=400)
+        if since < 0 or limit < 1:
+            return Response({"error": "since must be >= 0 and limit >= 1."}, status=400)
+
+        changes, cursor, has_more = changes_since(request.user, since, limit)
+        return Response({"changes": changes, "cursor": cursor, "has_more": has_more})
@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.db import transaction
+
+
+"""_summary_
+
+        Per-user cache of the serialized user and profile returned by ProfileView.
+        Every write path that changes a user's profile calls invalidate_profile(), which
+        drops the entry right away and again once the write has committed, so a read
+        racing the write cannot leave the old profile cached.
+
+"""
+
+PROFILE_CACHE_KEY = 'user_profile_{}'
+PROFILE_CACHE_TIMEOUT = 60 * 60
+
+
+def get_cached_profile(user_id):
+    return cache.get(PROFILE_CACHE_KEY.format(user_id))
+
+
+def cache_profile(user_id, data):
+    cache.set(PROFILE_CACHE_KEY.format(user_id), data, PROFILE_CACHE_TIMEOUT)
+
+
+def invalidate_profile(user_id):
+    key = PROFILE_CACHE_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,6 +1,8 @@
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
 from .models import UserProfile
+from photos.storage import UploadRejected, photo_urls, store
 
 
 
@@ -10,13 +12,19 @@ from .models import UserProfile
         
 """
 class UserProfileSerializer(serializers.ModelSerializer):
+    photo_urls = serializers.SerializerMethodField()
+
     class Meta:
         model = UserProfile
         fields = [
-            'full_name', 'photo', 'first_name', 'last_name', 'gender', 
+            'full_name', 'photo', 'photo_urls', 'first_name', 'last_name', 'gender', 
             'country', 'language', 'location', 'bio'
         ]  # Include new fields
 
+    def get_photo_urls(self, obj):
+        # Original and thumbnail URLs, served with long-lived cache headers.
+        return photo_urls(obj.photo.name if obj.photo else None)
+
 
 
 
@@ -28,7 +36,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
         including the user's profile information. It also overrides the update method to handle
         updating the user and profile data together.
         It includes fields such as 'id', 'username', 'email', and the nested profile fields.
-        The update method allows for partial updates to the user and profile data.
+        The update method allows for partial updates to the user and profile data,
+        writing only the fields that changed, with update_fields, in one transaction.
         The profile fields include 'full_name', 'photo', 'first_name', 'last
 """
 
@@ -37,46 +46,42 @@ class UserSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer()
 
     class Meta:
-        model = User
+        model = get_user_model()
         fields = ['id', 'username', 'email', 'profile']
 
     def update(self, instance, validated_data):
         profile_data = validated_data.pop('profile', {})
-        full_name = profile_data.get('full_name')
-        photo = profile_data.get('photo')
-        first_name = profile_data.get('first_name')
-        last_name = profile_data.get('last_name')
-        gender = profile_data.get('gender')
-        country = profile_data.get('country')
-        language = profile_data.get('language')
-        location = profile_data.get('location')
-        bio = profile_data.get('bio')
-
-        instance.email = validated_data.get('email', instance.email)
-        instance.save()
-
+        # Load the view's instance with select_related('profile') to avoid a query here.
         profile = instance.profile
-        if full_name:
-            profile.full_name = full_name
-        if photo:
-            profile.photo = photo
-        if first_name:
-            profile.first_name = first_name
-        if last_name:
-            profile.last_name = last_name
-        if gender:
-            profile.gender = gender
-        if country:
-            profile.country = country
-        if language:
-            profile.language = language
-        if location:
-            profile.location = location
-        if bio:
-            profile.bio = bio
-        profile.save()
 
+        # Only fields present in the request are applied, so empty values can be set too,
+        # and only the columns that actually change are written.
+        user_fields = []
+        if 'email' in validated_data and validated_data['email'] != instance.email:
+            instance.email = validated_data['email']
+            user_fields.append('email')
+
+        profile_fields = []
+        for field, value in profile_data.items():
+            if field == 'photo':
+                if not value:
+                    value = None
+                else:
+                    # Stored content-addressed; thumbnails are made by the process_profile_photos worker.
+                    try:
+                        value = store(value).original
+                    except UploadRejected as e:
+                        raise serializers.ValidationError({'profile': {'photo': [str(e)]}})
+                if (profile.photo.name or None) == value:
+                    continue
+            elif getattr(profile, field) == value:
+                continue
+            setattr(profile, field, value)
+            profile_fields.append(field)
+
+        with transaction.atomic():
+            if user_fields:
+                instance.save(update_fields=user_fields)
+            if profile_fields:
+                profile.save(update_fields=profile_fields)
         return instance
-    
-
-
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ProfileView
+
+urlpatterns = [
+    path('', ProfileView.as_view(), name='profile'),
+]
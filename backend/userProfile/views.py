@@ -1,3 +1,48 @@
-from django.shortcuts import render
+from django.contrib.auth import get_user_model
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
 
-# Create your views here.
+from monitoring.querybudget import query_budget
+from .cache import cache_profile, get_cached_profile, invalidate_profile
+from .serializers import UserSerializer
+
+
+def load_user(user_id):
+    """The user and the profile in one query."""
+    return get_user_model().objects.select_related('profile').get(pk=user_id)
+
+
+"""
+        Retrieve or update the authenticated user together with their profile.
+        Expects a GET request, or a PUT/PATCH request with ``email`` and/or a nested
+        ``profile`` object; only the fields sent are changed.
+        The serialized profile is cached per user and dropped on every write.
+        If the user has no profile, returns an error message.
+"""
+@query_budget(4)
+class ProfileView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        data = get_cached_profile(request.user.pk)
+        if data is None:
+            user = load_user(request.user.pk)
+            if not hasattr(user, 'profile'):
+                return Response({"error": "Profile not found."}, status=404)
+            data = UserSerializer(user).data
+            cache_profile(request.user.pk, data)
+        return Response(data)
+
+    def patch(self, request):
+        user = load_user(request.user.pk)
+        if not hasattr(user, 'profile'):
+            return Response({"error": "Profile not found."}, status=404)
+        serializer = UserSerializer(user, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            invalidate_profile(request.user.pk)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=400)
+
+    put = patch